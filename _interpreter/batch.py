@@ -0,0 +1,157 @@
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from _interpreter.interpreter import Interpreter
+from _lexer.fast_lexer import FastLexer
+from _lexer.lexer import Lexer
+from _optimizer.optimizer import NO_OPTIMIZATION
+from _parser.parse_cache import CACHE_DIRECTORY, ParseCache
+
+
+# scripts sent to a worker at once, so 50k small scripts aren't 50k round trips
+CHUNK_SIZE = 16
+
+LEXERS = {
+    "lexer": Lexer,
+    "fast": FastLexer,
+}
+
+
+class ScriptResult:
+    __slots__ = ("script", "stdout", "value", "error", "timings")
+
+    def __init__(self, script, stdout="", value=None, error=None, timings=None):
+        self.script = script
+        self.stdout = stdout
+        # what main returned
+        self.value = value
+        # "ExceptionType: message" of whatever stopped the script
+        self.error = error
+        # seconds spent reading, parsing (lexing included), preparing and executing
+        self.timings = timings or {}
+
+    def __repr__(self):
+        return f"ScriptResult: {self.script}"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Worker:
+    # lives as long as its process, so the parse cache and everything it
+    # imported are reused by every script it runs
+
+    def __init__(self, engine="tree", optimization_level=NO_OPTIMIZATION, lexer="lexer", parse_cache=True,
+                 cache_directory=None):
+        self.engine = engine
+        self.optimization_level = optimization_level
+        self.parse_cache = parse_cache
+        self.cache = ParseCache(cache_directory, LEXERS[lexer])
+
+    def run(self, script):
+        result = ScriptResult(script)
+        output = io.StringIO()
+        phase, start = "read", time.perf_counter()
+
+        try:
+            with open(script) as file:
+                text = file.read()
+
+            phase, start = self.next_phase(result, phase, start, "parse")
+            if self.parse_cache:
+                program = self.cache.parse_text(text, self.cache.cache_path(script))
+            else:
+                program = self.cache.parse(text)
+
+            phase, start = self.next_phase(result, phase, start, "prepare")
+            interpreter = Interpreter(program, self.engine, self.optimization_level, output=output)
+
+            phase, start = self.next_phase(result, phase, start, "execute")
+            result.value = interpreter.execute()
+        except Exception as exception:
+            result.error = f"{type(exception).__name__}: {exception}"
+
+        result.timings[phase] = time.perf_counter() - start
+        result.stdout = output.getvalue()
+        return result
+
+    @staticmethod
+    def next_phase(result, phase, start, next_phase):
+        now = time.perf_counter()
+        result.timings[phase] = now - start
+        return next_phase, now
+
+
+# one per set of options in every worker process
+workers = {}
+
+
+def run_script(script, options):
+    worker = workers.get(options)
+    if worker is None:
+        worker = workers[options] = Worker(**dict(options))
+    return worker.run(script)
+
+
+def list_scripts(scripts):
+    # a directory stands for the files in it, in name order
+    if isinstance(scripts, (str, os.PathLike)):
+        scripts = [scripts]
+
+    paths = []
+    for script in scripts:
+        if os.path.isdir(script):
+            paths.extend(sorted(entry.path for entry in os.scandir(script)
+                                if entry.is_file() and entry.name != CACHE_DIRECTORY))
+        else:
+            paths.append(os.fspath(script))
+    return paths
+
+
+def run_batch(scripts, max_workers=None, executor=None, chunk_size=CHUNK_SIZE, **options):
+    # yields a ScriptResult per script, in order, as soon as it and those before it are done
+    paths = list_scripts(scripts)
+    options = tuple(sorted(options.items()))
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers) as executor:
+            yield from executor.map(run_script, paths, itertools.repeat(options), chunksize=chunk_size)
+    else:
+        yield from executor.map(run_script, paths, itertools.repeat(options), chunksize=chunk_size)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Run scripts in parallel, one JSON result per line.")
+    parser.add_argument("scripts", nargs="+", help="script files or directories of scripts")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("-e", "--engine", default="tree")
+    parser.add_argument("-O", "--optimization-level", type=int, default=NO_OPTIMIZATION)
+    parser.add_argument("--lexer", choices=sorted(LEXERS), default="lexer")
+    parser.add_argument("--no-parse-cache", action="store_true")
+    parser.add_argument("--cache-directory", default=None)
+    arguments = parser.parse_args(arguments)
+
+    results = run_batch(arguments.scripts, arguments.workers, engine=arguments.engine,
+                        optimization_level=arguments.optimization_level, lexer=arguments.lexer,
+                        parse_cache=not arguments.no_parse_cache, cache_directory=arguments.cache_directory)
+
+    count = failed = 0
+    start = time.perf_counter()
+    for result in results:
+        count += 1
+        failed += result.error is not None
+        print(json.dumps(result.to_dict()), flush=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} scripts, {failed} failed, {elapsed:.3f} s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,501 @@
+import operator
+
+from _interpreter import runtime
+from _interpreter.resolver import Resolver
+from _interpreter.runtime import NUMBER_TYPES, format_value, literal_value, parameter_list
+from tree.program import Program
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.visitor import Visitor
+
+
+# Every expression becomes a function of the scope chain returning its value,
+# every statement a function returning None or, when it returns from the
+# function, a one element tuple with the returned value. Variables are read
+# from the slot scopes at the addresses given by the resolver, only the
+# dynamic ones are looked up by name.
+
+ARITHMETIC = {
+    "add": (operator.add, runtime.add),
+    "subtract": (operator.sub, runtime.subtract),
+    "multiply": (operator.mul, runtime.multiply),
+}
+
+COMPARISONS = {
+    "less": operator.lt,
+    "less_equal": operator.le,
+    "greater": operator.gt,
+    "greater_equal": operator.ge,
+}
+
+
+class CompiledFunction:
+    __slots__ = ("name", "parameters", "body", "dynamic_parameters")
+
+    def __init__(self, name, parameters, body, dynamic_parameters):
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+        self.dynamic_parameters = dynamic_parameters
+
+    def __repr__(self):
+        return f"CompiledFunction: {self.name}"
+
+
+class SlotScopes(runtime.ScopeChain):
+
+    def __init__(self):
+        super().__init__()
+        self.slots = []
+
+
+def call_function(env, function, values):
+    runtime.check_arguments(function.name, function.parameters, values)
+
+    depth, slot_depth = len(env.scopes), len(env.slots)
+    # the arguments are the parameter slots in declaration order
+    if values:
+        env.slots.append(values)
+    if function.dynamic_parameters:
+        env.push_scope()
+        for index, name, is_const in function.dynamic_parameters:
+            if is_const:
+                env.declare_const(name, values[index])
+            else:
+                env.declare(name, values[index])
+    try:
+        result = function.body(env)
+    finally:
+        env.release_scopes(depth)
+        del env.slots[slot_depth:]
+    return None if result is None else result[0]
+
+
+class ClosureCompiler(Visitor):
+
+    def __init__(self, functions, resolver, output=None):
+        # filled by the engine after compiling, calls look the callee up when they run
+        self.functions = functions
+        self.resolver = resolver
+        self.output = output
+        # value of every closure that always returns the same value
+        self.constants = {}
+
+    def compile_program(self, program):
+        return {function.identifier: self.compile_function(function) for function in program.functions}
+
+    def compile_function(self, function):
+        parameters = parameter_list(function)
+        dynamic_parameters = [(index, name, is_const) for index, (name, is_const) in enumerate(parameters)
+                              if name in self.resolver.dynamic]
+        return CompiledFunction(function.identifier, parameters, self.compile_block(function.body), dynamic_parameters)
+
+    def compile(self, node):
+        return node.accept(self)
+
+    def constant(self, value):
+        def load_constant(env):
+            return value
+
+        self.constants[load_constant] = value
+        return load_constant
+
+    def is_constant(self, *closures):
+        return all(closure in self.constants for closure in closures)
+
+    def fold(self, function, *closures):
+        # evaluated once here, unless it fails, then the error is left for run time
+        try:
+            return self.constant(function(*[self.constants[closure] for closure in closures]))
+        except Exception:
+            return None
+
+    @staticmethod
+    def discard_result(call):
+        def call_statement(env):
+            call(env)
+        return call_statement
+
+    def compile_block(self, block):
+        if block is None:
+            return lambda env: None
+
+        statements = []
+        for statement in block.statements:
+            compiled = self.compile(statement)
+            if isinstance(statement, FunctionCall):
+                compiled = self.discard_result(compiled)
+            if compiled is not None:
+                statements.append(compiled)
+
+        size = self.resolver.scope_sizes.get(id(block), 0)
+        dynamic = any(isinstance(statement, (Let, Const)) and statement.identifier in self.resolver.dynamic
+                      for statement in block.statements)
+
+        # a block without declarations of its own can share the enclosing scope
+        if not size and not dynamic:
+            if len(statements) == 1:
+                return statements[0]
+
+            def run_block(env):
+                for statement in statements:
+                    result = statement(env)
+                    if result is not None:
+                        return result
+            return run_block
+
+        if not dynamic:
+            def run_slot_block(env):
+                env.slots.append([None] * size)
+                try:
+                    for statement in statements:
+                        result = statement(env)
+                        if result is not None:
+                            return result
+                finally:
+                    env.slots.pop()
+            return run_slot_block
+
+        def run_scoped_block(env):
+            depth, slot_depth = len(env.scopes), len(env.slots)
+            env.push_scope()
+            if size:
+                env.slots.append([None] * size)
+            try:
+                for statement in statements:
+                    result = statement(env)
+                    if result is not None:
+                        return result
+            finally:
+                env.release_scopes(depth)
+                del env.slots[slot_depth:]
+        return run_scoped_block
+
+    def compile_binary(self, expressions, operators):
+        result = self.compile(expressions[0])
+        for expression, _operator in zip(expressions[1:], operators):
+            result = _operator.accept(self, result, self.compile(expression))
+        return result
+
+    def compile_arithmetic(self, name, left, right):
+        fast, checked = ARITHMETIC[name]
+        if self.is_constant(left, right):
+            folded = self.fold(checked, left, right)
+            if folded is not None:
+                return folded
+
+        if right in self.constants and self.constants[right].__class__ in NUMBER_TYPES:
+            value = self.constants[right]
+
+            def arithmetic_constant(env):
+                operand = left(env)
+                if operand.__class__ in NUMBER_TYPES:
+                    return fast(operand, value)
+                return checked(operand, value)
+            return arithmetic_constant
+
+        def arithmetic(env):
+            left_value = left(env)
+            right_value = right(env)
+            if left_value.__class__ in NUMBER_TYPES and right_value.__class__ in NUMBER_TYPES:
+                return fast(left_value, right_value)
+            return checked(left_value, right_value)
+        return arithmetic
+
+    def compile_comparison(self, name, left, right):
+        compare = COMPARISONS[name]
+        if self.is_constant(left, right):
+            folded = self.fold(lambda l, r: runtime.compare(compare, l, r), left, right)
+            if folded is not None:
+                return folded
+
+        def comparison(env):
+            left_value = left(env)
+            right_value = right(env)
+            try:
+                return compare(left_value, right_value)
+            except TypeError:
+                return runtime.compare(compare, left_value, right_value)
+        return comparison
+
+    def visit_program(self, program):
+        pass
+
+    def visit_function(self, function):
+        pass
+
+    def visit_parameters(self, parameters):
+        pass
+
+    def visit_block(self, block, scope=None):
+        return self.compile_block(block)
+
+    def visit_statement(self, statement):
+        pass
+
+    def visit_comment(self, comment):
+        return None
+
+    def compile_declaration(self, statement, is_const):
+        name, expression = statement.identifier, self.compile(statement.expression)
+
+        address = self.resolver.addresses.get(id(statement))
+        if address is not None:
+            index = address[1]
+
+            def declare_slot(env):
+                env.slots[-1][index] = expression(env)
+            return declare_slot
+
+        if is_const:
+            return lambda env: env.declare_const(name, expression(env))
+        return lambda env: env.declare(name, expression(env))
+
+    def visit_let(self, let):
+        return self.compile_declaration(let, False)
+
+    def visit_const(self, const):
+        return self.compile_declaration(const, True)
+
+    def visit_assign(self, assign):
+        name, expression = assign.identifier, self.compile(assign.expression)
+
+        address = self.resolver.addresses.get(id(assign))
+        if address is None:
+            if self.is_constant(expression):
+                return lambda env: env.assign(name, expression(env))
+
+            # like the tree-walker, the target is checked before anything is evaluated
+            def assign_name(env):
+                env.check_assign(name)
+                env.assign(name, expression(env))
+            return assign_name
+
+        if id(assign) in self.resolver.constant_assignments:
+            def store_constant(env):
+                raise runtime.assign_to_constant()
+            return store_constant
+
+        depth, index = address
+        if depth == 0:
+            def store_slot(env):
+                env.slots[-1][index] = expression(env)
+            return store_slot
+
+        def store_outer_slot(env):
+            env.slots[-1 - depth][index] = expression(env)
+        return store_outer_slot
+
+    def visit_print(self, _print):
+        arguments = [self.compile(argument) for argument in _print.arguments]
+
+        output = self.output
+
+        def print_values(env):
+            print(*[format_value(argument(env)) for argument in arguments], file=output)
+        return print_values
+
+    def visit_return(self, _return):
+        if _return.expression is None:
+            return lambda env: (None,)
+
+        expression = self.compile(_return.expression)
+        return lambda env: (expression(env),)
+
+    def visit_while(self, while_loop):
+        condition, body = self.compile(while_loop.expression), self.compile_block(while_loop.body)
+
+        def loop(env):
+            while condition(env):
+                result = body(env)
+                if result is not None:
+                    return result
+        return loop
+
+    def visit_conditional(self, conditional):
+        branches = [(self.compile(condition), self.compile_block(block))
+                    for condition, block in zip(conditional.conditions, conditional.blocks)]
+        # like the tree-walker, an elif chain without an else runs its last block when nothing holds
+        otherwise = None
+        if not conditional.is_single_if():
+            otherwise = self.compile_block(conditional.blocks[-1])
+
+        def branch(env):
+            for condition, block in branches:
+                if condition(env):
+                    return block(env)
+            if otherwise is not None:
+                return otherwise(env)
+        return branch
+
+    def visit_match(self, match):
+        if match.conditions is None:
+            return None
+
+        expressions = [self.compile(expression) for expression in match.expressions]
+        cases = []
+        default = None
+        for _return, case_conditions in match.conditions.items():
+            if not isinstance(case_conditions, list):
+                default = self.compile(_return)
+                break
+            if len(case_conditions) == len(expressions):
+                cases.append(([self.compile(condition) for condition in case_conditions], self.compile(_return)))
+
+        def match_values(env):
+            # the matched values are evaluated once, the conditions until one differs
+            values = [expression(env) for expression in expressions]
+            for conditions, _return in cases:
+                for condition, value in zip(conditions, values):
+                    if not value == condition(env):
+                        break
+                else:
+                    return _return(env)
+            if default is not None:
+                return default(env)
+        return match_values
+
+    def visit_function_call(self, function_call):
+        name, functions = function_call.identifier, self.functions
+        arguments = [self.compile(argument) for argument in function_call.arguments]
+
+        def call(env):
+            function = functions.get(name)
+            if function is None:
+                raise runtime.undefined_function(name)
+            return call_function(env, function, [argument(env) for argument in arguments])
+        return call
+
+    def visit_native_function(self, native_function, args):
+        pass
+
+    def visit_arguments(self, arguments):
+        pass
+
+    def visit_or_expression(self, or_expression):
+        expressions = [self.compile(expression) for expression in or_expression.expressions]
+        return lambda env: any([expression(env) for expression in expressions])
+
+    def visit_and_expression(self, and_expression):
+        expressions = [self.compile(expression) for expression in and_expression.expressions]
+        return lambda env: all([expression(env) for expression in expressions])
+
+    def visit_equal_expression(self, equal_expression):
+        return self.compile_binary(equal_expression.expressions, equal_expression.operators)
+
+    def visit_rel_expression(self, rel_expression):
+        return self.compile_binary(rel_expression.expressions, rel_expression.operators)
+
+    def visit_add_expression(self, add_expression):
+        return self.compile_binary(add_expression.expressions, add_expression.operators)
+
+    def visit_mult_expression(self, mult_expression):
+        return self.compile_binary(mult_expression.expressions, mult_expression.operators)
+
+    def visit_unary_expression(self, unary_expression):
+        return self.compile(unary_expression.expression)
+
+    def visit_not_expression(self, not_expression):
+        expression = self.compile(not_expression.expression)
+        if self.is_constant(expression):
+            return self.fold(operator.not_, expression)
+        return lambda env: not expression(env)
+
+    def visit_negative_expression(self, negative_expression):
+        expression = self.compile(negative_expression.expression)
+        if self.is_constant(expression):
+            folded = self.fold(runtime.negative, expression)
+            if folded is not None:
+                return folded
+        return lambda env: runtime.negative(expression(env))
+
+    def visit_parent_logic_expression(self, expression):
+        return self.compile(expression.expression)
+
+    def visit_variable(self, variable):
+        pass
+
+    def visit_identifier(self, identifier):
+        name = identifier.name
+
+        address = self.resolver.addresses.get(id(identifier))
+        if address is None:
+            return lambda env: env.lookup(name)
+
+        depth, index = address
+        if depth == 0:
+            return lambda env: env.slots[-1][index]
+        return lambda env: env.slots[-1 - depth][index]
+
+    def visit_literal(self, literal):
+        return self.constant(literal_value(literal))
+
+    visit_bool = visit_int = visit_string = visit_float = visit_literal
+
+    def visit_equal_operator(self, equal_operator, left=None, right=None):
+        if self.is_constant(left, right):
+            return self.fold(operator.eq, left, right)
+        return lambda env: left(env) == right(env)
+
+    def visit_not_equal_operator(self, not_eq_operator, left=None, right=None):
+        if self.is_constant(left, right):
+            return self.fold(operator.ne, left, right)
+        return lambda env: left(env) != right(env)
+
+    def visit_greater_equal_operator(self, ge_operator, left, right):
+        return self.compile_comparison("greater_equal", left, right)
+
+    def visit_greater_operator(self, gt_operator, left, right):
+        return self.compile_comparison("greater", left, right)
+
+    def visit_less_equal_operator(self, le_operator, left, right):
+        return self.compile_comparison("less_equal", left, right)
+
+    def visit_less_operator(self, lt_operator, left, right):
+        return self.compile_comparison("less", left, right)
+
+    def visit_plus_operator(self, plus_operator, left, right):
+        return self.compile_arithmetic("add", left, right)
+
+    def visit_minus_operator(self, minus_operator, left, right):
+        return self.compile_arithmetic("subtract", left, right)
+
+    def visit_multiply_operator(self, mult_operator, left, right):
+        return self.compile_arithmetic("multiply", left, right)
+
+    def visit_divide_operator(self, div_operator, left, right):
+        if self.is_constant(left, right):
+            folded = self.fold(runtime.divide, left, right)
+            if folded is not None:
+                return folded
+        return lambda env: runtime.divide(left(env), right(env))
+
+    def visit_not_operator(self, not_operator, value=None):
+        pass
+
+    def visit_negative_operator(self, neg_operator, value=None):
+        pass
+
+    def visit_or_operator(self, or_operator):
+        pass
+
+    def visit_and_operator(self, and_operator):
+        pass
+
+
+class ClosureEngine:
+
+    def __init__(self, program: Program, output=None):
+        self.program = program
+        self.main_function = runtime.check_main(program)[runtime.MAIN_FUNCTION]
+
+        resolver = Resolver().resolve_program(program)
+        self.functions = {}
+        self.functions.update(ClosureCompiler(self.functions, resolver, output).compile_program(program))
+
+        self.env = SlotScopes()
+
+    def execute(self):
+        runtime.check_main_parameters(self.main_function)
+        return call_function(self.env, self.functions[runtime.MAIN_FUNCTION], [])
@@ -0,0 +1,361 @@
+from _interpreter.runtime import literal_value, parameter_list
+from _optimizer.nodes import is_literal
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.statements.match import Match
+from tree.visitor import Visitor
+
+
+# Every instruction takes two words: the opcode and its argument (0 when unused).
+# Jump arguments are absolute indices into the instruction list.
+(
+    LOAD_CONST, LOAD_NAME, STORE_LET, STORE_CONST, STORE_NAME, CHECK_NAME,
+    ADD, SUBTRACT, MULTIPLY, DIVIDE,
+    EQUAL, NOT_EQUAL, LESS, LESS_EQUAL, GREATER, GREATER_EQUAL,
+    AND, OR, NOT, NEGATIVE,
+    JUMP, JUMP_IF_FALSE,
+    PUSH_SCOPE, POP_SCOPE,
+    CALL, POP, PRINT, RETURN, RETURN_NONE,
+) = range(29)
+
+OPCODE_NAMES = [
+    "LOAD_CONST", "LOAD_NAME", "STORE_LET", "STORE_CONST", "STORE_NAME", "CHECK_NAME",
+    "ADD", "SUBTRACT", "MULTIPLY", "DIVIDE",
+    "EQUAL", "NOT_EQUAL", "LESS", "LESS_EQUAL", "GREATER", "GREATER_EQUAL",
+    "AND", "OR", "NOT", "NEGATIVE",
+    "JUMP", "JUMP_IF_FALSE",
+    "PUSH_SCOPE", "POP_SCOPE",
+    "CALL", "POP", "PRINT", "RETURN", "RETURN_NONE",
+]
+
+
+class CodeObject:
+    __slots__ = ("name", "parameters", "instructions", "constants", "names", "calls")
+
+    def __init__(self, name, parameters):
+        self.name = name
+        self.parameters = parameters
+        self.instructions = []
+        self.constants = []
+        self.names = []
+        # (function name, argument count) for every CALL
+        self.calls = []
+
+    def __repr__(self):
+        return f"CodeObject: {self.name}, {len(self.instructions) // 2} instructions"
+
+
+def disassemble(code):
+    lines = []
+    instructions = code.instructions
+
+    for index in range(0, len(instructions), 2):
+        opcode, argument = instructions[index], instructions[index + 1]
+        name = OPCODE_NAMES[opcode]
+
+        if opcode == LOAD_CONST:
+            detail = repr(code.constants[argument])
+        elif opcode in (LOAD_NAME, STORE_LET, STORE_CONST, STORE_NAME, CHECK_NAME):
+            detail = code.names[argument]
+        elif opcode == CALL:
+            detail = "{}/{}".format(*code.calls[argument])
+        else:
+            detail = str(argument)
+
+        lines.append(f"{index:>5} {name:<14} {detail}")
+
+    return "\n".join(lines)
+
+
+def declares_names(block):
+    return block is not None and any(isinstance(statement, (Let, Const, Match)) for statement in block.statements)
+
+
+class Compiler(Visitor):
+
+    def __init__(self):
+        self.code = None
+        self.constant_indices = {}
+        self.name_indices = {}
+        self.match_count = 0
+        # {name: is_const} of the variables declared so far in each scope the code pushes
+        self.scopes = []
+
+    def compile_program(self, program):
+        return {function.identifier: self.compile_function(function) for function in program.functions}
+
+    def compile_function(self, function):
+        self.code = CodeObject(function.identifier, parameter_list(function))
+        self.constant_indices = {}
+        self.name_indices = {}
+        self.match_count = 0
+        self.scopes = [dict(self.code.parameters)]
+
+        function.accept(self)
+        return self.code
+
+    def emit(self, opcode, argument=0):
+        self.code.instructions += (opcode, argument)
+        return len(self.code.instructions) - 1
+
+    def position(self):
+        return len(self.code.instructions)
+
+    def patch(self, index, target):
+        self.code.instructions[index] = target
+
+    def constant(self, value):
+        # 1 and 1.0 and True are equal as keys, the type keeps them apart
+        key = (value.__class__, value)
+        if key not in self.constant_indices:
+            self.constant_indices[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return self.constant_indices[key]
+
+    def name(self, name):
+        if name not in self.name_indices:
+            self.name_indices[name] = len(self.code.names)
+            self.code.names.append(name)
+        return self.name_indices[name]
+
+    def is_variable(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return not scope[name]
+        return False
+
+    def compile_block(self, block):
+        if block is None:
+            return
+
+        # a block without declarations of its own can share the enclosing scope
+        scoped = declares_names(block)
+        if scoped:
+            self.emit(PUSH_SCOPE)
+            self.scopes.append({})
+        block.accept(self)
+        if scoped:
+            self.emit(POP_SCOPE)
+            self.scopes.pop()
+
+    def compile_expressions(self, expressions, operators):
+        expressions[0].accept(self)
+        for expression, operator in zip(expressions[1:], operators):
+            expression.accept(self)
+            operator.accept(self, None, None)
+
+    def visit_program(self, program):
+        pass
+
+    def visit_function(self, function):
+        self.compile_block(function.body)
+        self.emit(RETURN_NONE)
+
+    def visit_parameters(self, parameters):
+        pass
+
+    def visit_block(self, block, scope=None):
+        for statement in block.statements:
+            statement.accept(self)
+            if isinstance(statement, FunctionCall):
+                self.emit(POP)
+
+    def visit_statement(self, statement):
+        pass
+
+    def visit_comment(self, comment):
+        pass
+
+    def visit_let(self, let):
+        let.expression.accept(self)
+        self.emit(STORE_LET, self.name(let.identifier))
+        self.scopes[-1][let.identifier] = False
+
+    def visit_const(self, const):
+        const.expression.accept(self)
+        self.emit(STORE_CONST, self.name(const.identifier))
+        self.scopes[-1][const.identifier] = True
+
+    def visit_assign(self, assign):
+        # like the tree-walker, the target is checked before the value is evaluated,
+        # unless it is a variable this code already declared or the value can't fail
+        if not self.is_variable(assign.identifier) and not is_literal(assign.expression):
+            self.emit(CHECK_NAME, self.name(assign.identifier))
+        assign.expression.accept(self)
+        self.emit(STORE_NAME, self.name(assign.identifier))
+
+    def visit_print(self, _print):
+        for argument in _print.arguments:
+            argument.accept(self)
+        self.emit(PRINT, len(_print.arguments))
+
+    def visit_return(self, _return):
+        if _return.expression is None:
+            self.emit(RETURN_NONE)
+        else:
+            _return.expression.accept(self)
+            self.emit(RETURN)
+
+    def visit_while(self, while_loop):
+        start = self.position()
+        while_loop.expression.accept(self)
+        exit_jump = self.emit(JUMP_IF_FALSE)
+        self.compile_block(while_loop.body)
+        self.emit(JUMP, start)
+        self.patch(exit_jump, self.position())
+
+    def visit_conditional(self, conditional):
+        end_jumps = []
+
+        for condition, block in zip(conditional.conditions, conditional.blocks):
+            condition.accept(self)
+            next_jump = self.emit(JUMP_IF_FALSE)
+            self.compile_block(block)
+            end_jumps.append(self.emit(JUMP))
+            self.patch(next_jump, self.position())
+
+        # like the tree-walker, an elif chain without an else runs its last block when nothing holds
+        if not conditional.is_single_if():
+            self.compile_block(conditional.blocks[-1])
+
+        for jump in end_jumps:
+            self.patch(jump, self.position())
+
+    def visit_match(self, match):
+        if match.conditions is None:
+            return
+
+        # the matched values are evaluated once into names no identifier can take
+        self.match_count += 1
+        names = [self.name(f"$match{self.match_count}_{index}") for index in range(len(match.expressions))]
+        for expression, name in zip(match.expressions, names):
+            expression.accept(self)
+            self.emit(STORE_LET, name)
+
+        end_jumps = []
+        for _return, case_conditions in match.conditions.items():
+            if not isinstance(case_conditions, list):
+                # default
+                _return.accept(self)
+                break
+            if len(case_conditions) != len(names):
+                continue
+
+            next_jumps = []
+            for condition, name in zip(case_conditions, names):
+                self.emit(LOAD_NAME, name)
+                condition.accept(self)
+                self.emit(EQUAL)
+                next_jumps.append(self.emit(JUMP_IF_FALSE))
+
+            _return.accept(self)
+            end_jumps.append(self.emit(JUMP))
+            for jump in next_jumps:
+                self.patch(jump, self.position())
+
+        for jump in end_jumps:
+            self.patch(jump, self.position())
+
+    def visit_function_call(self, function_call):
+        for argument in function_call.arguments:
+            argument.accept(self)
+
+        self.code.calls.append((function_call.identifier, len(function_call.arguments)))
+        self.emit(CALL, len(self.code.calls) - 1)
+
+    def visit_native_function(self, native_function, args):
+        pass
+
+    def visit_arguments(self, arguments):
+        for argument in arguments.arguments:
+            argument.accept(self)
+
+    def visit_or_expression(self, or_expression):
+        for expression in or_expression.expressions:
+            expression.accept(self)
+        self.emit(OR, len(or_expression.expressions))
+
+    def visit_and_expression(self, and_expression):
+        for expression in and_expression.expressions:
+            expression.accept(self)
+        self.emit(AND, len(and_expression.expressions))
+
+    def visit_equal_expression(self, equal_expression):
+        self.compile_expressions(equal_expression.expressions, equal_expression.operators)
+
+    def visit_rel_expression(self, rel_expression):
+        self.compile_expressions(rel_expression.expressions, rel_expression.operators)
+
+    def visit_add_expression(self, add_expression):
+        self.compile_expressions(add_expression.expressions, add_expression.operators)
+
+    def visit_mult_expression(self, mult_expression):
+        self.compile_expressions(mult_expression.expressions, mult_expression.operators)
+
+    def visit_unary_expression(self, unary_expression):
+        unary_expression.expression.accept(self)
+
+    def visit_not_expression(self, not_expression):
+        not_expression.expression.accept(self)
+        self.emit(NOT)
+
+    def visit_negative_expression(self, negative_expression):
+        negative_expression.expression.accept(self)
+        self.emit(NEGATIVE)
+
+    def visit_parent_logic_expression(self, expression):
+        expression.expression.accept(self)
+
+    def visit_variable(self, variable):
+        pass
+
+    def visit_identifier(self, identifier):
+        self.emit(LOAD_NAME, self.name(identifier.name))
+
+    def visit_literal(self, literal):
+        self.emit(LOAD_CONST, self.constant(literal_value(literal)))
+
+    visit_bool = visit_int = visit_string = visit_float = visit_literal
+
+    def visit_equal_operator(self, equal_operator, left_value=None, right_value=None):
+        self.emit(EQUAL)
+
+    def visit_not_equal_operator(self, not_eq_operator, left_value=None, right_value=None):
+        self.emit(NOT_EQUAL)
+
+    def visit_greater_equal_operator(self, ge_operator, left_value, right_value):
+        self.emit(GREATER_EQUAL)
+
+    def visit_greater_operator(self, gt_operator, left_value, right_value):
+        self.emit(GREATER)
+
+    def visit_less_equal_operator(self, le_operator, left_value, right_value):
+        self.emit(LESS_EQUAL)
+
+    def visit_less_operator(self, lt_operator, left_value, right_value):
+        self.emit(LESS)
+
+    def visit_plus_operator(self, plus_operator, left_value, right_value):
+        self.emit(ADD)
+
+    def visit_minus_operator(self, minus_operator, left_value, right_value):
+        self.emit(SUBTRACT)
+
+    def visit_multiply_operator(self, mult_operator, left_value, right_value):
+        self.emit(MULTIPLY)
+
+    def visit_divide_operator(self, div_operator, left_value, right_value):
+        self.emit(DIVIDE)
+
+    def visit_not_operator(self, not_operator, value=None):
+        self.emit(NOT)
+
+    def visit_negative_operator(self, neg_operator, value=None):
+        self.emit(NEGATIVE)
+
+    def visit_or_operator(self, or_operator):
+        pass
+
+    def visit_and_operator(self, and_operator):
+        pass
@@ -1,18 +1,24 @@
 from abc import ABC
-
+import operator
+
+from _interpreter import runtime
+from _interpreter.closures import ClosureEngine
+from _interpreter.memo import MEMO_SIZE, MISSING, MemoCache
+from _interpreter.transpiler import PythonEngine
+from _interpreter.vm import STACK_BUDGET, StackMachine, VirtualMachine
+from _optimizer.optimizer import NO_OPTIMIZATION, Optimizer
+from _optimizer.purity import PurityAnalysis
+from _optimizer.tail_calls import tail_calls
 from exceptions.interpreter_exception import InterpreterException
+from interpreter_tree.builtins import BUILTINS
+from interpreter_tree.call import NativeFunction
 from interpreter_tree.environment import Environment
+from interpreter_tree.frame import RETURN, Frame
 from tree.block import Block
-from tree.bool import Bool
 from tree.expressions.add_expression import AddExpression
 from tree.expressions.multiply_expression import MultiplyExpression
-from tree.expressions.parent_logic_expression import ParentLogicExpression
-from tree.expressions.unary_expression import UnaryExpression
-from tree.float import Float
 from tree.function import Function
 from tree.functions.parameters import Parameters
-from tree.identifier import Identifier
-from tree.int import Int
 from tree.program import Program
 from tree.statements._print import Print
 from tree.statements._return import Return
@@ -26,24 +32,57 @@ from tree.variable import Variable
 from tree.visitor import Visitor
 
 
+ENGINES = {
+    "closure": ClosureEngine,
+    "bytecode": VirtualMachine,
+    "python": PythonEngine,
+    "stack": StackMachine,
+}
+
+
 class Interpreter(Visitor):
 
-    def __init__(self, program: Program):
-        self.program = program
+    def __init__(self, program: Program, engine="tree", optimization_level=NO_OPTIMIZATION, memo_size=MEMO_SIZE,
+                 stack_budget=STACK_BUDGET, builtins=BUILTINS, output=None):
+        self.program = Optimizer(optimization_level).optimize(program)
         self.main_function = "main"
-        self.env = Environment()
+        self.env = Environment(builtins)
+        # where print writes, sys.stdout when None
+        self.output = output
 
         self.move_program_objects()
 
-    def execute(self):
-        self.program.accept(self)
+        # the tree-walker itself, or a compiled engine running the same program
+        if engine != "tree" and engine not in ENGINES:
+            raise InterpreterException(f"Unknown engine: {engine}.")
+        if engine == "stack":
+            self.engine = StackMachine(self.program, stack_budget, output)
+        else:
+            self.engine = ENGINES[engine](self.program, output) if engine in ENGINES else None
+
+        # results of pure functions, kept between runs as they can't change
+        self.memo = MemoCache(memo_size)
+        self.memoize = True
+        self.pure_functions = PurityAnalysis().pure_functions(self.program) if self.engine is None else set()
+        # `r = f(...); return r;` inside f runs as a loop
+        self.tail_calls = tail_calls(self.program) if self.engine is None else set()
+
+    def execute(self, memoize=True):
+        if self.engine is not None:
+            return self.engine.execute()
+        self.memoize = memoize
+        return self.program.accept(self)
 
     def move_program_objects(self):
         if not hasattr(self.program, "functions"):
             raise InterpreterException("No main function found!")
 
+        # calls look functions up apart from variables, as the compiled engines do,
+        # so a variable can't hide a function of the same name
+        self.functions = {}
         for function in self.program.functions:
-            self.env.add_variable(Variable(function.identifier, value=function))
+            self.functions[function.identifier] = Variable(function.identifier, value=function)
+            self.env.add_variable(self.functions[function.identifier])
 
         if not hasattr(self.env.get_variable(self.main_function), "value"):
             raise InterpreterException("No main function found!")
@@ -54,11 +93,17 @@ class Interpreter(Visitor):
         if main_function.parameters is not None:
             raise InterpreterException("Main function should have exactly 0 parameters!")
 
-        main_function.accept(self)
+        return main_function.accept(self)
 
     def visit_function(self, function: Function):
         if function.identifier == self.main_function:
-            function.body.accept(self)
+            self.env.push_scope()
+            frame = Frame(function, self.env.get_scope())
+            self.env.push_frame(frame)
+            function.body.accept(self, frame.scope)
+            self.env.pop_frame()
+            self.env.pop_scope()
+            return frame.return_value
         else:
             function.parameters.accept(self)
             function.body.accept(self)
@@ -71,41 +116,40 @@ class Interpreter(Visitor):
             self.env.add_variable(var)
 
     def visit_block(self, block: Block, scope=None):
-        if len(block.statements) == 0:
-            raise InterpreterException("Missing function body.")
-
-        self.env.push_scope(scope)
+        # the scope of a call is already on top, a block declaring nothing can use
+        # the one it runs in, any other takes one from the pool
+        own_scope = scope is None and block.declarations
+        if own_scope:
+            self.env.push_scope()
 
-        for statement in block.statements:
-            statement.accept(self)
-            if self.env.get_returned()[0]:
-                break
-        self.env.pop_scope()
+        signal = None
+        frame = self.env.frame
+        if block.can_return:
+            for statement in block.statements:
+                frame.statement = statement
+                if statement.accept(self) is RETURN:
+                    signal = RETURN
+                    break
+        else:
+            for statement in block.statements:
+                frame.statement = statement
+                statement.accept(self)
+        if own_scope:
+            self.env.pop_scope()
+        return signal
 
     def visit_variable_definition(self, var: Variable):
         var = var.accept(self)
 
     def visit_parent_logic_expression(self, expression):
-        return expression
+        return expression.expression.accept(self)
 
     def visit_let(self, let: Let):
-        if hasattr(let.expression, "expression") and isinstance(let.expression.expression, Identifier):
-            right_variable = self.env.get_variable(let.expression.expression.name)
-            let_var = Let(let.identifier, right_variable.expression.expression)
-            self.env.add_variable(let_var)
-            return
-
         val = let.expression.accept(self)
         let_var = Let(let.identifier, val)
         self.env.add_variable(let_var)
 
     def visit_const(self, const: Const):
-        if hasattr(const.expression, "expression") and isinstance(const.expression.expression, Identifier):
-            right_variable = self.env.get_variable(const.expression.expression.name)
-            const_var = Const(const.identifier, right_variable.expression.expression)
-            self.env.add_variable(const_var)
-            return
-
         val = const.expression.accept(self)
         const_var = Const(const.identifier, val)
         self.env.add_variable(const_var)
@@ -114,32 +158,15 @@ class Interpreter(Visitor):
         pass
 
     def visit_identifier(self, identifier):
-        pass
+        if var := self.env.get_variable(identifier.name):
+            return var.expression
+        raise runtime.undefined_variable(identifier.name)
 
     def visit_add_expression(self, add_expression):
-        left_value = add_expression.expressions[0].accept(self)
-
-        if hasattr(left_value, "expression") and isinstance(left_value.expression, Identifier):
-            left_value = self.env.get_variable(left_value.expression.name).expression
-
-        for i in range(1, len(add_expression.expressions)):
-            right_value = add_expression.expressions[i].accept(self)
-            if hasattr(right_value, "expression") and isinstance(right_value.expression, Identifier):
-                right_value = self.env.get_variable(right_value.expression.name).expression
-            current_operator = add_expression.operators[i - 1]
-            left_value = current_operator.accept(self, left_value, right_value)
-
-        return left_value
+        return self.visit_operators(add_expression.expressions, add_expression.operators)
 
     def visit_and_expression(self, and_expression):
-        left_value = and_expression.expressions[0].accept(self)
-
-        for i in range(1, len(and_expression.expressions)):
-            expression = and_expression.expressions[i]
-            right_value = expression.accept(self)
-            left_value = Bool(left_value.value and right_value.value)
-
-        return left_value
+        return all([expression.accept(self) for expression in and_expression.expressions])
 
     def visit_and_operator(self, and_operator):
         # No need to visit this
@@ -152,337 +179,188 @@ class Interpreter(Visitor):
         pass
 
     def visit_conditional(self, conditional):
-        block_chosen = False
-
         for i, condition in enumerate(conditional.conditions):
-            condition_value = condition.accept(self)
-
-            if condition_value.value:
-                conditional.blocks[i].accept(self)
-                block_chosen = True
-                break
+            if condition.accept(self):
+                return conditional.blocks[i].accept(self)
 
-        if not block_chosen and not conditional.is_single_if():
-            conditional.blocks[-1].accept(self)
+        if not conditional.is_single_if():
+            return conditional.blocks[-1].accept(self)
 
     def visit_divide_operator(self, div_operator, left_value, right_value):
-        left_literal, right_literal = left_value, right_value
-
-        if not isinstance(left_literal, ParentLogicExpression):
-            left_literal = self.to_parent_logic(left_literal)
-        if not isinstance(right_literal, ParentLogicExpression):
-            right_literal = self.to_parent_logic(right_literal)
-
-        result = None
-
-        if hasattr(right_literal, "value") and right_literal.value == 0:
-            raise ArithmeticError("Division by zero")
-
-        if any([isinstance(left_literal.expression, cls) for cls in [Int, Float]]) and \
-                any([isinstance(right_literal.expression, cls) for cls in [Int, Float]]):
-            result_val = left_literal.expression.value / right_literal.expression.value
-
-            if isinstance(result_val, int):
-                result = ParentLogicExpression(Int(result_val))
-            elif isinstance(result_val, float):
-                result = ParentLogicExpression(Float(result_val))
-
-        elif not result:
-            exc_message = f"Cannot divide operands of types {type(left_literal)} and {type(right_literal)}"
-            raise InterpreterException(message=exc_message)
-
-        return result
+        return runtime.divide(left_value, right_value)
 
     def visit_equal_expression(self, equal_expression):
-        left_value = equal_expression.expressions[0].accept(self)
-        right_value = equal_expression.expressions[1].accept(self)
-
-        if isinstance(left_value.expression, Identifier):
-            left_value = self.env.get_variable(left_value.expression.name)
-            left_value = left_value.expression
-
-        result = equal_expression.operators[0].accept(self, left_value, right_value)
-        return result
+        return self.visit_operators(equal_expression.expressions, equal_expression.operators)
 
     def visit_negative_expression(self, negative_expression):
-        return negative_expression
+        return runtime.negative(negative_expression.expression.accept(self))
 
     def visit_equal_operator(self, equal_operator, left_value, right_value):
-        return Bool(left_value.expression.value == right_value.expression.value)
+        return left_value == right_value
 
     def visit_function_call(self, function_call: FunctionCall):
 
         func_name = function_call.identifier
-        if function := self.env.get_variable(func_name):
-            self.env.push_scope()
-            func_call_args = function_call.arguments
-            func_parameters = function.value.parameters
+        if function := self.functions.get(func_name) or self.env.builtins.get_variable(func_name):
+            if isinstance(function.value, NativeFunction):
+                return self.call_native(func_name, function.value, function_call.arguments)
+            values = self.evaluate_arguments(function.value, function_call.arguments)
+
+            memo_key = None
+            if self.memoize and func_name in self.pure_functions:
+                memo_key = MemoCache.key(func_name, values)
+                returned = self.memo.get(memo_key)
+                if returned is not MISSING:
+                    return returned
 
-            for key, value in func_parameters.items():
-                idx = 0
-                if value.name == "LET":
-                    let_var = Let(key, func_call_args[idx].accept(self))
-                    self.env.add_variable(let_var)
-                elif value.name == "CONST":
-                    const_var = Const(key, func_call_args[idx].accept(self))
-                    self.env.add_variable(const_var)
-                idx += 1
+            self.env.push_scope()
+            frame = Frame(function.value, self.env.get_scope())
+            for key, value in zip(function.value.parameters, values):
+                self.declare_parameter(function.value, key, value)
+
+            self.env.push_frame(frame)
+            self.run_body(frame)
+            self.env.pop_frame()
+            # AUDIT: deleting scope
+            self.env.pop_scope()
+
+            if memo_key is not None:
+                self.memo.put(memo_key, frame.return_value)
+            return frame.return_value
+        raise runtime.undefined_function(func_name)
+
+    def evaluate_arguments(self, function, arguments):
+        # in the caller's scope, before any parameter exists
+        runtime.check_arguments(function.identifier, runtime.parameter_list(function), arguments)
+        return [argument.accept(self) for argument in arguments]
+
+    def call_native(self, name, native_function, arguments):
+        runtime.check_arguments(name, range(native_function.arity), arguments)
+        return native_function.accept(self, [argument.accept(self) for argument in arguments])
+
+    def declare_parameter(self, function, key, value):
+        if function.parameters[key].name == "LET":
+            let_var = Let(key, value)
+            self.env.add_variable(let_var)
+        elif function.parameters[key].name == "CONST":
+            const_var = Const(key, value)
+            self.env.add_variable(const_var)
 
-            function.value.body.accept(self, self.env.get_scope())
+    def run_body(self, frame):
+        function = frame.function
+        function.body.accept(self, frame.scope)
 
-        # AUDIT: deleting scope
-        self.env.pop_scope()
-        return self.env.get_returned()[-1]
+        # a tail call ends the body with the new arguments, which replace everything in the scope
+        while frame.tail_call is not None:
+            values, frame.tail_call = frame.tail_call, None
+            frame.return_value = None
+            frame.scope.clear()
+            for key, value in zip(function.parameters, values):
+                self.declare_parameter(function, key, value)
+            function.body.accept(self, frame.scope)
 
     def visit_greater_equal_operator(self, ge_operator, left_value, right_value):
-        return Bool(left_value.expression.value >= right_value.expression.value)
+        return runtime.compare(operator.ge, left_value, right_value)
 
     def visit_greater_operator(self, gt_operator, left_value, right_value):
-        return Bool(left_value.expression.value > right_value.expression.value)
+        return runtime.compare(operator.gt, left_value, right_value)
 
     def visit_less_equal_operator(self, le_operator, left_value, right_value):
-        return Bool(left_value.expression.value <= right_value.expression.value)
+        return runtime.compare(operator.le, left_value, right_value)
 
     def visit_less_operator(self, lt_operator, left_value, right_value):
-        return Bool(left_value.expression.value < right_value.expression.value)
+        return runtime.compare(operator.lt, left_value, right_value)
 
     def visit_minus_operator(self, minus_operator, left_value, right_value):
-        left_literal, right_literal = left_value, right_value
-
-        result = None
-
-        if not isinstance(left_literal, ParentLogicExpression):
-            left_literal = self.to_parent_logic(left_literal)
-        if not isinstance(right_literal, ParentLogicExpression):
-            right_literal = self.to_parent_logic(right_literal)
-
-        if any([isinstance(left_literal.expression, cls) for cls in [Int, Float]]) and \
-                any([isinstance(right_literal.expression, cls) for cls in [Int, Float]]):
-
-            result_val = left_literal.expression.value - right_literal.expression.value
-
-            if isinstance(result_val, int):
-                result = ParentLogicExpression(Int(result_val))
-            elif isinstance(result_val, float):
-                result = ParentLogicExpression(Float(result_val))
-
-        elif not result:
-            exc_message = f"Cannot substract operands of types {type(left_literal)} and {type(right_literal)}"
-            raise InterpreterException(message=exc_message)
-
-        return result
+        return runtime.subtract(left_value, right_value)
 
     def visit_mult_expression(self, mult_expression):
-        left_value = mult_expression.expressions[0].accept(self)
-
-        if hasattr(left_value, "expression") and isinstance(left_value.expression, Identifier):
-            left_value = self.env.get_variable(left_value.expression.name).expression
-
-        for i in range(1, mult_expression.get_num_expressions()):
-            right_value = mult_expression.expressions[i].accept(self)
-            if hasattr(right_value, "expression") and isinstance(right_value.expression, Identifier):
-                right_value = self.env.get_variable(right_value.expression.name).expression
-            current_operator = mult_expression.operators[i - 1]
-            left_value = current_operator.accept(self, left_value, right_value)
-
-        return left_value
+        return self.visit_operators(mult_expression.expressions, mult_expression.operators)
 
     def visit_multiply_operator(self, mult_operator, left_value, right_value):
-        left_literal, right_literal = left_value, right_value
+        return runtime.multiply(left_value, right_value)
 
-        if isinstance(left_literal, UnaryExpression):
-            a = left_literal.expression.accept(self)
-            a.expression.value *= -1
-            left_literal = ParentLogicExpression(a.expression)
+    def visit_operators(self, expressions, operators):
+        # values are plain Python objects, operators fold them from the left
+        left_value = expressions[0].accept(self)
 
-        if isinstance(right_literal, UnaryExpression):
-            a = right_literal.expression.accept(self)
-            a.expression.value *= -1
-            right_literal = ParentLogicExpression(a.expression)
+        for i in range(1, len(expressions)):
+            right_value = expressions[i].accept(self)
+            left_value = operators[i - 1].accept(self, left_value, right_value)
 
-        result = None
-
-        if not isinstance(left_literal, ParentLogicExpression):
-            left_literal = self.to_parent_logic(left_literal)
-        if not isinstance(right_literal, ParentLogicExpression):
-            right_literal = self.to_parent_logic(right_literal)
-
-        if any([isinstance(left_literal.expression, cls) for cls in [Int, Float]]) and \
-                any([isinstance(right_literal.expression, cls) for cls in [Int, Float]]):
-
-            result_val = left_literal.expression.value * right_literal.expression.value
-
-            if isinstance(result_val, int):
-                result = ParentLogicExpression(Int(result_val))
-            elif isinstance(result_val, float):
-                result = ParentLogicExpression(Float(result_val))
-
-        elif not result:
-            exc_message = f"Cannot multiply operands of types {type(left_literal)} and {type(right_literal)}"
-            raise InterpreterException(message=exc_message)
-
-        return result
-
-    @staticmethod
-    def to_parent_logic(literal):
-        return ParentLogicExpression(literal)
+        return left_value
 
     def visit_assign(self, assign):
         if var := self.env.get_variable(assign.identifier):
             if isinstance(var, Const):
                 raise InterpreterException("It's not possible to assign value to constant variable.")
-            func_call_expression = False
-            if hasattr(assign.expression, "expression"):
-                func_call_expression = isinstance(assign.expression.expression, FunctionCall)
-                var.expression = assign.expression.expression.accept(self)
-            else:
-                var.expression = assign.expression.accept(self)
-            if func_call_expression:
-                self.env.returned = (False, None)
+            if id(assign) in self.tail_calls:
+                # the arguments are evaluated as for any call, then the body unwinds like on return
+                call = assign.expression.expression
+                frame = self.env.frame
+                frame.tail_call = self.evaluate_arguments(self.functions[call.identifier].value, call.arguments)
+                return RETURN
+            var.expression = assign.expression.accept(self)
         else:
             raise InterpreterException("Can't assign not created variable.")
 
     def visit_native_function(self, native_function, args):
-        value = native_function.call_func(*args)
-        if value:
-            self.env.set_returned(fact=True, value=value)
+        return native_function.call_func(*args)
 
     def visit_negative_operator(self, neg_operator, value=None):
-        if isinstance(value, Int):
-            internal_value = (-1) * value.value
-            result = Int(internal_value)
-        elif isinstance(value, Float):
-            internal_value = (-1) * value.value
-            result = Float(internal_value)
-        else:
-            raise InterpreterException("Cannot apply negative operator to object other that int or float")
-
-        return result
+        return runtime.negative(value)
 
     def visit_not_equal_operator(self, not_eq_operator, left_value, right_value):
-        return Bool(left_value.expression.value != right_value.expression.value)
+        return left_value != right_value
 
-    def visit_not_operator(self, not_operator, expression):
-        return Bool(not expression.expression.value)
+    def visit_not_operator(self, not_operator, value):
+        return not value
 
     def visit_or_expression(self, or_expression):
-        left_value = or_expression.expressions[0].accept(self)
-
-        for i in range(1, len(or_expression.expressions)):
-            expression = or_expression.expressions[i]
-            right_value = expression.accept(self)
-            left_value = Bool(left_value.expression.value or right_value.expression.value)
-
-        return left_value
+        return any([expression.accept(self) for expression in or_expression.expressions])
 
     def visit_or_operator(self, or_operator):
         # No need to visit this
         pass
 
     def visit_plus_operator(self, plus_operator, left_value, right_value):
-        left_literal, right_literal = left_value, right_value
-
-        if isinstance(left_literal, UnaryExpression):
-            a = left_literal.expression.accept(self)
-            a.expression.value *= -1
-            left_literal = ParentLogicExpression(a.expression)
-
-        if isinstance(right_literal, UnaryExpression):
-            a = right_literal.expression.accept(self)
-            a.expression.value *= -1
-            right_literal = ParentLogicExpression(a.expression)
-
-        result = None
-
-        if not isinstance(left_literal, ParentLogicExpression):
-            left_literal = self.to_parent_logic(left_literal)
-        if not isinstance(right_literal, ParentLogicExpression):
-            right_literal = self.to_parent_logic(right_literal)
-
-        if any([isinstance(left_literal.expression, cls) for cls in [Int, Float]]) and \
-                any([isinstance(right_literal.expression, cls) for cls in [Int, Float]]):
-
-            result_val = left_literal.expression.value + right_literal.expression.value
-
-            if isinstance(result_val, int):
-                result = ParentLogicExpression(Int(result_val))
-            elif isinstance(result_val, float):
-                result = ParentLogicExpression(Float(result_val))
-
-        elif not result:
-            exc_message = f"Cannot add operands of types {type(left_literal)} and {type(right_literal)}"
-            raise InterpreterException(message=exc_message)
-
-        return result
+        return runtime.add(left_value, right_value)
 
     def visit_statement(self, statement):
         pass
 
     def visit_int(self, int_value):
-        return int_value
+        return int_value.value
 
     def visit_string(self, str_value):
-        return str_value
+        return str_value.value
 
     def visit_float(self, float_value):
-        return float_value
+        return float_value.value
 
     def visit_bool(self, bool_value):
-        return bool_value
+        return runtime.literal_value(bool_value)
 
     def visit_print(self, _print: Print):
-        values = []
-
-        for arg in _print.arguments:
-            if isinstance(arg.expression, Identifier):
-                var = self.env.get_variable(arg.expression.name)
-                values.append(str(var.expression))
-            else:
-                var = str(arg.expression)
-                values.append(str(var))
-            # else:
-            #     var = self.env.get_variable(arg.expression.value)
-            if var is None:
-                raise InterpreterException("Undefined variable.")
-
-        print(*values)
+        print(*[runtime.format_value(arg.accept(self)) for arg in _print.arguments], file=self.output)
 
     def visit_return(self, _return):
         if expression := _return.expression:
-            value = expression.accept(self)
-            self.env.set_returned(fact=True, value=value)
-        else:
-            self.env.set_returned(True)
+            self.env.frame.return_value = expression.accept(self)
+        return RETURN
 
     def visit_while(self, while_loop: While):
         condition, body = while_loop.expression, while_loop.body
 
-        while (not self.env.get_returned()[0]) and condition.accept(self).value:
-            body.accept(self)
+        while condition.accept(self):
+            if body.accept(self) is RETURN:
+                return RETURN
 
     def visit_rel_expression(self, rel_expression):
-        left_value = rel_expression.expressions[0].accept(self)
-        right_value = rel_expression.expressions[1].accept(self)
-
-        if isinstance(left_value.expression, Identifier):
-            left_value = self.env.get_variable(left_value.expression.name)
-            left_value = left_value.expression
-
-        result = rel_expression.operators[0].accept(self, left_value, right_value)
-        return result
+        return self.visit_operators(rel_expression.expressions, rel_expression.operators)
 
     def visit_unary_expression(self, unary_expression):
-        value = unary_expression.expression.expression
-        if isinstance(value, Int):
-            internal_value = (-1) * value.value
-            result = Int(internal_value)
-        elif isinstance(value, Float):
-            internal_value = (-1) * value.value
-            result = Float(internal_value)
-        else:
-            raise InterpreterException("Cannot apply negative operator to object other that int or float")
-
-        return result
+        return unary_expression.expression.accept(self)
 
     def visit_not_expression(self, not_expression):
-        pass
+        return not not_expression.expression.accept(self)
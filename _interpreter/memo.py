@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+# most results kept per interpreter
+MEMO_SIZE = 1024
+
+MISSING = object()
+
+
+class MemoCache:
+    # least recently used results of pure functions, keyed by the function
+    # name and the argument values
+
+    def __init__(self, size=MEMO_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(name, values):
+        # 1, 1.0 and true are equal as keys but don't give the same results,
+        # nor do 0.0 and -0.0, which only their hex tells apart
+        return name, tuple((value.__class__, value.hex() if value.__class__ is float else value) for value in values)
+
+    def get(self, key):
+        result = self.entries.get(key, MISSING)
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        if self.size <= 0:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,265 @@
+from _interpreter import runtime
+from _interpreter.runtime import parameter_list
+from tree.statements.const import Const
+from tree.statements.let import Let
+from tree.visitor import Visitor
+
+
+# Gives every variable a static (depth, index) address: depth counts the slot
+# scopes between the use and the declaration inside one function, index is the
+# position in that scope. A block only has a slot scope when it declares
+# something, the parameters of a function form the outermost one.
+# A name used in a function without being declared there may reach a variable
+# of a caller, so every variable with such a name stays dynamic and is looked
+# up by name.
+
+class Resolver(Visitor):
+
+    def __init__(self):
+        # keyed by id() of the Identifier, Let, Const and Assign nodes
+        self.addresses = {}
+        self.constant_assignments = set()
+        # keyed by id() of the blocks and functions that have a slot scope
+        self.scope_sizes = {}
+        self.dynamic = set()
+
+        self.declared = set()
+        self.free = []
+        self.function = None
+        self.scopes = []
+
+    def resolve_program(self, program):
+        # the free names found by the first walk decide which variables get slots
+        self.walk(program)
+        self.check_free_names()
+        self.dynamic = {name for name, _, _ in self.free}
+        self.walk(program)
+        return self
+
+    def walk(self, program):
+        self.addresses = {}
+        self.constant_assignments = set()
+        self.scope_sizes = {}
+        self.free = []
+        for function in program.functions:
+            function.accept(self)
+
+    def check_free_names(self):
+        for name, is_assign, function in self.free:
+            # main has no caller whose variables it could see
+            if name not in self.declared or function == runtime.MAIN_FUNCTION:
+                raise runtime.assign_to_undefined() if is_assign else runtime.undefined_variable(name)
+
+    def is_slot(self, name):
+        return name not in self.dynamic
+
+    def address(self, name):
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if name in scope:
+                return depth, scope[name]
+        return None
+
+    def declare(self, node, name, is_const):
+        self.declared.add(name)
+        if not self.is_slot(name):
+            return
+
+        scope = self.scopes[-1]
+        if name not in scope:
+            scope[name] = [len(scope), is_const]
+        scope[name][1] = is_const
+        self.addresses[id(node)] = (0, scope[name][0])
+
+    def use(self, node, name, is_assign=False):
+        found = self.address(name)
+        if found is None:
+            self.free.append((name, is_assign, self.function))
+            return
+        if not self.is_slot(name):
+            return
+
+        depth, (index, is_const) = found
+        self.addresses[id(node)] = (depth, index)
+        if is_assign and is_const:
+            self.constant_assignments.add(id(node))
+
+    def visit_program(self, program):
+        pass
+
+    def visit_function(self, function):
+        self.function = function.identifier
+        self.scopes = []
+
+        parameters = parameter_list(function)
+        if parameters:
+            # parameters keep their positions, dynamic ones leave a slot unused
+            self.scopes.append({name: [index, is_const] for index, (name, is_const) in enumerate(parameters)
+                                if self.is_slot(name)})
+            self.scope_sizes[id(function)] = len(parameters)
+            for name, _ in parameters:
+                self.declared.add(name)
+
+        if function.body is not None:
+            function.body.accept(self)
+
+    def visit_parameters(self, parameters):
+        pass
+
+    def visit_block(self, block, scope=None):
+        scoped = any(isinstance(statement, (Let, Const)) and self.is_slot(statement.identifier)
+                     for statement in block.statements)
+        if scoped:
+            self.scopes.append({})
+
+        for statement in block.statements:
+            statement.accept(self)
+
+        if scoped:
+            self.scope_sizes[id(block)] = len(self.scopes.pop())
+
+    def visit_statement(self, statement):
+        pass
+
+    def visit_comment(self, comment):
+        pass
+
+    def visit_let(self, let):
+        let.expression.accept(self)
+        self.declare(let, let.identifier, False)
+
+    def visit_const(self, const):
+        const.expression.accept(self)
+        self.declare(const, const.identifier, True)
+
+    def visit_assign(self, assign):
+        assign.expression.accept(self)
+        self.use(assign, assign.identifier, is_assign=True)
+
+    def visit_print(self, _print):
+        for argument in _print.arguments:
+            argument.accept(self)
+
+    def visit_return(self, _return):
+        if _return.expression is not None:
+            _return.expression.accept(self)
+
+    def visit_while(self, while_loop):
+        while_loop.expression.accept(self)
+        if while_loop.body is not None:
+            while_loop.body.accept(self)
+
+    def visit_conditional(self, conditional):
+        for condition in conditional.conditions:
+            condition.accept(self)
+        for block in conditional.blocks:
+            if block is not None:
+                block.accept(self)
+
+    def visit_match(self, match):
+        if match.conditions is None:
+            return
+
+        for expression in match.expressions:
+            expression.accept(self)
+        for _return, case_conditions in match.conditions.items():
+            if isinstance(case_conditions, list):
+                for condition in case_conditions:
+                    condition.accept(self)
+            _return.accept(self)
+
+    def visit_function_call(self, function_call):
+        for argument in function_call.arguments:
+            argument.accept(self)
+
+    def visit_native_function(self, native_function, args):
+        pass
+
+    def visit_arguments(self, arguments):
+        pass
+
+    def visit_expressions(self, expressions):
+        for expression in expressions:
+            expression.accept(self)
+
+    def visit_or_expression(self, or_expression):
+        self.visit_expressions(or_expression.expressions)
+
+    def visit_and_expression(self, and_expression):
+        self.visit_expressions(and_expression.expressions)
+
+    def visit_equal_expression(self, equal_expression):
+        self.visit_expressions(equal_expression.expressions)
+
+    def visit_rel_expression(self, rel_expression):
+        self.visit_expressions(rel_expression.expressions)
+
+    def visit_add_expression(self, add_expression):
+        self.visit_expressions(add_expression.expressions)
+
+    def visit_mult_expression(self, mult_expression):
+        self.visit_expressions(mult_expression.expressions)
+
+    def visit_unary_expression(self, unary_expression):
+        unary_expression.expression.accept(self)
+
+    def visit_not_expression(self, not_expression):
+        not_expression.expression.accept(self)
+
+    def visit_negative_expression(self, negative_expression):
+        negative_expression.expression.accept(self)
+
+    def visit_parent_logic_expression(self, expression):
+        expression.expression.accept(self)
+
+    def visit_variable(self, variable):
+        pass
+
+    def visit_identifier(self, identifier):
+        self.use(identifier, identifier.name)
+
+    def visit_literal(self, literal):
+        pass
+
+    visit_bool = visit_int = visit_string = visit_float = visit_literal
+
+    def visit_equal_operator(self, equal_operator, left_value=None, right_value=None):
+        pass
+
+    def visit_not_equal_operator(self, not_eq_operator, left_value=None, right_value=None):
+        pass
+
+    def visit_greater_equal_operator(self, ge_operator, left_value, right_value):
+        pass
+
+    def visit_greater_operator(self, gt_operator, left_value, right_value):
+        pass
+
+    def visit_less_equal_operator(self, le_operator, left_value, right_value):
+        pass
+
+    def visit_less_operator(self, lt_operator, left_value, right_value):
+        pass
+
+    def visit_plus_operator(self, plus_operator, left_value, right_value):
+        pass
+
+    def visit_minus_operator(self, minus_operator, left_value, right_value):
+        pass
+
+    def visit_multiply_operator(self, mult_operator, left_value, right_value):
+        pass
+
+    def visit_divide_operator(self, div_operator, left_value, right_value):
+        pass
+
+    def visit_not_operator(self, not_operator, value=None):
+        pass
+
+    def visit_negative_operator(self, neg_operator, value=None):
+        pass
+
+    def visit_or_operator(self, or_operator):
+        pass
+
+    def visit_and_operator(self, and_operator):
+        pass
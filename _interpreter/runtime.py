@@ -0,0 +1,196 @@
+from exceptions.interpreter_exception import InterpreterException
+from tree.bool import Bool
+from tree.float import Float
+from tree.int import Int
+from tree.string import String
+
+
+# Values are plain Python objects: int, float, str and bool. The compiled
+# engines share these helpers so they agree on the weak typing rules of the
+# tree-walker: arithmetic only works on numbers, conditions use truthiness.
+
+NUMBER_TYPES = frozenset((int, float))
+
+TYPE_NAMES = {int: "int", float: "float", str: "string", bool: "bool", type(None): "none"}
+
+MAIN_FUNCTION = "main"
+
+
+def literal_value(literal):
+    # Bool keeps the token text, so like in the tree-walker "false" is truthy
+    if isinstance(literal, Bool):
+        return bool(literal.value)
+    if isinstance(literal, (Int, Float, String)):
+        return literal.value
+    raise InterpreterException(f"Unknown literal {literal}.")
+
+
+def type_name(value):
+    return TYPE_NAMES.get(value.__class__, value.__class__.__name__)
+
+
+def format_value(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+
+def check_numbers(verb, left, right):
+    if left.__class__ not in NUMBER_TYPES or right.__class__ not in NUMBER_TYPES:
+        raise InterpreterException(f"Cannot {verb} operands of types {type_name(left)} and {type_name(right)}")
+
+
+def add(left, right):
+    check_numbers("add", left, right)
+    return left + right
+
+
+def subtract(left, right):
+    check_numbers("substract", left, right)
+    return left - right
+
+
+def multiply(left, right):
+    check_numbers("multiply", left, right)
+    return left * right
+
+
+def divide(left, right):
+    check_numbers("divide", left, right)
+    if right == 0:
+        raise ArithmeticError("Division by zero")
+    return left / right
+
+
+def negative(value):
+    if value.__class__ not in NUMBER_TYPES:
+        raise InterpreterException("Cannot apply negative operator to object other that int or float")
+    return -value
+
+
+def compare(operator, left, right):
+    try:
+        return operator(left, right)
+    except TypeError:
+        raise InterpreterException(f"Cannot compare operands of types {type_name(left)} and {type_name(right)}")
+
+
+def check_main(program):
+    if program is None or not hasattr(program, "functions"):
+        raise InterpreterException("No main function found!")
+
+    functions = {function.identifier: function for function in program.functions}
+    if MAIN_FUNCTION not in functions:
+        raise InterpreterException("No main function found!")
+
+    return functions
+
+
+def check_main_parameters(main_function):
+    if main_function.parameters is not None:
+        raise InterpreterException("Main function should have exactly 0 parameters!")
+
+
+def parameter_list(function):
+    # [(name, is_const)] in declaration order
+    return [(name, token_type.name == "CONST") for name, token_type in (function.parameters or {}).items()]
+
+
+def check_arguments(name, parameters, arguments):
+    if len(parameters) != len(arguments):
+        raise InterpreterException(f"Function {name} expects {len(parameters)} arguments, got {len(arguments)}.")
+
+
+def undefined_variable(name):
+    return InterpreterException(f"Undefined variable: {name}.")
+
+
+def undefined_function(name):
+    return InterpreterException(f"Undefined function: {name}.")
+
+
+def assign_to_constant():
+    return InterpreterException("It's not possible to assign value to constant variable.")
+
+
+def assign_to_undefined():
+    return InterpreterException("Can't assign not created variable.")
+
+
+class ScopeChain:
+
+    def __init__(self):
+        # like the tree-walker, a call sees the scopes of its caller; consts
+        # holds the constant names of each scope (None until there is one)
+        self.scopes = []
+        self.consts = []
+
+    def push_scope(self, scope=None, consts=None):
+        self.scopes.append({} if scope is None else scope)
+        self.consts.append(consts)
+
+    def pop_scope(self):
+        self.scopes.pop()
+        self.consts.pop()
+
+    def release_scopes(self, depth):
+        del self.scopes[depth:]
+        del self.consts[depth:]
+
+    def depth(self):
+        return len(self.scopes)
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        raise undefined_variable(name)
+
+    def declare(self, name, value):
+        self.scopes[-1][name] = value
+        if self.consts[-1]:
+            self.consts[-1].discard(name)
+
+    def declare_const(self, name, value):
+        self.scopes[-1][name] = value
+        if not self.consts[-1]:
+            self.consts[-1] = set()
+        self.consts[-1].add(name)
+
+    def check_assign(self, name):
+        # raises what assign would, before the value is evaluated
+        scopes = self.scopes
+        for index in range(len(scopes) - 1, -1, -1):
+            if name in scopes[index]:
+                if self.consts[index] and name in self.consts[index]:
+                    raise assign_to_constant()
+                return
+        raise assign_to_undefined()
+
+    def assign(self, name, value):
+        scopes = self.scopes
+        for index in range(len(scopes) - 1, -1, -1):
+            if name in scopes[index]:
+                if self.consts[index] and name in self.consts[index]:
+                    raise assign_to_constant()
+                scopes[index][name] = value
+                return
+        raise assign_to_undefined()
+
+    def enter_function(self, name, parameters, arguments):
+        check_arguments(name, parameters, arguments)
+
+        scope = {}
+        consts = None
+        for (parameter, is_const), value in zip(parameters, arguments):
+            scope[parameter] = value
+            if is_const:
+                consts = consts or set()
+                consts.add(parameter)
+
+        depth = len(self.scopes)
+        self.push_scope(scope, consts)
+        return depth
+
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from _interpreter.batch import Worker, list_scripts, main, run_batch
+from _parser.parse_cache import CACHE_DIRECTORY
+
+
+SCRIPTS = {
+    "a.txt": 'function main() {\n    print("a", 1);\n    return 42;\n}\n',
+    "b.txt": 'function main() {\n    print("before");\n    let a = 1 / 0;\n}\n',
+    "c.txt": 'function main( {\n}\n',
+    "d.txt": 'function main() {\n    let a = 0;\n    a = twice(2.5);\n    return a;\n}\n'
+             'function twice(let x) {\n    return x * 2;\n}\n',
+}
+
+
+class TestBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name, text in SCRIPTS.items():
+            with open(os.path.join(self.directory, name), "w") as file:
+                file.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_results(self):
+        results = list(run_batch(self.directory, executor=self.executor, chunk_size=1))
+
+        self.assertEqual([result.script for result in results], [self.path(name) for name in sorted(SCRIPTS)])
+        self.assertEqual([(result.stdout, result.value) for result in results],
+                         [("a 1\n", 42), ("before\n", None), ("", None), ("", 5.0)])
+        self.assertEqual([result.error and result.error.split(":")[0] for result in results],
+                         [None, "ArithmeticError", "ParserException", None])
+        self.assertEqual(list(results[0].timings), ["read", "parse", "prepare", "execute"])
+        # the timings stop at the phase that failed
+        self.assertEqual(list(results[2].timings), ["read", "parse"])
+
+    def test_options(self):
+        scripts = [self.path("d.txt"), self.path("a.txt"), self.path("missing.txt")]
+        results = list(run_batch(scripts, executor=self.executor, engine="bytecode", optimization_level=4))
+
+        self.assertEqual([result.value for result in results], [5.0, 42, None])
+        self.assertTrue(results[2].error.startswith("FileNotFoundError"))
+
+    def test_list_scripts(self):
+        list(run_batch(self.directory, executor=self.executor))
+
+        self.assertTrue(os.path.isdir(self.path(CACHE_DIRECTORY)))
+        self.assertEqual(list_scripts(self.directory), [self.path(name) for name in sorted(SCRIPTS)])
+        self.assertEqual(list_scripts([self.path("b.txt"), self.directory])[:2], [self.path("b.txt"), self.path("a.txt")])
+
+    def test_warm_worker(self):
+        worker = Worker(parse_cache=True, cache_directory=self.path("cache"))
+        first, second = worker.run(self.path("d.txt")), worker.run(self.path("d.txt"))
+
+        self.assertEqual((first.value, second.value), (5.0, 5.0))
+        self.assertEqual((worker.cache.hits, worker.cache.misses), (1, 1))
+
+    def test_command_line(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            status = main([self.path("a.txt"), self.path("d.txt"), "-j", "1", "--no-parse-cache", "-e", "closure"])
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(status, 0)
+        self.assertEqual([(result["stdout"], result["value"]) for result in results], [("a 1\n", 42), ("", 5.0)])
+        self.assertFalse(os.path.isdir(self.path(CACHE_DIRECTORY)))
@@ -1,12 +1,17 @@
 import os
 import sys
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from exceptions.interpreter_exception import InterpreterException
 from tokens import Type
 from _lexer.lexer import Lexer
 from _parser.parser import Parser
 from _interpreter.interpreter import Interpreter
+from _interpreter.resolver import Resolver
+from interpreter_tree.builtins import BUILTINS
+from interpreter_tree.environment import SCOPE_POOL_SIZE, Environment
+from interpreter_tree.scope import Scope
 from exceptions.parser_exception import ParserException
 from readers.source import Source
 import io
@@ -31,18 +36,31 @@ from io import StringIO
 from unittest.mock import patch
 
 
+def create_program(string):
+    return Parser(Lexer(Source(io.StringIO(string)))).parse_program()
+
+
+def create_interpreter(string, **options):
+    return Interpreter(create_program(string), **options)
+
+
+def run(interpreter):
+    # the output of one execution
+    with patch('sys.stdout', new_callable=StringIO) as stdout:
+        interpreter.execute()
+    return stdout.getvalue()
+
+
 class TestInterpreter(unittest.TestCase):
 
     mock_stdout = unittest.mock.patch('sys.stdout', new_callable=StringIO)
+    engine = "tree"
 
     def create_program(self, string):
-        parser = Parser(Lexer(Source(io.StringIO(string))))
-        return parser.parse_program()
+        return create_program(string)
 
     def create_interpreter(self, string):
-        program = self.create_program(string)
-        interpreter = Interpreter(program)
-        return interpreter
+        return create_interpreter(string, engine=self.engine)
 
     @mock_stdout
     def test_visit_program(self, stdout):
@@ -275,6 +293,436 @@ class TestInterpreter(unittest.TestCase):
             interpreter.execute()
         self.assertEqual(stdout.getvalue(), results)
 
+    def test_assign_checks_target_first(self):
+        inc = ' function inc(let x) { print(x); return x + 1; }'
+        programs = [
+            ('function main() { const q = 1; q = inc(2); }' + inc, "",
+             "It's not possible to assign value to constant variable."),
+            ('function main() { const q = 1; let a = 0; a = f(1); } function f(let x) { q = inc(x); return 0; }' + inc,
+             "", "It's not possible to assign value to constant variable."),
+            ('function main() { let a = 0; a = f(1); } function f(let x) { b = inc(x); return 0; }'
+             ' function g() { let b = 0; }' + inc, "", "Can't assign not created variable."),
+            ('function main() { q = "s" + 1; }', "", "Can't assign not created variable."),
+        ]
+
+        for program, output, message in programs:
+            with self.subTest(program=program):
+                with patch('sys.stdout', new_callable=StringIO) as stdout:
+                    with self.assertRaises(InterpreterException) as context:
+                        self.create_interpreter(program).execute()
+                self.assertEqual((stdout.getvalue(), context.exception.message), (output, message))
+
+    def run_programs(self, programs):
+        return "".join(run(self.create_interpreter(program)) for program in programs)
+
+    def test_functions(self):
+        programs = [
+            'function main() { let a = 0; a = add(1); } function add(let a, const b) { return a + b; }',
+            'function main() { let a = 0; a = add(2, 3.5); print(a); } function add(let a, const b) { return a + b; }',
+            'function main() { let a = 0; a = fib(15); print(a); }'
+            'function fib(let n) { if (n < 2) { return n; } let a = 0; a = fib(n - 1); let b = 0; b = fib(n - 2); return a + b; }',
+            'function main() { let a = 1; a = f(1); print(a); } function f(let x) { a = 2; return a + x; }',
+            'function main() { let a = 1; a = f(1); print(a); } function f(let x) { let y = x; }',
+        ]
+
+        with self.assertRaises(InterpreterException):
+            self.run_programs(programs[:1])
+
+        self.assertEqual(self.run_programs(programs[1:]), "5.5\n610\n3\nNone\n")
+
+    def test_variable_named_like_a_function(self):
+        # functions and variables are apart on every engine
+        program = 'function main() { let k = 1; let a = 0; a = k(5); print(a, k); } function k(let x) { return x * 2; }'
+
+        self.assertEqual(self.run_programs([program]), "10 1\n")
+
+
+class TestVirtualMachine(TestInterpreter):
+
+    engine = "bytecode"
+
+    def test_match(self):
+        program = """
+            function main() {
+                let a = 0;
+                a = f(1, "x"); print(a);
+                a = f(2, "y"); print(a);
+                a = f(3, "y"); print(a);
+            }
+            function f(let a, let b) {
+                match (a, b) {
+                    case 1, "x" => return "first";
+                    case 2 + 0, "y" => return "second";
+                    default => return "default";
+                }
+            }
+        """
+
+        self.assertEqual(self.run_programs([program]), "first\nsecond\ndefault\n")
+
+    def test_conditional_parity(self):
+        programs = [
+            'function main() { let a = 0; a = k(0); print(a); a = k(5); print(a); }'
+            'function k(let x) { if (x > 1) { return 1; } elif (x > 0) { return 2; } }',
+            'function main() { if (1 == 2) { print("if"); } elif (1 == 3) { print("elif"); } }',
+            'function main() { if (1 == 2) { print("if"); } }',
+        ]
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            for program in programs:
+                Interpreter(self.create_program(program)).execute()
+
+        self.assertEqual(self.run_programs(programs), stdout.getvalue())
+        self.assertEqual(stdout.getvalue(), "2\n1\nelif\n")
+
+    def test_expressions(self):
+        programs = [
+            'function main() { let a = 2; print(a * 3 - 1, a / 4, -a, 1 < 2, a == 2.0, a != 2); }',
+            'function main() { let a = 2; print(a > 1 && a < 3, a > 3 || a < 1, !a, "s"); }',
+            'function main() { let a = 0; while (a < 3) { let b = a; a = b + 1; } print(a); }',
+        ]
+
+        self.assertEqual(self.run_programs(programs), "5 0.5 -2 true true false\ntrue false false s\n3\n")
+
+    def test_runtime_errors(self):
+        programs = [
+            ('function main() { const a = 1; a = 2; }', "It's not possible to assign value to constant variable."),
+            ('function main() { a = 2; }', "Can't assign not created variable."),
+            ('function main() { print(b); }', "Undefined variable: b."),
+            ('function main() { let a = 0; a = f(1); }', "Undefined function: f."),
+            ('function main() { let a = "s" + 1; }', "Cannot add operands of types string and int"),
+            ('function main() { let a = "s" < 1; }', "Cannot compare operands of types string and int"),
+        ]
+
+        for program, message in programs:
+            with self.subTest(program=program):
+                with self.assertRaises(InterpreterException) as context:
+                    self.run_programs([program])
+                self.assertEqual(context.exception.message, message)
+
+
+
+class TestClosureEngine(TestVirtualMachine):
+
+    engine = "closure"
+
+    def test_constant_folding(self):
+        program = 'function main() { let a = 2 + 5 * 3; print(a, -4 / 2, 1 < 2, "s" == "s"); }'
+
+        self.assertEqual(self.run_programs([program]), "17 -2.0 true true\n")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(InterpreterException) as context:
+            Interpreter(self.create_program('function main() { }'), engine="jit")
+        self.assertEqual(context.exception.message, "Unknown engine: jit.")
+
+    def test_resolved_addresses(self):
+        program = self.create_program(
+            'function main() { let a = 1; while (a < 3) { let b = a; a = b + 1; } print(a); }'
+            'function f(let x) { y = x; }'
+            'function g() { let y = 0; y = f(1); }'
+        )
+        resolver = Resolver().resolve_program(program)
+        main, f, g = program.functions
+        let_a, loop = main.body.statements[:2]
+        let_b, assign_a = loop.body.statements
+
+        self.assertEqual(resolver.addresses[id(let_a)], (0, 0))
+        self.assertEqual(resolver.addresses[id(let_b)], (0, 0))
+        self.assertEqual(resolver.addresses[id(assign_a)], (1, 0))
+        self.assertEqual(resolver.scope_sizes[id(main.body)], 1)
+        self.assertEqual(resolver.dynamic, {"y"})
+        self.assertNotIn(id(g.body.statements[0]), resolver.addresses)
+
+    def test_elif_without_else(self):
+        program = 'function main() { let a = 0; a = k(0); print(a); a = k(5); print(a); }' \
+                  'function k(let x) { if (x > 1) { return 1; } elif (x > 0) { return 2; } }'
+
+        self.assertEqual(self.run_programs([program]), "2\n1\n")
+
+    def test_resolve_time_errors(self):
+        programs = [
+            ('function main() { if (false) { print(b); } }', "Undefined variable: b."),
+            ('function main() { let a = 0; } function f() { a = 2; c = 1; }', "Can't assign not created variable."),
+        ]
+
+        for program, message in programs:
+            with self.subTest(program=program):
+                with self.assertRaises(InterpreterException) as context:
+                    self.create_interpreter(program)
+                self.assertEqual(context.exception.message, message)
+
+
+class TestPythonEngine(TestVirtualMachine):
+
+    engine = "python"
+
+    def test_scopes(self):
+        programs = [
+            'function main() { let a = 1; if (a == 1) { let a = "inner"; print(a); } print(a); }',
+            'function main() { let a = 1; let b = 0; b = f(2); print(a, b); } function f(let x) { a = a + x; return a; }',
+            'function main() { let i = 0; while (i < 3) { const c = i; i = c + 1; } print(i); }',
+        ]
+
+        self.assertEqual(self.run_programs(programs), "inner\n1\n3 3\n3\n")
+
+    def test_transpiled_source(self):
+        program = self.create_program('function main() { let i = 0; while (i < 3) { i = i + 1; } print(i); }')
+        source = Interpreter(program, engine="python").engine.source
+
+        self.assertIn("v1 = (v1 + 1)", source)
+
+    def test_names_from_source(self):
+        programs = [
+            'function main() { let a_2 = 5; let a = 1; if (a == 1) { let a = 2; print(a, a_2); } }',
+            'function main() { let \ufb01 = 1; let fi = 2; print(\ufb01, fi); }',
+            'function main() { let a\u00b2 = 1; print(a\u00b2); }',
+        ]
+
+        self.assertEqual(self.run_programs(programs), "2 5\n1 2\n1\n")
+
+    def test_elif_without_else(self):
+        text = 'function main() { let a = 0; a = k(0); print(a); a = k(5); print(a); }' \
+               'function k(let x) { if (x > 1) { return 1; } elif (x > 0) { return 2; } }'
+        source = Interpreter(self.create_program(text), engine="python").engine.source
+
+        self.assertIn("else:", source)
+        self.assertEqual(self.run_programs([text]), "2\n1\n")
+
+
+class TestStackMachine(TestVirtualMachine):
+
+    engine = "stack"
+
+    deep = 'function main() {{ let a = 0; a = sum({depth}); print(a); }}' \
+           'function sum(let n) {{ if (n == 0) {{ return 0; }} let r = 0; r = sum(n - 1); return r + n; }}'
+
+    def test_deep_recursion(self):
+        self.assertEqual(self.run_programs([self.deep.format(depth=100000)]), "5000050000\n")
+
+        with self.assertRaises(RecursionError):
+            Interpreter(self.create_program(self.deep.format(depth=100000)), engine="bytecode").execute()
+
+    def test_budget(self):
+        program = self.create_program(self.deep.format(depth=100))
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            Interpreter(program, engine="stack", stack_budget=101).execute()
+            with self.assertRaises(InterpreterException) as context:
+                Interpreter(program, engine="stack", stack_budget=100).execute()
+
+        self.assertEqual(stdout.getvalue(), "5050\n")
+        self.assertEqual(context.exception.message, "Calls nested deeper than the budget of 100.")
+
+
+class TestMemoization(unittest.TestCase):
+
+    fibonacci = 'function main() { let a = 0; a = fib(18); print(a); a = fib(18); print(a); }' \
+                'function fib(let n) { if (n < 2) { return n; } let a = 0; a = fib(n - 1); let b = 0; b = fib(n - 2);' \
+                ' return a + b; }'
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_pure_function(self, stdout):
+        interpreter = create_interpreter(self.fibonacci)
+        interpreter.execute()
+
+        self.assertEqual(stdout.getvalue(), "2584\n2584\n")
+        # every n is computed once, then fib(n - 2) and the second fib(18) hit
+        self.assertEqual((interpreter.memo.misses, interpreter.memo.hits), (19, 17))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_turned_off(self, stdout):
+        interpreter = create_interpreter(self.fibonacci)
+        interpreter.execute(memoize=False)
+
+        self.assertEqual(stdout.getvalue(), "2584\n2584\n")
+        self.assertEqual((interpreter.memo.misses, interpreter.memo.hits, len(interpreter.memo)), (0, 0, 0))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_bounded(self, stdout):
+        interpreter = create_interpreter(self.fibonacci, memo_size=4)
+        interpreter.execute()
+
+        self.assertEqual(stdout.getvalue(), "2584\n2584\n")
+        self.assertEqual(len(interpreter.memo), 4)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_impure_functions(self, stdout):
+        programs = [
+            'function main() { let a = 0; a = f(1); a = f(1); } function f(let x) { print(x); return x; }',
+            'function main() { let a = 0; a = f(1); a = f(1); print(a); } function f(let x) { a = a + 1; return a; }',
+            'function main() { let a = 1; let b = 0; b = f(1); a = 5; b = f(1); print(b); }'
+            ' function f(let x) { return a + x; }',
+            'function main() { let a = 0; a = f(1); a = f(1); } function f(let x) { let y = 0; y = g(x); return y; }'
+            ' function g(let x) { print(x); return x; }',
+        ]
+
+        for program in programs:
+            interpreter = create_interpreter(program)
+            interpreter.execute()
+            self.assertEqual(interpreter.pure_functions, set())
+
+        self.assertEqual(stdout.getvalue(), "1\n1\n2\n6\n1\n1\n")
+
+    def test_negative_zero(self):
+        program = 'function main() { let z = 0.0 - 0.5; z = z * 0; let a = 0; a = f(z); print(a); a = f(0.0);' \
+                  ' print(a); } function f(let x) { return x; }'
+        interpreter = create_interpreter(program)
+
+        self.assertEqual(run(interpreter), "-0.0\n0.0\n")
+        self.assertEqual(interpreter.memo.misses, 2)
+
+    def test_argument_types(self):
+        program = 'function main() { let a = 0; a = half(1); print(a); a = half(1.0); print(a); a = half(true); }' \
+                  'function half(let x) { return x * 1; }'
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            with self.assertRaises(InterpreterException):
+                create_interpreter(program).execute()
+        self.assertEqual(stdout.getvalue(), "1\n1.0\n")
+
+
+class TestTailCalls(unittest.TestCase):
+
+    def test_deep_recursion(self):
+        program = 'function main() { let a = 0; a = sum(20000, 0); print(a); }' \
+                  'function sum(let n, let acc) { if (n == 0) { return acc; } let r = 0; r = sum(n - 1, acc + n);' \
+                  ' return r; }'
+
+        self.assertEqual(run(create_interpreter(program)), "200010000\n")
+
+    def test_scope_is_replaced(self):
+        program = 'function main() { let a = 0; a = f(3, 0); print(a); }' \
+                  'function f(let n, const seen) { print(n, seen); if (n == 0) { return seen; } let b = n * 10;' \
+                  ' let r = 0; r = f(n - 1, b + seen); return r; }'
+
+        self.assertEqual(run(create_interpreter(program)), "3 0\n2 30\n1 50\n0 60\n60\n")
+
+    def test_arguments_see_the_caller(self):
+        program = 'function main() { let n = 5; let a = 0; a = f(1, n); print(a); }' \
+                  'function f(let n, let m) { return n + m; }'
+
+        self.assertEqual(run(create_interpreter(program)), "6\n")
+
+
+class TestBuiltins(unittest.TestCase):
+
+    def test_shared_namespace(self):
+        env = Environment()
+        env.push_new_call_context()
+
+        self.assertIs(env.builtins, BUILTINS)
+        self.assertIs(env.get_variable('print'), BUILTINS.get_variable('print'))
+        # no call context holds a copy of its own
+        self.assertTrue(all(not scope.variables for context in env.call_contexts for scope in context.scopes))
+        with self.assertRaises(TypeError):
+            BUILTINS.variables['print'] = None
+
+    def test_register(self):
+        builtins = BUILTINS.register('double', lambda x: x * 2).register('add', lambda x, y: x + y, arity=2)
+        program = 'function main() { let a = 0; a = double(4); print(a); a = add(a, 2); print(a); a = double(0);' \
+                  ' print(a); }'
+
+        self.assertEqual(run(create_interpreter(program, builtins=builtins)), "8\n10\n0\n")
+        self.assertEqual((len(BUILTINS), len(builtins)), (1, 3))
+        self.assertNotIn('double', BUILTINS)
+
+    def test_user_scopes_come_first(self):
+        builtins = BUILTINS.register('double', lambda x: x * 2)
+        program = 'function main() { let a = 0; a = double(4); print(a); } function double(let x) { return x + x + x; }'
+
+        self.assertEqual(run(create_interpreter(program, builtins=builtins)), "12\n")
+
+    def test_arity(self):
+        builtins = BUILTINS.register('double', lambda x: x * 2)
+
+        with self.assertRaises(InterpreterException):
+            run(create_interpreter('function main() { let a = 0; a = double(1, 2); }', builtins=builtins))
+
+
+class TestScopePool(unittest.TestCase):
+
+    def test_loops_reuse_scopes(self):
+        program = 'function main() { let i = 0; while (i < 100) { let x = i; if (x > 50) { let y = x; i = y + 1; }' \
+                  ' else { i = i + 1; } } print(i); }'
+
+        with patch.object(Scope, '__init__', side_effect=Scope.__init__, autospec=True) as created:
+            interpreter = create_interpreter(program)
+            output = run(interpreter)
+
+        self.assertEqual(output, "100\n")
+        # the global scope, main's and one for each nesting level of blocks declaring something
+        self.assertEqual(created.call_count, 4)
+
+    def test_blocks_without_declarations(self):
+        program = 'function main() { let i = 0; while (i < 3) { i = i + 1; } print(i); }'
+        interpreter = create_interpreter(program)
+        output = run(interpreter)
+
+        self.assertEqual(output, "3\n")
+        self.assertEqual(interpreter.program.functions[0].body.declarations, 1)
+        self.assertEqual(interpreter.program.functions[0].body.statements[1].body.declarations, 0)
+
+    def test_recycled_scopes_are_empty(self):
+        program = 'function main() { let i = 0; while (i < 2) { if (i == 1) { print(y); } let y = i; i = i + 1; } }'
+
+        with self.assertRaises(InterpreterException):
+            run(create_interpreter(program))
+
+    def test_bounded(self):
+        env = Environment()
+        for _ in range(SCOPE_POOL_SIZE + 10):
+            env.push_scope()
+        env.release_scopes(SCOPE_POOL_SIZE + 10)
+
+        self.assertEqual(len(env.free_scopes), SCOPE_POOL_SIZE)
+        env.push_scope()
+        self.assertEqual(len(env.free_scopes), SCOPE_POOL_SIZE - 1)
+
+
+class TestFrames(unittest.TestCase):
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_return_unwinds_blocks(self, stdout):
+        program = 'function main() { let a = 0; a = find(10); print(a); }' \
+                  'function find(let n) { let i = 0; while (i < n) { if (i == 3) { while (true) { return i * 10; } }' \
+                  ' i = i + 1; } print(i); return 0; }'
+        interpreter = create_interpreter(program)
+        interpreter.execute()
+        interpreter.execute()
+
+        self.assertEqual(stdout.getvalue(), "30\n30\n")
+        self.assertEqual(interpreter.env.frames, [])
+
+    def test_frame_per_call(self):
+        frames = []
+        builtins = BUILTINS.register('inspect', lambda x: frames.append(
+            [(frame.function.identifier, frame.statement.identifier, frame.return_value)
+             for frame in interpreter.env.frames]))
+        program = 'function main() { let a = 0; a = f(1); } function f(let x) { let b = 0; b = inspect(x); return x; }'
+        interpreter = create_interpreter(program, builtins=builtins, memo_size=0)
+        interpreter.execute()
+
+        self.assertEqual(frames, [[('main', 'a', None), ('f', 'b', None)]])
+
+
+class TestConcurrency(unittest.TestCase):
+
+    program = 'function main() { let i = 0; let a = 0; while (i < 30) { a = step(i, a); i = i + 1; } print(a); }' \
+              'function step(let i, let a) { if (i > 15) { let b = a * 2; return b - i; } return a + i; }'
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_shared_program(self, stdout):
+        program = create_program(self.program)
 
+        def run(index):
+            engine = ["tree", "bytecode", "closure", "python", "stack"][index % 5]
+            output = StringIO()
+            Interpreter(program, engine, optimization_level=index % 5, output=output).execute()
+            return output.getvalue()
 
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(run, range(100)))
 
+        self.assertEqual(outputs, ["1687583\n"] * 100)
+        self.assertEqual(stdout.getvalue(), "")
@@ -0,0 +1,480 @@
+import functools
+import operator
+
+from _interpreter import runtime
+from _interpreter.runtime import NUMBER_TYPES, format_value, literal_value, parameter_list
+from tree.float import Float
+from tree.int import Int
+from tree.program import Program
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.visitor import Visitor
+
+
+# The program becomes one Python module: each function becomes a def f1, f2...
+# and each variable a local v1, v2..., never named after the source, which Python
+# would NFKC-normalize into another name or refuse. Names that another function
+# may reach through the dynamic scope are kept in the shared scope chain env instead. Expressions are visited into
+# (source, is_number) pairs, so arithmetic on values known to be numbers skips
+# the runtime checks.
+
+INDENT = "    "
+CODE_CACHE_SIZE = 64
+
+
+def add(left, right):
+    if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+        return left + right
+    return runtime.add(left, right)
+
+
+def subtract(left, right):
+    if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+        return left - right
+    return runtime.subtract(left, right)
+
+
+def multiply(left, right):
+    if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+        return left * right
+    return runtime.multiply(left, right)
+
+
+def negative(value):
+    if value.__class__ in NUMBER_TYPES:
+        return -value
+    return runtime.negative(value)
+
+
+def print_values(*values, file=None):
+    print(*[format_value(value) for value in values], file=file)
+
+
+def undefined_function(name, *arguments):
+    raise runtime.undefined_function(name)
+
+
+def wrong_arguments(name, count, *arguments):
+    runtime.check_arguments(name, [None] * count, arguments)
+
+
+def constant_error():
+    raise runtime.assign_to_constant()
+
+
+SHIMS = {
+    "add": add,
+    "subtract": subtract,
+    "multiply": multiply,
+    "divide": runtime.divide,
+    "negative": negative,
+    "less": functools.partial(runtime.compare, operator.lt),
+    "less_equal": functools.partial(runtime.compare, operator.le),
+    "greater": functools.partial(runtime.compare, operator.gt),
+    "greater_equal": functools.partial(runtime.compare, operator.ge),
+    "print_values": print_values,
+    "undefined_function": undefined_function,
+    "wrong_arguments": wrong_arguments,
+    "constant_error": constant_error,
+}
+
+
+def is_nonzero_literal(source):
+    try:
+        return float(source) != 0
+    except ValueError:
+        return False
+
+
+@functools.lru_cache(maxsize=CODE_CACHE_SIZE)
+def compile_source(source):
+    return compile(source, "<transpiled>", "exec")
+
+
+class Declaration:
+    __slots__ = ("key", "local", "is_const")
+
+    def __init__(self, key, local, is_const):
+        self.key = key
+        self.local = local
+        self.is_const = is_const
+
+
+class Transpiler(Visitor):
+
+    def __init__(self):
+        self.functions = {}
+        self.function_names = {}
+        # names reached through the scope chain, and variables that may hold
+        # something else than a number; both only grow between passes
+        self.dynamic = set()
+        self.not_numbers = set()
+
+        self.free = set()
+        self.changed = False
+        self.lines = []
+        self.indent = 0
+        self.scopes = []
+        self.local_count = 0
+        self.match_count = 0
+
+    def transpile(self, program):
+        self.functions = {function.identifier: parameter_list(function) for function in program.functions}
+        self.function_names = {name: f"f{index}" for index, name in enumerate(self.functions)}
+
+        # a pass can find more dynamic names or non-number variables, which
+        # changes what the earlier functions should have produced
+        while True:
+            self.free = set()
+            self.changed = False
+            source = self.transpile_program(program)
+            if self.free <= self.dynamic and not self.changed:
+                return source
+            self.dynamic |= self.free
+
+    def transpile_program(self, program):
+        self.lines = []
+        for function in program.functions:
+            function.accept(self)
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, line):
+        self.lines.append(INDENT * self.indent + line)
+
+    def declare(self, key, name, is_const):
+        # a name declared again in a nested block gets a local of its own
+        self.local_count += 1
+        declaration = Declaration(key, f"v{self.local_count}", is_const)
+        self.scopes[-1][name] = declaration
+        return declaration
+
+    def resolve(self, name):
+        if name not in self.dynamic:
+            for scope in reversed(self.scopes):
+                if name in scope:
+                    return scope[name]
+        self.free.add(name)
+        return None
+
+    def store_number(self, declaration, is_number):
+        if not is_number and declaration.key not in self.not_numbers:
+            self.not_numbers.add(declaration.key)
+            self.changed = True
+
+    def transpile_body(self, block):
+        start = len(self.lines)
+        self.indent += 1
+        if block is not None:
+            block.accept(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    def transpile_binary(self, expressions, operators):
+        result = expressions[0].accept(self)
+        for expression, _operator in zip(expressions[1:], operators):
+            result = _operator.accept(self, result, expression.accept(self))
+        return result
+
+    def transpile_arithmetic(self, shim, symbol, left, right):
+        # the shims raise for anything but numbers, so the result is always one
+        if left[1] and right[1]:
+            return f"({left[0]} {symbol} {right[0]})", True
+        return f"{shim}({left[0]}, {right[0]})", True
+
+    def transpile_comparison(self, shim, symbol, left, right):
+        if left[1] and right[1]:
+            return f"({left[0]} {symbol} {right[0]})", False
+        return f"{shim}({left[0]}, {right[0]})", False
+
+    def visit_program(self, program):
+        pass
+
+    def visit_function(self, function):
+        self.scopes = [{}]
+        self.local_count = 0
+        self.match_count = 0
+
+        parameters = parameter_list(function)
+        declarations = [self.declare((function.identifier, name), name, is_const) for name, is_const in parameters]
+        for declaration in declarations:
+            self.not_numbers.add(declaration.key)
+        self.emit(f"def {self.function_names[function.identifier]}({', '.join(declaration.local for declaration in declarations)}):")
+
+        dynamic = [(name, is_const) for name, is_const in parameters if name in self.dynamic]
+        if not dynamic:
+            self.transpile_body(function.body)
+        else:
+            self.indent += 1
+            scope = ", ".join(f"{name!r}: {self.scopes[0][name].local}" for name, _ in dynamic)
+            consts = ", ".join(repr(name) for name, is_const in dynamic if is_const)
+            self.emit(f"env.push_scope({{{scope}}}, {{{consts}}})" if consts else f"env.push_scope({{{scope}}})")
+            self.emit("try:")
+            self.transpile_body(function.body)
+            self.emit("finally:")
+            self.emit(INDENT + "env.pop_scope()")
+            self.indent -= 1
+
+        self.emit("")
+
+    def visit_parameters(self, parameters):
+        pass
+
+    def visit_block(self, block, scope=None):
+        self.scopes.append({})
+
+        dynamic = any(isinstance(statement, (Let, Const)) and statement.identifier in self.dynamic
+                      for statement in block.statements)
+        if dynamic:
+            self.emit("env.push_scope()")
+            self.emit("try:")
+            self.indent += 1
+
+        start = len(self.lines)
+        for statement in block.statements:
+            if isinstance(statement, FunctionCall):
+                self.emit(statement.accept(self)[0])
+            else:
+                statement.accept(self)
+
+        if dynamic:
+            if len(self.lines) == start:
+                self.emit("pass")
+            self.indent -= 1
+            self.emit("finally:")
+            self.emit(INDENT + "env.pop_scope()")
+
+        self.scopes.pop()
+
+    def visit_statement(self, statement):
+        pass
+
+    def visit_comment(self, comment):
+        pass
+
+    def declare_variable(self, statement, is_const):
+        name = statement.identifier
+        value, is_number = statement.expression.accept(self)
+
+        if name in self.dynamic:
+            self.emit(f"env.{'declare_const' if is_const else 'declare'}({name!r}, {value})")
+            return
+
+        declaration = self.scopes[-1].get(name)
+        if declaration is None:
+            declaration = self.declare(id(statement), name, is_const)
+        declaration.is_const = is_const
+        self.store_number(declaration, is_number)
+        self.emit(f"{declaration.local} = {value}")
+
+    def visit_let(self, let):
+        self.declare_variable(let, False)
+
+    def visit_const(self, const):
+        self.declare_variable(const, True)
+
+    def visit_assign(self, assign):
+        # like the tree-walker, the target is checked before the value is evaluated
+        declaration = self.resolve(assign.identifier)
+        if declaration is not None and declaration.is_const:
+            # known at compile time, the check costs nothing when running
+            self.emit("constant_error()")
+            return
+
+        value, is_number = assign.expression.accept(self)
+        if declaration is None:
+            self.emit(f"env.check_assign({assign.identifier!r})")
+            self.emit(f"env.assign({assign.identifier!r}, {value})")
+        else:
+            self.store_number(declaration, is_number)
+            self.emit(f"{declaration.local} = {value}")
+
+    def visit_print(self, _print):
+        self.emit(f"print_values({', '.join(argument.accept(self)[0] for argument in _print.arguments)})")
+
+    def visit_return(self, _return):
+        if _return.expression is None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {_return.expression.accept(self)[0]}")
+
+    def visit_while(self, while_loop):
+        self.emit(f"while {while_loop.expression.accept(self)[0]}:")
+        self.transpile_body(while_loop.body)
+
+    def visit_conditional(self, conditional):
+        for index, (condition, block) in enumerate(zip(conditional.conditions, conditional.blocks)):
+            self.emit(f"{'if' if index == 0 else 'elif'} {condition.accept(self)[0]}:")
+            self.transpile_body(block)
+
+        # like the tree-walker, an elif chain without an else runs its last block when nothing holds
+        if not conditional.is_single_if():
+            self.emit("else:")
+            self.transpile_body(conditional.blocks[-1])
+
+    def visit_match(self, match):
+        if match.conditions is None:
+            return
+
+        # the matched values are evaluated once into locals no variable can take
+        self.match_count += 1
+        names = [f"m{self.match_count}_{index}" for index in range(len(match.expressions))]
+        for expression, name in zip(match.expressions, names):
+            self.emit(f"{name} = {expression.accept(self)[0]}")
+
+        keyword = "if"
+        for _return, case_conditions in match.conditions.items():
+            if not isinstance(case_conditions, list):
+                # default
+                if keyword == "if":
+                    _return.accept(self)
+                else:
+                    self.emit("else:")
+                    self.indent += 1
+                    _return.accept(self)
+                    self.indent -= 1
+                break
+            if len(case_conditions) != len(names):
+                continue
+
+            tests = [f"{name} == {condition.accept(self)[0]}" for condition, name in zip(case_conditions, names)]
+            self.emit(f"{keyword} {' and '.join(tests)}:")
+            self.indent += 1
+            _return.accept(self)
+            self.indent -= 1
+            keyword = "elif"
+
+    def visit_function_call(self, function_call):
+        name = function_call.identifier
+        arguments = [argument.accept(self)[0] for argument in function_call.arguments]
+
+        if name not in self.functions:
+            call = f"undefined_function({', '.join([repr(name)] + arguments)})"
+        elif len(self.functions[name]) != len(arguments):
+            call = f"wrong_arguments({', '.join([repr(name), str(len(self.functions[name]))] + arguments)})"
+        else:
+            call = f"{self.function_names[name]}({', '.join(arguments)})"
+
+        return call, False
+
+    def visit_native_function(self, native_function, args):
+        pass
+
+    def visit_arguments(self, arguments):
+        pass
+
+    def visit_or_expression(self, or_expression):
+        values = [expression.accept(self)[0] for expression in or_expression.expressions]
+        return f"any(({', '.join(values)}))", False
+
+    def visit_and_expression(self, and_expression):
+        values = [expression.accept(self)[0] for expression in and_expression.expressions]
+        return f"all(({', '.join(values)}))", False
+
+    def visit_equal_expression(self, equal_expression):
+        return self.transpile_binary(equal_expression.expressions, equal_expression.operators)
+
+    def visit_rel_expression(self, rel_expression):
+        return self.transpile_binary(rel_expression.expressions, rel_expression.operators)
+
+    def visit_add_expression(self, add_expression):
+        return self.transpile_binary(add_expression.expressions, add_expression.operators)
+
+    def visit_mult_expression(self, mult_expression):
+        return self.transpile_binary(mult_expression.expressions, mult_expression.operators)
+
+    def visit_unary_expression(self, unary_expression):
+        return unary_expression.expression.accept(self)
+
+    def visit_not_expression(self, not_expression):
+        return f"(not {not_expression.expression.accept(self)[0]})", False
+
+    def visit_negative_expression(self, negative_expression):
+        value, is_number = negative_expression.expression.accept(self)
+        if is_number:
+            return f"(-{value})", True
+        return f"negative({value})", True
+
+    def visit_parent_logic_expression(self, expression):
+        return expression.expression.accept(self)
+
+    def visit_variable(self, variable):
+        pass
+
+    def visit_identifier(self, identifier):
+        declaration = self.resolve(identifier.name)
+        if declaration is None:
+            return f"env.lookup({identifier.name!r})", False
+        return declaration.local, declaration.key not in self.not_numbers
+
+    def visit_literal(self, literal):
+        return repr(literal_value(literal)), isinstance(literal, (Int, Float))
+
+    visit_bool = visit_int = visit_string = visit_float = visit_literal
+
+    def visit_equal_operator(self, equal_operator, left=None, right=None):
+        return f"({left[0]} == {right[0]})", False
+
+    def visit_not_equal_operator(self, not_eq_operator, left=None, right=None):
+        return f"({left[0]} != {right[0]})", False
+
+    def visit_greater_equal_operator(self, ge_operator, left, right):
+        return self.transpile_comparison("greater_equal", ">=", left, right)
+
+    def visit_greater_operator(self, gt_operator, left, right):
+        return self.transpile_comparison("greater", ">", left, right)
+
+    def visit_less_equal_operator(self, le_operator, left, right):
+        return self.transpile_comparison("less_equal", "<=", left, right)
+
+    def visit_less_operator(self, lt_operator, left, right):
+        return self.transpile_comparison("less", "<", left, right)
+
+    def visit_plus_operator(self, plus_operator, left, right):
+        return self.transpile_arithmetic("add", "+", left, right)
+
+    def visit_minus_operator(self, minus_operator, left, right):
+        return self.transpile_arithmetic("subtract", "-", left, right)
+
+    def visit_multiply_operator(self, mult_operator, left, right):
+        return self.transpile_arithmetic("multiply", "*", left, right)
+
+    def visit_divide_operator(self, div_operator, left, right):
+        # dividing by a number literal other than 0 can't fail
+        if left[1] and is_nonzero_literal(right[0]):
+            return f"({left[0]} / {right[0]})", True
+        return f"divide({left[0]}, {right[0]})", True
+
+    def visit_not_operator(self, not_operator, value=None):
+        pass
+
+    def visit_negative_operator(self, neg_operator, value=None):
+        pass
+
+    def visit_or_operator(self, or_operator):
+        pass
+
+    def visit_and_operator(self, and_operator):
+        pass
+
+
+class PythonEngine:
+
+    def __init__(self, program: Program, output=None):
+        self.program = program
+        self.main_function = runtime.check_main(program)[runtime.MAIN_FUNCTION]
+        self.output = output
+        transpiler = Transpiler()
+        self.source = transpiler.transpile(program)
+        self.main_name = transpiler.function_names[runtime.MAIN_FUNCTION]
+        self.code = compile_source(self.source)
+
+    def execute(self):
+        runtime.check_main_parameters(self.main_function)
+
+        namespace = dict(SHIMS, env=runtime.ScopeChain())
+        if self.output is not None:
+            namespace["print_values"] = functools.partial(print_values, file=self.output)
+        exec(self.code, namespace)
+        return namespace[self.main_name]()
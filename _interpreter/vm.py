@@ -0,0 +1,258 @@
+import operator
+
+from _interpreter import runtime
+from _interpreter.compiler import (
+    Compiler,
+    LOAD_CONST, LOAD_NAME, STORE_LET, STORE_CONST, STORE_NAME, CHECK_NAME,
+    ADD, SUBTRACT, MULTIPLY, DIVIDE,
+    EQUAL, NOT_EQUAL, LESS, LESS_EQUAL, GREATER, GREATER_EQUAL,
+    AND, OR, NOT, NEGATIVE,
+    JUMP, JUMP_IF_FALSE,
+    PUSH_SCOPE, POP_SCOPE,
+    CALL, POP, PRINT, RETURN, RETURN_NONE,
+)
+from _interpreter.runtime import NUMBER_TYPES, format_value
+from exceptions.interpreter_exception import InterpreterException
+from tree.program import Program
+
+
+# most calls a StackMachine keeps open at once
+STACK_BUDGET = 1000000
+
+
+class VirtualMachine:
+
+    # calls keep their frame on the Python stack
+    stackless = False
+    budget = None
+
+    def __init__(self, program: Program, output=None):
+        self.program = program
+        self.output = output
+        self.main_function = runtime.check_main(program)[runtime.MAIN_FUNCTION]
+        self.functions = Compiler().compile_program(program)
+
+        self.env = runtime.ScopeChain()
+
+    def execute(self):
+        runtime.check_main_parameters(self.main_function)
+        return self.call(self.functions[runtime.MAIN_FUNCTION], [])
+
+    def call(self, code, arguments):
+        depth = self.env.enter_function(code.name, code.parameters, arguments)
+        try:
+            return self.run(code)
+        finally:
+            self.env.release_scopes(depth)
+
+    def run(self, code):
+        instructions, constants, names, calls = code.instructions, code.constants, code.names, code.calls
+        env, functions = self.env, self.functions
+        scopes, consts = env.scopes, env.consts
+        top = scopes[-1]
+
+        stack = []
+        push, pop = stack.append, stack.pop
+        pc = 0
+
+        # the callers of the running code and the scope depth it started at, for a StackMachine
+        frames = []
+        depth = None
+        stackless, budget = self.stackless, self.budget
+
+        # the most frequent instructions are tested first
+        while True:
+            opcode = instructions[pc]
+            argument = instructions[pc + 1]
+            pc += 2
+
+            if opcode == LOAD_NAME:
+                name = names[argument]
+                if name in top:
+                    push(top[name])
+                else:
+                    push(env.lookup(name))
+
+            elif opcode == LOAD_CONST:
+                push(constants[argument])
+
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc = argument
+
+            elif opcode == STORE_NAME:
+                name = names[argument]
+                if name in top and not consts[-1]:
+                    top[name] = pop()
+                else:
+                    env.assign(name, pop())
+
+            elif opcode == CHECK_NAME:
+                name = names[argument]
+                if name not in top or consts[-1]:
+                    env.check_assign(name)
+
+            elif opcode == ADD:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+                    stack[-1] = left + right
+                else:
+                    runtime.add(left, right)
+
+            elif opcode == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+                    stack[-1] = left - right
+                else:
+                    runtime.subtract(left, right)
+
+            elif opcode == LESS:
+                right = pop()
+                try:
+                    stack[-1] = stack[-1] < right
+                except TypeError:
+                    runtime.compare(operator.lt, stack[-1], right)
+
+            elif opcode == JUMP:
+                pc = argument
+
+            elif opcode == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES:
+                    stack[-1] = left * right
+                else:
+                    runtime.multiply(left, right)
+
+            elif opcode == DIVIDE:
+                right = pop()
+                stack[-1] = runtime.divide(stack[-1], right)
+
+            elif opcode == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+
+            elif opcode == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+
+            elif opcode == LESS_EQUAL:
+                right = pop()
+                try:
+                    stack[-1] = stack[-1] <= right
+                except TypeError:
+                    runtime.compare(operator.le, stack[-1], right)
+
+            elif opcode == GREATER:
+                right = pop()
+                try:
+                    stack[-1] = stack[-1] > right
+                except TypeError:
+                    runtime.compare(operator.gt, stack[-1], right)
+
+            elif opcode == GREATER_EQUAL:
+                right = pop()
+                try:
+                    stack[-1] = stack[-1] >= right
+                except TypeError:
+                    runtime.compare(operator.ge, stack[-1], right)
+
+            elif opcode == STORE_LET:
+                top[names[argument]] = pop()
+                if consts[-1]:
+                    consts[-1].discard(names[argument])
+
+            elif opcode == CALL:
+                name, count = calls[argument]
+                function = functions.get(name)
+                if function is None:
+                    raise runtime.undefined_function(name)
+
+                if count:
+                    arguments = stack[-count:]
+                    del stack[-count:]
+                else:
+                    arguments = []
+
+                if not stackless:
+                    push(self.call(function, arguments))
+                elif len(frames) >= budget:
+                    raise InterpreterException(f"Calls nested deeper than the budget of {budget}.")
+                else:
+                    frames.append((code, stack, pc, depth))
+                    depth = env.enter_function(function.name, function.parameters, arguments)
+                    code = function
+                    instructions, constants, names, calls = code.instructions, code.constants, code.names, code.calls
+                    top = scopes[-1]
+                    stack = []
+                    push, pop = stack.append, stack.pop
+                    pc = 0
+
+            elif opcode == POP:
+                pop()
+
+            elif opcode == PUSH_SCOPE:
+                top = {}
+                scopes.append(top)
+                consts.append(None)
+
+            elif opcode == POP_SCOPE:
+                scopes.pop()
+                consts.pop()
+                top = scopes[-1]
+
+            elif opcode == RETURN or opcode == RETURN_NONE:
+                value = pop() if opcode == RETURN else None
+                if not frames:
+                    return value
+
+                env.release_scopes(depth)
+                code, stack, pc, depth = frames.pop()
+                instructions, constants, names, calls = code.instructions, code.constants, code.names, code.calls
+                top = scopes[-1]
+                push, pop = stack.append, stack.pop
+                push(value)
+
+            elif opcode == PRINT:
+                values = stack[len(stack) - argument:]
+                del stack[len(stack) - argument:]
+                print(*[format_value(value) for value in values], file=self.output)
+
+            elif opcode == STORE_CONST:
+                name = names[argument]
+                top[name] = pop()
+                if not consts[-1]:
+                    consts[-1] = set()
+                consts[-1].add(name)
+
+            elif opcode == AND:
+                values = stack[len(stack) - argument:]
+                del stack[len(stack) - argument:]
+                push(all(values))
+
+            elif opcode == OR:
+                values = stack[len(stack) - argument:]
+                del stack[len(stack) - argument:]
+                push(any(values))
+
+            elif opcode == NOT:
+                stack[-1] = not stack[-1]
+
+            elif opcode == NEGATIVE:
+                stack[-1] = runtime.negative(stack[-1])
+
+            else:
+                raise ValueError(f"Unknown opcode {opcode}.")
+
+
+class StackMachine(VirtualMachine):
+    # the same bytecode, with calls kept in a list instead of Python frames, so
+    # only the budget limits how deep a program can recurse
+
+    stackless = True
+
+    def __init__(self, program: Program, budget=STACK_BUDGET, output=None):
+        super().__init__(program, output)
+        self.budget = budget
@@ -0,0 +1,336 @@
+import re
+
+from _lexer.lexer import Lexer
+from exceptions.lexer_exception import LexerException
+from tokens import Token, TokenArray, Type, Symbol
+
+
+class FastLexer(Lexer):
+
+    WHITESPACES = re.compile(r"[ \n]*")
+    IDENTIFIER_TAIL = re.compile(r"[A-Za-z0-9_]*")
+    DOUBLE_OPERATOR_STARTS = "<>!=&|"
+
+    # Covers the common ASCII tokens. Anything else (non-ASCII characters, long
+    # numbers, malformed input, lone '&' and '|', end of text) is matched by
+    # "other" and handed to scan_token, which reproduces Lexer exactly.
+    MASTER_PATTERN = re.compile(r"""
+        (\ *+)(?:
+              (?P<identifier>[A-Za-z][A-Za-z0-9_]*+)(?![^\x00-\x7f])
+            | (?P<operator>[(){}+\-*/;.,_])
+            | (?P<newline>\n[ \n]*+)
+            | (?P<double_operator><=|>=|==|!=|&&|\|\||=>)
+            | (?P<int>[1-9][0-9]{0,8}+|0)(?![0-9.]|[^\x00-\x7f])
+            | (?P<float>(?P<int_part>[1-9][0-9]{0,8}+|0)\.(?P<zeros>0*+)(?P<digits>[0-9]{0,10}+))(?![0-9]|[^\x00-\x7f])
+            | "(?P<string>[^"\n]*)"
+            | \#(?P<comment>[^\n]*)
+            | (?P<single_operator>[!<>=])
+            | (?P<other>[\s\S]|$)
+        )
+    """, re.VERBOSE)
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.text = source.read_remaining()
+        self.length = len(self.text)
+        self.index = 0
+
+        # line_start is the index of the last newline already counted in line,
+        # so the column of a character on the current line is index - line_start
+        self.line, column = source.get_position()
+        self.line_start = -column
+
+        # the whole text is in memory now, positions are computed from the index
+        self.source = TextCursor(self)
+        self.handlers = self.build_handlers()
+        self.tokens = self.scan_tokens()
+
+    def build_handlers(self):
+        handlers = {}
+
+        for character in Symbol.special_characters:
+            if character:
+                handlers[character] = self.construct_operator
+        for character in self.DOUBLE_OPERATOR_STARTS:
+            handlers[character] = self.construct_operator
+        for character in "0123456789":
+            handlers[character] = self.construct_number
+        for character in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            handlers[character] = self.construct_identifier
+        handlers['"'] = self.construct_string_literal
+        handlers['#'] = self.construct_comment
+
+        return handlers
+
+    def get_current_char(self):
+        if self.index < self.length:
+            return self.text[self.index]
+        return ""
+
+    def get_current_position(self):
+        if self.get_current_char() == "\n":
+            return self.line + 1, 0
+        return self.line, self.index - self.line_start
+
+    def raise_exception(self, message, position=None):
+        line, column = position or self.get_current_position()
+        raise LexerException(line, column, message)
+
+    def next_token(self):
+        token = self.token = next(self.tokens)
+
+        if token.token_type is Type.UNKNOWN:
+            self.raise_exception("Unknown symbol", (token.line, token.column))
+
+    def tokenize_all(self):
+        tokens = TokenArray()
+        append_type, append_line = tokens.types.append, tokens.lines.append
+        append_column, append_value_index = tokens.columns.append, tokens.value_indices.append
+        values, value_table = tokens.values, tokens.value_table
+
+        def append(token_type, value, line, column):
+            # TokenArray.intern_value inlined, this runs once per token
+            key = value if value.__class__ is str else (value.__class__, value)
+            index = value_table.get(key)
+            if index is None:
+                index = value_table[key] = len(values)
+                values.append(value)
+
+            append_type(token_type.value)
+            append_line(line)
+            append_column(column)
+            append_value_index(index)
+            return token_type
+
+        # the tokens go straight into the arrays, no Token is built for them
+        for token_type in self.scan_tokens(append):
+            if token_type is Type.UNKNOWN or token_type is Type.EOF:
+                self.token = tokens.get_token(len(tokens) - 1)
+                if token_type is Type.UNKNOWN:
+                    self.raise_exception("Unknown symbol", self.token.get_position())
+                return tokens
+
+    def scan_tokens(self, token_class=Token):
+        # yields whatever token_class makes of (type, value, line, column), a Token
+        # unless tokenize_all files them away itself
+        text = self.text
+        keywords = Symbol.keywords
+        special_characters = Symbol.special_characters
+        double_operators = Symbol.double_operators
+        identifier_type = Type.IDENTIFIER
+
+        while True:
+            line, line_start = self.line, self.line_start
+            for found in self.MASTER_PATTERN.finditer(text, self.index):
+                kind = found.lastgroup
+
+                if kind == "other":
+                    self.index = found.end(1)
+                    break
+
+                self.index = found.end()
+
+                if kind == "newline":
+                    # a newline at line_start was already counted by the source
+                    line += text.count("\n", max(found.start(kind), line_start + 1), self.index)
+                    line_start = self.line_start = text.rfind("\n", 0, self.index)
+                    self.line = line
+                    continue
+
+                if kind == "identifier":
+                    value = found[kind]
+                    yield token_class(keywords.get(value, identifier_type), value, line, found.end(1) - line_start)
+                elif kind == "operator" or kind == "single_operator":
+                    value = found[kind]
+                    yield token_class(special_characters[value], value, line, found.end(1) - line_start)
+                elif kind == "int":
+                    yield token_class(Type.INT, int(found[kind]), line, found.end(1) - line_start)
+                elif kind == "string":
+                    yield token_class(Type.STRING, found[kind], line, found.end(1) - line_start)
+                elif kind == "double_operator":
+                    value = found[kind]
+                    yield token_class(double_operators[value], value, line, found.end(1) - line_start)
+                elif kind == "comment":
+                    yield token_class(Type.COMMENT, found[kind], line, found.end(1) - line_start)
+                else:
+                    int_part, zeros, digits = found.group("int_part", "zeros", "digits")
+                    fract_value = int(digits) if digits else 0
+                    exp = len(zeros) + len(digits)
+                    yield token_class(Type.FLOAT, int(int_part) + fract_value * 10 ** (-exp), line,
+                                      found.end(1) - line_start)
+
+            yield self.scan_token(token_class)
+
+    def skip_whitespaces(self):
+        start = self.index
+        end = self.WHITESPACES.match(self.text, start).end()
+
+        if end != start:
+            # a newline at line_start was already counted by the source
+            newlines = self.text.count("\n", max(start, self.line_start + 1), end)
+            if newlines:
+                self.line += newlines
+                self.line_start = self.text.rfind("\n", start, end)
+            self.index = end
+
+    def scan_token(self, token_class=Token):
+        self.skip_whitespaces()
+
+        line, column = self.line, self.index - self.line_start
+
+        if self.index >= self.length:
+            return token_class(Type.EOF, None, line, column)
+
+        handler = self.handlers.get(self.text[self.index], self.construct_other)
+        token_type, value = handler()
+        return token_class(token_type, value, line, column)
+
+    def construct_operator(self):
+        character = self.text[self.index]
+        self.index += 1
+
+        if character in self.DOUBLE_OPERATOR_STARTS:
+            double_operator = character + self.get_current_char()
+            if double_operator in Symbol.double_operators:
+                self.index += 1
+                return Symbol.double_operators[double_operator], double_operator
+
+            if character not in Symbol.special_characters:
+                # like Lexer, a lone '&' or '|' is skipped and the next construct is tried
+                return self.construct_after_operator()
+
+        return Symbol.special_characters[character], character
+
+    def construct_after_operator(self):
+        character = self.get_current_char()
+
+        if character == '"':
+            return self.construct_string_literal()
+        return self.construct_other()
+
+    def construct_other(self):
+        character = self.get_current_char()
+
+        if character.isdigit():
+            return self.construct_number()
+        elif character.isalpha():
+            return self.construct_identifier()
+        elif character == '#':
+            return self.construct_comment()
+
+        return Type.UNKNOWN, character
+
+    def construct_string_literal(self):
+        text = self.text
+        start = self.index + 1
+
+        if start < self.length and text[start] == '"':
+            self.index = start + 1
+            return Type.STRING, ""
+
+        if start >= self.length:
+            self.index = start + 1
+            return Type.UNKNOWN, ""
+
+        if text[start] == "\n":
+            # the first character is taken as is, even a newline
+            self.line += 1
+            self.line_start = start
+
+        end = start + 1
+        while end < self.length and text[end] != '"' and text[end] != "\n":
+            end += 1
+
+        self.index = end
+        if end >= self.length or text[end] == "\n":
+            return Type.UNKNOWN, self.get_current_char()
+
+        self.index = end + 1
+        return Type.STRING, text[start:end]
+
+    def construct_number(self):
+        int_number = self.construct_int()
+
+        if self.get_current_char() == ".":
+            self.index += 1
+            fract_part = self.construct_fractional_part()
+            return Type.FLOAT, int_number + fract_part
+
+        return Type.INT, int_number
+
+    def construct_int(self):
+        if self.text[self.index] == "0":
+            self.index += 1
+            if self.get_current_char().isdigit():
+                self.raise_exception("An integer part of number cannot start with 0.")
+            return 0
+
+        text = self.text
+        int_value = 0
+        while self.index < self.length and text[self.index].isdigit() and int_value < Token.MAX_INT_NUMBER:
+            int_value = int_value * 10 + (ord(text[self.index]) - ord('0'))
+            self.index += 1
+
+        if int_value > Token.MAX_INT_NUMBER:
+            self.raise_exception("Exceeded max int limit.")
+
+        return int_value
+
+    def construct_fractional_part(self):
+        text = self.text
+        fract_value = 0
+        exp = 0
+
+        while self.index < self.length and text[self.index] == "0":
+            exp += 1
+            self.index += 1
+
+        while self.index < self.length and text[self.index].isdigit():
+            fract_value = fract_value * 10 + (ord(text[self.index]) - ord('0'))
+            exp += 1
+            self.index += 1
+
+        if len(str(fract_value)) > Token.MAX_FRACTIONAL_PART_LENGTH:
+            self.raise_exception("Exceeded max length of fractional part in number.")
+
+        return fract_value * 10 ** (-exp)
+
+    def construct_identifier(self):
+        text = self.text
+        start = self.index
+        end = self.IDENTIFIER_TAIL.match(text, start + 1).end()
+
+        # non-ASCII letters and digits are rare, check them one by one
+        while end < self.length and text[end] >= "\x80" and (text[end].isalpha() or text[end].isdigit()):
+            end = self.IDENTIFIER_TAIL.match(text, end + 1).end()
+
+        self.index = end
+        identifier = text[start:end]
+
+        if identifier in Symbol.keywords:
+            return Symbol.keywords[identifier], identifier
+        return Type.IDENTIFIER, identifier
+
+    def construct_comment(self):
+        start = self.index + 1
+        end = self.text.find("\n", start)
+        if end == -1:
+            end = self.length
+
+        self.index = end
+        return Type.COMMENT, self.text[start:end]
+
+
+def tokenize(source):
+    return FastLexer(source).tokenize_all()
+
+
+class TextCursor:
+    def __init__(self, lexer):
+        self.lexer = lexer
+
+    def get_char(self):
+        return self.lexer.get_current_char()
+
+    def get_position(self):
+        return self.lexer.get_current_position()
@@ -1,4 +1,4 @@
-from tokens import Token, Type, Symbol
+from tokens import Token, TokenArray, Type, Symbol
 from exceptions.lexer_exception import LexerException
 
 
@@ -25,6 +25,15 @@ class Lexer:
 
         self.token.set_position(line, column)
 
+    def tokenize_all(self):
+        tokens = TokenArray()
+
+        while True:
+            self.next_token()
+            tokens.append(self.token.token_type, self.token.value, self.token.line, self.token.column)
+            if self.token.token_type == Type.EOF:
+                return tokens
+
     def build_token(self):
         if self.construct_eof():
             return
@@ -1,21 +1,44 @@
 import unittest
 
 from tokens import Type
+from _lexer.fast_lexer import FastLexer
 from _lexer.lexer import Lexer
 from exceptions.lexer_exception import LexerException
-from readers.source import Source
+from readers.mapped_source import MappedSource
+from readers.source import Source, BufferedSource
 import io
+import os
+import tempfile
+
+
+# the text of ../test_file.txt, which TestLexer.test_file_source looks for next
+# to the working directory; the subclasses write it to a file of their own
+FILE_TEXT = 'let a = 4;\nconst b = "String";\n'
+
+
+def check_written_file(self):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "test_file.txt")
+        with open(path, "w") as file:
+            file.write(FILE_TEXT)
+        with open(path) as file:
+            self.check_file_tokens(self.create_lexer(file.read()))
 
 
 class TestLexer(unittest.TestCase):
 
+    source_class = Source
+    lexer_class = Lexer
+
     def create_lexer(self, string):
-        return Lexer(Source(io.StringIO(string)))
+        return self.lexer_class(self.source_class(io.StringIO(string)))
 
     def test_file_source(self):
         f = open('../test_file.txt', 'r')
         lexer = self.create_lexer(f.read())
+        self.check_file_tokens(lexer)
 
+    def check_file_tokens(self, lexer):
         lexer.next_token()
         assert lexer.get_token().get_value() == "let"
         assert lexer.get_token().get_type() == Type.LET
@@ -392,3 +415,156 @@ class TestLexer(unittest.TestCase):
         lexer.next_token()
         assert lexer.get_token().get_value() == "}"
         assert lexer.get_token().get_type() == Type.RIGHT_CURLY_BRACKET
+
+    def test_tokenize_all(self):
+        program = 'function main() {\n let a = 1; let b = 1.0; let c = true;\n print(a, "a", 1);\n}'
+
+        expected_lexer = self.create_lexer(program)
+        tokens = self.create_lexer(program).tokenize_all()
+
+        for index in range(len(tokens)):
+            expected_lexer.next_token()
+            expected = expected_lexer.get_token()
+            token = tokens.get_token(index)
+
+            self.assertEqual(token.get_type(), expected.get_type())
+            self.assertEqual(type(token.get_value()), type(expected.get_value()))
+            self.assertEqual(token.get_value(), expected.get_value())
+            self.assertEqual(token.get_position(), expected.get_position())
+
+        self.assertEqual(tokens.get_type(len(tokens) - 1), Type.EOF)
+        self.assertEqual(len(tokens.values), len(set((type(value), value) for value in tokens.values)))
+
+    def test_tokenize_all_exception(self):
+        lexer = self.create_lexer("let a = 1;\n  let b = $;")
+
+        with self.assertRaises(LexerException) as context:
+            lexer.tokenize_all()
+
+        self.assertEqual((context.exception.line, context.exception.column), (2, 11))
+
+
+class TestLexerBufferedSource(TestLexer):
+
+    source_class = BufferedSource
+
+    test_file_source = check_written_file
+
+    def test_chunk_boundaries(self):
+        program = 'function main() {\n let a = 4 >= 3;\n # comment\n print("str", 1.25);\n}'
+
+        expected_lexer = Lexer(Source(io.StringIO(program)))
+        expected = []
+        while expected_lexer.get_token().get_type() != Type.EOF:
+            expected_lexer.next_token()
+            token = expected_lexer.get_token()
+            expected.append((token.get_type(), token.get_value(), token.get_position()))
+
+        for chunk_size in [1, 2, 3, 7, -1]:
+            with self.subTest(chunk_size=chunk_size):
+                lexer = Lexer(BufferedSource(io.StringIO(program), chunk_size=chunk_size))
+                tokens = []
+                while lexer.get_token().get_type() != Type.EOF:
+                    lexer.next_token()
+                    token = lexer.get_token()
+                    tokens.append((token.get_type(), token.get_value(), token.get_position()))
+
+                self.assertEqual(tokens, expected)
+                self.assertEqual(lexer.source.get_position(), expected_lexer.source.get_position())
+
+
+class TestLexerMappedSource(TestLexer):
+
+    test_file_source = check_written_file
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sources = []
+
+    def tearDown(self):
+        for source in self.sources:
+            source.close()
+        self.directory.cleanup()
+
+    def write_file(self, string):
+        path = os.path.join(self.directory.name, f"source{len(self.sources)}.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(string)
+        return path
+
+    def create_source(self, string, chunk_size=MappedSource.DEFAULT_CHUNK_SIZE):
+        source = MappedSource(self.write_file(string), chunk_size=chunk_size)
+        self.sources.append(source)
+        return source
+
+    def create_lexer(self, string):
+        return Lexer(self.create_source(string))
+
+    def test_multibyte_positions(self):
+        program = 'let żółw = "ąę";\n  const ñ = 2;\n  $'
+
+        for chunk_size in [1, 2, 5, -1]:
+            with self.subTest(chunk_size=chunk_size):
+                expected_lexer = Lexer(Source(io.StringIO(program)))
+                lexer = Lexer(self.create_source(program, chunk_size))
+
+                for _ in range(10):
+                    expected_lexer.next_token()
+                    lexer.next_token()
+                    self.assertEqual(lexer.get_token().get_value(), expected_lexer.get_token().get_value())
+                    self.assertEqual(lexer.get_token().get_position(), expected_lexer.get_token().get_position())
+
+                with self.assertRaises(LexerException) as context:
+                    lexer.next_token()
+
+                self.assertEqual((context.exception.line, context.exception.column), (3, 3))
+
+
+class TestFastLexer(TestLexer):
+
+    lexer_class = FastLexer
+
+    test_file_source = check_written_file
+
+    test_programs = [
+        'function main() {\n let a = 4 >= 3;\n # comment\n print("str", 1.25);\n}',
+        'a&b |"str" &&|| &5 =>= !== <<= _x',
+        'let żółw = 2; const ñ1_2 = "ąę"; x²',
+        '1.000 0.5 1. 4294967296 42949672951 007',
+        '"\nstring" "unterminated\n"',
+        '  \n\n  "',
+        'a &',
+        '1.00000000001',
+        '0.123456789012',
+        'x = 1\t;',
+    ]
+
+    def collect(self, lexer):
+        tokens = []
+        try:
+            while not tokens or tokens[-1][0] != Type.EOF:
+                lexer.next_token()
+                token = lexer.get_token()
+                tokens.append((token.get_type(), token.get_value(), token.get_position(), lexer.source.get_position()))
+        except LexerException as exception:
+            tokens.append((exception.get_message(), lexer.source.get_position()))
+        return tokens
+
+    def test_same_tokens_as_lexer(self):
+        for program in self.test_programs:
+            with self.subTest(program=program):
+                expected = self.collect(Lexer(Source(io.StringIO(program))))
+                tokens = self.collect(FastLexer(Source(io.StringIO(program))))
+                self.assertEqual(tokens, expected)
+
+    def test_start_in_the_middle_of_source(self):
+        program = '\nlet a = 1;\n  print(a);'
+        source = Source(io.StringIO(program))
+        source.get_next_char()
+        source.get_next_char()
+
+        expected_source = Source(io.StringIO(program))
+        expected_source.get_next_char()
+        expected_source.get_next_char()
+
+        self.assertEqual(self.collect(FastLexer(source)), self.collect(Lexer(expected_source)))
@@ -0,0 +1,171 @@
+import copy
+
+from _interpreter.runtime import parameter_list
+from _optimizer.nodes import callable_functions, descendants, is_literal, literal, unwrap
+from tree.block import Block
+from tree.expressions.parent_logic_expression import ParentLogicExpression
+from tree.identifier import Identifier
+from tree.node import Node
+from tree.statements._return import Return
+from tree.statements.assign import Assign
+from tree.statements.comment import Comment
+from tree.statements.conditional import Conditional
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.statements.match import Match
+
+
+# largest function body, in nodes, that gets copied into its callers
+INLINE_SIZE = 32
+# most calls inlined into one function
+INLINE_CALLS = 32
+
+
+# Replaces `a = f(...);` by the body of f when that body only decides what to
+# return: a return, or ifs with an else whose blocks do the same. The returns
+# become assignments to a. The body may only use its parameters, so the
+# dynamic scope can't tell the difference. Literal arguments and variables
+# declared where the call is are put in place of the parameters, any other
+# argument is evaluated once into a fresh let or const, in a block of its own.
+
+class Inliner:
+
+    def __init__(self, size=INLINE_SIZE, calls=INLINE_CALLS, resolved=()):
+        self.size = size
+        self.calls = calls
+        # id() of the identifiers that read a variable declared before them
+        self.resolved = resolved
+
+        self.functions = {}
+        self.names = set()
+        self.done = set()
+        self.in_progress = set()
+
+    def inline(self, program):
+        self.names = {function.identifier for function in program.functions}
+        for function in program.functions:
+            self.names.update(name for name, _ in parameter_list(function))
+            for node in descendants(function):
+                self.names.update(name for name in (getattr(node, "identifier", None), getattr(node, "name", None))
+                                  if isinstance(name, str))
+
+        self.functions = callable_functions(program)
+
+        for function in program.functions:
+            self.inline_function(function)
+        return program
+
+    def inline_function(self, function):
+        if function.identifier in self.done or function.identifier in self.in_progress:
+            return
+
+        self.in_progress.add(function.identifier)
+        if function.body is not None:
+            self.inline_block(function.body, [self.calls])
+        self.in_progress.remove(function.identifier)
+        self.done.add(function.identifier)
+
+    def inline_block(self, block, budget):
+        statements = []
+        for statement in block.statements:
+            for inner in [getattr(statement, "body", None), *getattr(statement, "blocks", [])]:
+                if isinstance(inner, Block):
+                    self.inline_block(inner, budget)
+            statements.append(self.inline_call(statement, budget))
+        block.statements = statements
+
+    def inline_call(self, statement, budget):
+        call = unwrap(statement.expression) if isinstance(statement, Assign) else None
+        if not isinstance(call, FunctionCall) or budget[0] <= 0:
+            return statement
+
+        function = self.functions.get(call.identifier)
+        # a function calling back into one being inlined is recursive
+        if function is None or function.identifier in self.in_progress:
+            return statement
+        self.inline_function(function)
+
+        parameters = parameter_list(function)
+        tree = self.return_tree(function.body.statements) if function.body is not None else None
+        if tree is None or len(parameters) != len(call.arguments) or not self.fits(tree, parameters):
+            return statement
+
+        budget[0] -= 1
+        return self.expand(statement.identifier, function.identifier, parameters, call.arguments, tree)
+
+    def return_tree(self, statements):
+        statements = [statement for statement in statements if not isinstance(statement, Comment)]
+        if not statements:
+            return None
+
+        first = statements[0]
+        if isinstance(first, Return):
+            return first if first.expression is not None else None
+        if not isinstance(first, Conditional) or any(block is None for block in first.blocks):
+            return None
+
+        trees = [self.return_tree(block.statements) for block in first.blocks]
+        if None in trees:
+            return None
+        if len(first.blocks) > len(first.conditions):
+            return Conditional(first.conditions, [Block([tree]) for tree in trees])
+        # an elif without an else runs differently in the tree-walker
+        if first.is_single_if():
+            otherwise = self.return_tree(statements[1:])
+            if otherwise is not None:
+                return Conditional(first.conditions, [Block([trees[0]]), Block([otherwise])])
+        return None
+
+    def fits(self, tree, parameters):
+        names = {name for name, _ in parameters}
+        size = 0
+        for node in descendants(tree):
+            if isinstance(node, (FunctionCall, Match)) or isinstance(node, Identifier) and node.name not in names:
+                return False
+            size += 1
+        return size <= self.size
+
+    def fresh_name(self, function, name):
+        index = 1
+        while f"{function}_{name}_{index}" in self.names:
+            index += 1
+        self.names.add(f"{function}_{name}_{index}")
+        return f"{function}_{name}_{index}"
+
+    def expand(self, target, function, parameters, arguments, tree):
+        bindings, substitutions = [], {}
+        for (name, is_const), argument in zip(parameters, arguments):
+            value = unwrap(argument)
+            if is_literal(value) or isinstance(value, Identifier) and id(value) in self.resolved:
+                substitutions[name] = argument
+            else:
+                local = self.fresh_name(function, name)
+                bindings.append((Const if is_const else Let)(local, argument))
+                substitutions[name] = ParentLogicExpression(Identifier(local))
+
+        statement = assign_returns(substitute(copy.deepcopy(tree), substitutions), target)
+        if bindings:
+            return Conditional([literal(True)], [Block(bindings + [statement])])
+        return statement
+
+
+def substitute(node, substitutions):
+    for cls in type(node).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            value = getattr(node, name, None)
+            if isinstance(value, list):
+                value[:] = [substitute(item, substitutions) if isinstance(item, Node) else item for item in value]
+            elif isinstance(value, Node):
+                setattr(node, name, substitute(value, substitutions))
+
+    if isinstance(node, Identifier) and node.name in substitutions:
+        return copy.deepcopy(substitutions[node.name])
+    return node
+
+
+def assign_returns(tree, target):
+    if isinstance(tree, Return):
+        return Assign(target, tree.expression)
+    tree.blocks = [Block([assign_returns(block.statements[0], target)]) for block in tree.blocks]
+    return tree
@@ -0,0 +1,75 @@
+import functools
+
+from _interpreter.runtime import parameter_list
+from tree.bool import Bool
+from tree.expressions.parent_logic_expression import ParentLogicExpression
+from tree.float import Float
+from tree.int import Int
+from tree.node import Node
+from tree.statements.const import Const
+from tree.statements.let import Let
+from tree.string import String
+
+
+LITERAL_CLASSES = {int: Int, float: Float, str: String, bool: Bool}
+
+
+def unwrap(node):
+    while isinstance(node, ParentLogicExpression):
+        node = node.expression
+    return node
+
+
+def literal(value):
+    return ParentLogicExpression(LITERAL_CLASSES[value.__class__](value))
+
+
+def is_literal(node):
+    return isinstance(unwrap(node), (Int, Float, String, Bool))
+
+
+@functools.lru_cache(maxsize=None)
+def slot_names(cls):
+    return tuple(name for base in cls.__mro__ for name in getattr(base, "__slots__", ()))
+
+
+@functools.lru_cache(maxsize=None)
+def is_node_class(cls):
+    # isinstance against the abstract Node goes through ABCMeta, slow for the
+    # plain values most slots hold
+    return issubclass(cls, Node)
+
+
+def children(node):
+    # the nodes right below any tree node, found through its slots
+    for name in slot_names(node.__class__):
+        value = getattr(node, name, None)
+        if is_node_class(value.__class__):
+            yield value
+        elif value.__class__ is list:
+            yield from (child for child in value if is_node_class(child.__class__))
+        elif value.__class__ is dict:
+            for key, items in value.items():
+                yield key
+                if items.__class__ is list:
+                    yield from (child for child in items if is_node_class(child.__class__))
+
+
+def descendants(node):
+    # parents before their children, like a recursive walk would give them
+    stack = [*children(node)][::-1]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend([*children(node)][::-1])
+
+
+def callable_functions(program):
+    # {name: function} of the functions defined once whose name no variable
+    # takes, the passes match names without telling the two apart
+    defined = [function.identifier for function in program.functions]
+    variables = {node.identifier for function in program.functions for node in descendants(function)
+                 if isinstance(node, (Let, Const))}
+    variables.update(name for function in program.functions for name, _ in parameter_list(function))
+    return {function.identifier: function for function in program.functions
+            if defined.count(function.identifier) == 1 and function.identifier not in variables}
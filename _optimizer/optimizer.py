@@ -0,0 +1,591 @@
+import copy
+import math
+import operator
+
+from _interpreter import runtime
+from _optimizer.inliner import INLINE_CALLS, INLINE_SIZE, Inliner
+from _optimizer.nodes import LITERAL_CLASSES, children, literal, unwrap
+from exceptions.interpreter_exception import InterpreterException
+from tree.bool import Bool
+from tree.expressions.add_expression import AddExpression
+from tree.expressions.and_expression import AndExpression
+from tree.expressions.equal_expression import EqualExpression
+from tree.expressions.multiply_expression import MultiplyExpression
+from tree.expressions.negative_expression import NegativeExpression
+from tree.expressions.not_expression import NotExpression
+from tree.expressions.or_expression import OrExpression
+from tree.expressions.parent_logic_expression import ParentLogicExpression
+from tree.expressions.relation_expression import RelationExpression
+from tree.expressions.unary_expression import UnaryExpression
+from tree.float import Float
+from tree.int import Int
+from tree.operators.divide import DivideOperator
+from tree.operators.minus import MinusOperator
+from tree.operators.multiply import MultiplyOperator
+from tree.operators.plus import PlusOperator
+from tree.identifier import Identifier
+from tree.statements._print import Print
+from tree.statements._return import Return
+from tree.statements._while import While
+from tree.statements.assign import Assign
+from tree.statements.comment import Comment
+from tree.statements.conditional import Conditional
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.statements.match import Match
+from tree.string import String
+from tree.visitor import Visitor
+
+
+NO_OPTIMIZATION = 0
+# literal-only subexpressions are computed once
+CONSTANT_FOLDING = 1
+# also x * 1, x - 0 and the like, and branches with constant conditions
+SIMPLIFICATION = 2
+# also statements that can never run or whose result is never used
+DEAD_CODE_ELIMINATION = 3
+# also small functions copied into their callers first
+INLINING = 4
+
+NOT_CONSTANT = object()
+
+INT, NUMBER = "int", "number"
+
+
+def merge_kinds(kinds):
+    kinds = set(kinds)
+    if kinds == {INT}:
+        return INT
+    return NUMBER if kinds <= {INT, NUMBER} else None
+
+
+def always_returns(statement):
+    # only an if with an else, without one the tree-walker runs the last block
+    if isinstance(statement, Return):
+        return True
+    if isinstance(statement, Conditional) and len(statement.blocks) > len(statement.conditions):
+        return all(block is not None and any(always_returns(inner) for inner in block.statements)
+                   for block in statement.blocks)
+    return False
+
+
+def can_return(statement):
+    # whether the statement can pass the RETURN signal up, a call returns a value and
+    # never the signal, a tail call's assign is always followed by a return
+    if isinstance(statement, (Return, Match)):
+        return True
+    if isinstance(statement, While):
+        return statement.body is not None and statement.body.can_return
+    if isinstance(statement, Conditional):
+        return any(block is not None and block.can_return for block in statement.blocks)
+    return False
+
+
+def can_be_literal(value):
+    # the engines write literals back as source, inf and nan have none
+    return value.__class__ in LITERAL_CLASSES and (value.__class__ is not float or math.isfinite(value))
+
+
+class Declaration:
+    __slots__ = ("name", "values", "kind")
+
+    def __init__(self, name, kind=INT):
+        self.name = name
+        self.values = []
+        self.kind = kind
+
+
+class KindAnalysis:
+    # finds the variables that only ever hold numbers, like the resolver it
+    # ties every use to its declaration and gives up on names another function
+    # could assign through the dynamic scope
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.declarations = []
+        self.references = {}
+        self.free = set()
+        # every name read, assigned or called anywhere
+        self.used = set()
+        self.scopes = []
+
+    def analyze(self, program):
+        for function in program.functions:
+            self.scopes = [{}]
+            for name in (function.parameters or {}):
+                self.scopes[0][name] = Declaration(name, kind=None)
+            self.walk_block(function.body)
+
+        for declaration in self.declarations:
+            if declaration.name in self.free:
+                declaration.kind = None
+
+        # kinds only go from int to number to unknown, so this ends
+        self.optimizer.identifier_kinds = {key: declaration.kind for key, declaration in self.references.items()}
+        self.optimizer.used_names = self.used
+        changed = True
+        while changed:
+            changed = False
+            for declaration in self.declarations:
+                if declaration.kind is None:
+                    continue
+                kind = merge_kinds(self.optimizer.kind(value) for value in declaration.values)
+                if kind != declaration.kind:
+                    declaration.kind = kind
+                    changed = True
+            self.optimizer.identifier_kinds = {key: declaration.kind for key, declaration in self.references.items()}
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        self.free.add(name)
+        return None
+
+    def walk_block(self, block):
+        if block is None:
+            return
+        self.scopes.append({})
+        for statement in block.statements:
+            self.walk_statement(statement)
+        self.scopes.pop()
+
+    def walk_statement(self, statement):
+        if isinstance(statement, (Let, Const)):
+            self.walk_expression(statement.expression)
+            declaration = self.scopes[-1].get(statement.identifier)
+            if declaration is None:
+                declaration = self.scopes[-1][statement.identifier] = Declaration(statement.identifier)
+                self.declarations.append(declaration)
+            declaration.values.append(statement.expression)
+        elif isinstance(statement, Assign):
+            self.walk_expression(statement.expression)
+            self.used.add(statement.identifier)
+            declaration = self.lookup(statement.identifier)
+            if declaration is not None:
+                declaration.values.append(statement.expression)
+        elif isinstance(statement, While):
+            self.walk_expression(statement.expression)
+            self.walk_block(statement.body)
+        elif isinstance(statement, Conditional):
+            for condition in statement.conditions:
+                self.walk_expression(condition)
+            for block in statement.blocks:
+                self.walk_block(block)
+        elif isinstance(statement, Match) and statement.conditions is not None:
+            for expression in statement.expressions:
+                self.walk_expression(expression)
+            for _return, case_conditions in statement.conditions.items():
+                for condition in case_conditions if isinstance(case_conditions, list) else []:
+                    self.walk_expression(condition)
+                self.walk_statement(_return)
+        elif isinstance(statement, Return):
+            self.walk_expression(statement.expression)
+        elif isinstance(statement, Print):
+            for argument in statement.arguments:
+                self.walk_expression(argument)
+        elif isinstance(statement, FunctionCall):
+            self.walk_expression(statement)
+
+    def walk_expression(self, expression):
+        if expression is None:
+            return
+        if isinstance(expression, Identifier):
+            self.used.add(expression.name)
+            declaration = self.lookup(expression.name)
+            if declaration is not None:
+                self.references[id(expression)] = declaration
+            return
+        if isinstance(expression, FunctionCall):
+            self.used.add(expression.identifier)
+        for child in children(expression):
+            self.walk_expression(child)
+
+
+class Optimizer(Visitor):
+
+    def __init__(self, level=INLINING, inline_size=INLINE_SIZE, inline_calls=INLINE_CALLS):
+        self.level = level
+        self.inline_size = inline_size
+        self.inline_calls = inline_calls
+        # kind of the variable each identifier reads, by id() of the Identifier,
+        # only identifiers that read a declaration of their own function are in it
+        self.identifier_kinds = {}
+        self.used_names = set()
+
+    def optimize(self, program):
+        # the parsed program stays as it is, so it can still be run unoptimized
+        if self.level <= NO_OPTIMIZATION or program is None or not hasattr(program, "functions"):
+            return program
+
+        program = copy.deepcopy(program)
+        if self.level >= INLINING:
+            KindAnalysis(self).analyze(program)
+            Inliner(self.inline_size, self.inline_calls, self.identifier_kinds).inline(program)
+        if self.level >= SIMPLIFICATION:
+            KindAnalysis(self).analyze(program)
+        for function in program.functions:
+            function.accept(self)
+        return program
+
+    def optimize_expression(self, expression):
+        return expression.accept(self) if expression is not None else None
+
+    def value_of(self, node):
+        node = unwrap(node)
+        if isinstance(node, (Int, Float, String, Bool)):
+            return runtime.literal_value(node)
+        return NOT_CONSTANT
+
+    def fold(self, function, *nodes):
+        values = [self.value_of(node) for node in nodes]
+        if NOT_CONSTANT in values:
+            return None
+
+        # a failing operation is left for run time, where it raises as before
+        try:
+            value = function(*values)
+        except (InterpreterException, ArithmeticError, TypeError):
+            return None
+        return literal(value) if can_be_literal(value) else None
+
+    def kind(self, node):
+        node = unwrap(node)
+        if isinstance(node, Int):
+            return INT
+        if isinstance(node, Float):
+            return NUMBER
+        if isinstance(node, Identifier):
+            return self.identifier_kinds.get(id(node))
+        if isinstance(node, UnaryExpression) and isinstance(node.expression, NegativeExpression):
+            return INT if self.kind(node.expression.expression) == INT else NUMBER
+        if isinstance(node, (AddExpression, MultiplyExpression)):
+            return self.chain_kind(node.expressions, node.operators)
+        return None
+
+    def chain_kind(self, expressions, operators):
+        # arithmetic either raises or gives a number, an int when ints are added or multiplied
+        if len(expressions) == 1:
+            return self.kind(expressions[0])
+        if any(isinstance(_operator, DivideOperator) for _operator in operators):
+            return NUMBER
+        return INT if all(self.kind(expression) == INT for expression in expressions) else NUMBER
+
+    def simplify(self, _operator, expressions, operators, right):
+        # only identities that hold for every value the left side can have
+        left_kind = self.chain_kind(expressions, operators)
+        right_value = self.value_of(right)
+        if right_value.__class__ is int and left_kind is not None:
+            if right_value == 1 and isinstance(_operator, MultiplyOperator):
+                return True
+            if right_value == 0 and isinstance(_operator, MinusOperator):
+                return True
+            # -0.0 + 0 is 0.0
+            if right_value == 0 and isinstance(_operator, PlusOperator) and left_kind == INT:
+                return True
+
+        if len(expressions) == 1 and self.value_of(expressions[0]).__class__ is int:
+            left_value, right_kind = self.value_of(expressions[0]), self.kind(right)
+            if left_value == 1 and isinstance(_operator, MultiplyOperator) and right_kind is not None:
+                expressions[0] = right
+                return True
+            if left_value == 0 and isinstance(_operator, PlusOperator) and right_kind == INT:
+                expressions[0] = right
+                return True
+
+        return False
+
+    def fold_operators(self, node, arithmetic):
+        expressions = [expression.accept(self) for expression in node.expressions]
+
+        # operators apply from the left, so only a constant prefix can be folded
+        result_expressions, result_operators = [expressions[0]], []
+        for _operator, expression in zip(node.operators, expressions[1:]):
+            if len(result_expressions) == 1:
+                folded = self.fold(lambda left, right: _operator.accept(self, left, right),
+                                   result_expressions[0], expression)
+                if folded is not None:
+                    result_expressions[0] = folded
+                    continue
+            if arithmetic and self.level >= SIMPLIFICATION and \
+                    self.simplify(_operator, result_expressions, result_operators, expression):
+                continue
+            result_expressions.append(expression)
+            result_operators.append(_operator)
+
+        if len(result_expressions) == 1:
+            return result_expressions[0]
+
+        node.expressions, node.operators = result_expressions, result_operators
+        return node
+
+    def fold_logic(self, node, function, neutral):
+        node.expressions = [expression.accept(self) for expression in node.expressions]
+
+        folded = self.fold(lambda *values: function(values), *node.expressions)
+        if folded is not None:
+            return folded
+
+        # every operand is evaluated, only constants that can't change the result go
+        if self.level >= SIMPLIFICATION:
+            remaining = [expression for expression in node.expressions
+                         if self.value_of(expression) is NOT_CONSTANT or bool(self.value_of(expression)) != neutral]
+            if len(remaining) >= 2:
+                node.expressions = remaining
+        return node
+
+    def is_pure(self, node):
+        # evaluating it can neither fail nor change anything
+        node = unwrap(node)
+        if self.value_of(node) is not NOT_CONSTANT:
+            return True
+        if isinstance(node, Identifier):
+            return id(node) in self.identifier_kinds
+        if isinstance(node, UnaryExpression):
+            return self.is_pure(node.expression)
+        if isinstance(node, NegativeExpression):
+            return self.is_pure(node.expression) and self.kind(node.expression) is not None
+        if isinstance(node, NotExpression):
+            return self.is_pure(node.expression)
+        if isinstance(node, (OrExpression, AndExpression, EqualExpression)):
+            return all(self.is_pure(expression) for expression in node.expressions)
+        if isinstance(node, RelationExpression):
+            return all(self.is_pure(expression) and self.kind(expression) is not None
+                       for expression in node.expressions)
+        if isinstance(node, (AddExpression, MultiplyExpression)):
+            # ints can't overflow or be divided by zero
+            return not any(isinstance(_operator, DivideOperator) for _operator in node.operators) and \
+                all(self.is_pure(expression) and self.kind(expression) == INT for expression in node.expressions)
+        return False
+
+    def is_dead(self, statement):
+        if isinstance(statement, Comment):
+            return True
+        # functions and variables share names in the tree-walker, so a call counts as a use
+        if isinstance(statement, (Let, Const)):
+            return statement.identifier not in self.used_names and self.is_pure(statement.expression)
+        return False
+
+    def eliminate_dead_code(self, block):
+        statements = []
+        for statement in block.statements:
+            if self.is_dead(statement):
+                continue
+            statements.append(statement)
+            if always_returns(statement):
+                break
+        block.statements = statements
+        block.can_return = any(can_return(statement) for statement in statements)
+
+    def prune_conditional(self, conditional):
+        values = [self.value_of(condition) for condition in conditional.conditions]
+        if all(value is NOT_CONSTANT for value in values):
+            return conditional
+
+        conditions, blocks = [], []
+        # an elif chain without an else runs its last block when nothing holds,
+        # which stays so only as an else of its own once conditions go
+        has_else = not conditional.is_single_if()
+        otherwise = conditional.blocks[-1] if has_else else None
+        if len(conditional.blocks) == len(conditional.conditions):
+            otherwise = copy.deepcopy(otherwise)
+
+        for condition, block, value in zip(conditional.conditions, conditional.blocks, values):
+            if value is NOT_CONSTANT:
+                conditions.append(condition)
+                blocks.append(block)
+            elif value:
+                # always taken, nothing after it can run
+                has_else, otherwise = True, block
+                break
+
+        if not conditions:
+            if not has_else or otherwise is None:
+                return None
+            return Conditional([literal(True)], [otherwise])
+
+        conditional.conditions = conditions
+        conditional.blocks = blocks + [otherwise] if has_else else blocks
+        return conditional
+
+    def visit_program(self, program):
+        pass
+
+    def visit_function(self, function):
+        if function.body is not None:
+            function.body.accept(self)
+        return function
+
+    def visit_parameters(self, parameters):
+        pass
+
+    def visit_block(self, block, scope=None):
+        statements = []
+        for statement in block.statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                statements.append(statement)
+        block.statements = statements
+        if self.level >= DEAD_CODE_ELIMINATION:
+            self.eliminate_dead_code(block)
+        block.count_declarations()
+        return block
+
+    def visit_statement(self, statement):
+        return statement
+
+    def visit_comment(self, comment):
+        return comment
+
+    def visit_let(self, let):
+        let.expression = let.expression.accept(self)
+        return let
+
+    def visit_const(self, const):
+        const.expression = const.expression.accept(self)
+        return const
+
+    def visit_assign(self, assign):
+        assign.expression = assign.expression.accept(self)
+        return assign
+
+    def visit_print(self, _print):
+        _print.arguments = [argument.accept(self) for argument in _print.arguments]
+        return _print
+
+    def visit_return(self, _return):
+        _return.expression = self.optimize_expression(_return.expression)
+        return _return
+
+    def visit_while(self, while_loop):
+        while_loop.expression = while_loop.expression.accept(self)
+        if while_loop.body is not None:
+            while_loop.body.accept(self)
+        return while_loop
+
+    def visit_conditional(self, conditional):
+        conditional.conditions = [condition.accept(self) for condition in conditional.conditions]
+        for block in conditional.blocks:
+            if block is not None:
+                block.accept(self)
+
+        if self.level >= SIMPLIFICATION:
+            return self.prune_conditional(conditional)
+        return conditional
+
+    def visit_match(self, match):
+        if match.conditions is None:
+            return match
+
+        match.expressions = [expression.accept(self) for expression in match.expressions]
+        conditions = {}
+        for _return, case_conditions in match.conditions.items():
+            if isinstance(case_conditions, list):
+                case_conditions = [condition.accept(self) for condition in case_conditions]
+            conditions[_return.accept(self)] = case_conditions
+        match.conditions = conditions
+        return match
+
+    def visit_function_call(self, function_call):
+        function_call.arguments = [argument.accept(self) for argument in function_call.arguments]
+        return function_call
+
+    def visit_native_function(self, native_function, args):
+        pass
+
+    def visit_arguments(self, arguments):
+        pass
+
+    def visit_or_expression(self, or_expression):
+        return self.fold_logic(or_expression, any, False)
+
+    def visit_and_expression(self, and_expression):
+        return self.fold_logic(and_expression, all, True)
+
+    def visit_equal_expression(self, equal_expression):
+        return self.fold_operators(equal_expression, arithmetic=False)
+
+    def visit_rel_expression(self, rel_expression):
+        return self.fold_operators(rel_expression, arithmetic=False)
+
+    def visit_add_expression(self, add_expression):
+        return self.fold_operators(add_expression, arithmetic=True)
+
+    def visit_mult_expression(self, mult_expression):
+        return self.fold_operators(mult_expression, arithmetic=True)
+
+    def visit_unary_expression(self, unary_expression):
+        expression = unary_expression.expression.accept(self)
+        if isinstance(expression, ParentLogicExpression):
+            return expression
+        unary_expression.expression = expression
+        return unary_expression
+
+    def visit_not_expression(self, not_expression):
+        not_expression.expression = not_expression.expression.accept(self)
+        return self.fold(operator.not_, not_expression.expression) or not_expression
+
+    def visit_negative_expression(self, negative_expression):
+        negative_expression.expression = negative_expression.expression.accept(self)
+        return self.fold(runtime.negative, negative_expression.expression) or negative_expression
+
+    def visit_parent_logic_expression(self, expression):
+        inner = expression.expression.accept(self)
+        if isinstance(inner, ParentLogicExpression):
+            return inner
+        expression.expression = inner
+        return expression
+
+    def visit_variable(self, variable):
+        pass
+
+    def visit_identifier(self, identifier):
+        return identifier
+
+    def visit_literal(self, literal_node):
+        return literal_node
+
+    visit_bool = visit_int = visit_string = visit_float = visit_literal
+
+    def visit_equal_operator(self, equal_operator, left_value=None, right_value=None):
+        return left_value == right_value
+
+    def visit_not_equal_operator(self, not_eq_operator, left_value=None, right_value=None):
+        return left_value != right_value
+
+    def visit_greater_equal_operator(self, ge_operator, left_value, right_value):
+        return runtime.compare(operator.ge, left_value, right_value)
+
+    def visit_greater_operator(self, gt_operator, left_value, right_value):
+        return runtime.compare(operator.gt, left_value, right_value)
+
+    def visit_less_equal_operator(self, le_operator, left_value, right_value):
+        return runtime.compare(operator.le, left_value, right_value)
+
+    def visit_less_operator(self, lt_operator, left_value, right_value):
+        return runtime.compare(operator.lt, left_value, right_value)
+
+    def visit_plus_operator(self, plus_operator, left_value, right_value):
+        return runtime.add(left_value, right_value)
+
+    def visit_minus_operator(self, minus_operator, left_value, right_value):
+        return runtime.subtract(left_value, right_value)
+
+    def visit_multiply_operator(self, mult_operator, left_value, right_value):
+        return runtime.multiply(left_value, right_value)
+
+    def visit_divide_operator(self, div_operator, left_value, right_value):
+        return runtime.divide(left_value, right_value)
+
+    def visit_not_operator(self, not_operator, value=None):
+        pass
+
+    def visit_negative_operator(self, neg_operator, value=None):
+        pass
+
+    def visit_or_operator(self, or_operator):
+        pass
+
+    def visit_and_operator(self, and_operator):
+        pass
@@ -0,0 +1,86 @@
+from _interpreter.runtime import parameter_list
+from _optimizer.nodes import callable_functions, descendants
+from tree.identifier import Identifier
+from tree.statements._print import Print
+from tree.statements._return import Return
+from tree.statements._while import While
+from tree.statements.assign import Assign
+from tree.statements.comment import Comment
+from tree.statements.conditional import Conditional
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+from tree.statements.let import Let
+from tree.statements.match import Match
+
+
+# A function is pure when its result only depends on its arguments and
+# running it changes nothing outside: it doesn't print, reads and assigns
+# only its own variables, as the dynamic scope would otherwise let it reach
+# those of its callers, and only calls pure functions. Allowing print gives
+# the functions that can't see the variables of their callers.
+
+class PurityAnalysis:
+
+    def __init__(self, allow_print=False):
+        self.allow_print = allow_print
+        self.calls = set()
+        self.scopes = []
+
+    def pure_functions(self, program):
+        functions = callable_functions(program)
+
+        calls = {}
+        for name, function in functions.items():
+            self.calls = set()
+            self.scopes = [{parameter for parameter, _ in parameter_list(function)}]
+            if self.walk_block(function.body):
+                calls[name] = self.calls
+
+        # recursion is fine, so start from every candidate and drop the ones calling outside the set
+        pure = set(calls)
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not calls[name] <= pure:
+                    pure.remove(name)
+                    changed = True
+        return pure
+
+    def is_declared(self, name):
+        return any(name in scope for scope in self.scopes)
+
+    def walk_block(self, block):
+        if block is None:
+            return True
+
+        self.scopes.append(set())
+        pure = all(self.walk_statement(statement) for statement in block.statements)
+        self.scopes.pop()
+        return pure
+
+    def walk_statement(self, statement):
+        if isinstance(statement, (Let, Const)):
+            pure = self.walk_expression(statement.expression)
+            self.scopes[-1].add(statement.identifier)
+            return pure
+        if isinstance(statement, Assign):
+            return self.walk_expression(statement.expression) and self.is_declared(statement.identifier)
+        if isinstance(statement, While):
+            return self.walk_expression(statement.expression) and self.walk_block(statement.body)
+        if isinstance(statement, Conditional):
+            return all(self.walk_expression(condition) for condition in statement.conditions) and \
+                all(self.walk_block(block) for block in statement.blocks)
+        if isinstance(statement, (Return, Match, FunctionCall)):
+            return self.walk_expression(statement)
+        if isinstance(statement, Print):
+            return self.allow_print and all(self.walk_expression(argument) for argument in statement.arguments)
+        return isinstance(statement, Comment)
+
+    def walk_expression(self, expression):
+        for node in [expression, *descendants(expression)]:
+            if isinstance(node, Identifier) and not self.is_declared(node.name):
+                return False
+            if isinstance(node, FunctionCall):
+                self.calls.add(node.identifier)
+        return True
@@ -0,0 +1,29 @@
+from _interpreter.runtime import parameter_list
+from _optimizer.nodes import callable_functions, descendants, unwrap
+from _optimizer.purity import PurityAnalysis
+from tree.block import Block
+from tree.identifier import Identifier
+from tree.statements._return import Return
+from tree.statements.assign import Assign
+from tree.statements.function_call import FunctionCall
+
+
+def tail_calls(program):
+    # id() of every `r = f(...);` directly followed by `return r;` inside f,
+    # the only way a call can end a function. Only functions that can't see
+    # the variables of their callers qualify, so dropping the caller's scope
+    # is invisible.
+    functions = callable_functions(program)
+    found = set()
+    for name in PurityAnalysis(allow_print=True).pure_functions(program):
+        function = functions[name]
+        blocks = [node for node in [function.body, *descendants(function.body)] if isinstance(node, Block)]
+        for block in blocks:
+            for statement, following in zip(block.statements, block.statements[1:]):
+                call = unwrap(statement.expression) if isinstance(statement, Assign) else None
+                returned = unwrap(following.expression) if isinstance(following, Return) else None
+                if isinstance(call, FunctionCall) and call.identifier == name and \
+                        len(call.arguments) == len(parameter_list(function)) and \
+                        isinstance(returned, Identifier) and returned.name == statement.identifier:
+                    found.add(id(statement))
+    return found
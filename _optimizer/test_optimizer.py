@@ -0,0 +1,277 @@
+import io
+import random
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+from _interpreter.interpreter import Interpreter
+from _lexer.lexer import Lexer
+from _optimizer.optimizer import CONSTANT_FOLDING, DEAD_CODE_ELIMINATION, INLINING, NO_OPTIMIZATION, \
+    SIMPLIFICATION, Optimizer
+from _optimizer.tail_calls import tail_calls
+from _parser.parser import Parser
+from _parser.test_incremental import structure
+from readers.source import Source
+from tree.expressions.add_expression import AddExpression
+from tree.expressions.multiply_expression import MultiplyExpression
+from tree.expressions.parent_logic_expression import ParentLogicExpression
+from tree.identifier import Identifier
+from tree.statements.conditional import Conditional
+from tree.statements.const import Const
+from tree.statements.function_call import FunctionCall
+
+
+def parse(text):
+    return Parser(Lexer(Source(io.StringIO(text)))).parse_program()
+
+
+def run(program, engine, optimization_level):
+    # output and the exception, if any, of one run
+    with patch('sys.stdout', new_callable=StringIO) as stdout:
+        try:
+            Interpreter(program, engine=engine, optimization_level=optimization_level).execute()
+        except Exception as exception:
+            return stdout.getvalue(), f"{type(exception).__name__}: {exception}"
+    return stdout.getvalue(), None
+
+
+class RandomProgram:
+    # programs made of the constructs the parser handles, with plenty of constants
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def choice(self, *options):
+        return self.random.choice(options)
+
+    def value(self):
+        return self.choice(
+            str(self.random.randint(0, 9)), f"{self.random.randint(0, 9)}.5", '"s"', "true", "a", "b",
+        )
+
+    def term(self):
+        factors = [self.value() for _ in range(self.random.randint(1, 3))]
+        text = factors[0]
+        for factor in factors[1:]:
+            text += f" {self.choice('*', '*', '/')} {factor}"
+        return text
+
+    def expression(self):
+        terms = [self.term() for _ in range(self.random.randint(1, 3))]
+        text = terms[0]
+        for term in terms[1:]:
+            text += f" {self.choice('+', '-')} {term}"
+        return text
+
+    def condition(self):
+        text = f"{self.expression()} {self.choice('<', '>=', '==', '!=')} {self.expression()}"
+        if self.random.random() < 0.3:
+            text += f" {self.choice('&&', '||')} {self.choice('true', 'a < 3', '1 == 1', '2 < 1')}"
+        return text
+
+    def statement(self, depth=0):
+        kind = self.random.randint(0, 8 if depth < 2 else 1)
+        if kind == 0:
+            return f"print({self.expression()});"
+        if kind == 1:
+            return f"{self.choice('a', 'b')} = {self.expression()};"
+        if kind == 2:
+            return f"if ({self.condition()}) {{ {self.statement(depth + 1)} }} else {{ {self.statement(depth + 1)} }}"
+        if kind == 3:
+            return f"if ({self.choice('true', '1 < 2', '2 * 3 == 5')}) {{ {self.statement(depth + 1)} }}" \
+                   f" elif ({self.condition()}) {{ {self.statement(depth + 1)} }}{self.choice(' else { print(0); }', '')}"
+        if kind == 4:
+            # only the loops touch c
+            return f"c = 0; while (c < 3) {{ c = c + 1; {self.statement(depth + 1)} }}"
+        if kind == 5:
+            return f"{self.choice('let', 'const')} u = {self.expression()};"
+        if kind == 6:
+            return f"# {self.expression()}\n"
+        if kind == 7:
+            return f"if ({self.condition()}) {{ return a; }} else {{ {self.statement(depth + 1)} return b; }}"
+        if self.random.random() < 0.5:
+            return f"{self.choice('a', 'b')} = h({self.expression()});"
+        return f"{self.choice('a', 'b')} = k({self.choice('a', '1', self.expression())}, {self.expression()});"
+
+    def program(self):
+        statements = " ".join(self.statement() for _ in range(self.random.randint(1, 6)))
+        return f"function main() {{ let a = {self.random.randint(0, 3)}; let b = 1.5; let c = 0; {statements} print(a, b); }}" \
+               " function h(let x) { return x * 2 - 1; }" \
+               " function k(let x, const y) { if (x < y) { return y; } elif (x == y) { return 0; } return x - y; }"
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def optimized_expression(self, text, level=SIMPLIFICATION):
+        program = Optimizer(level).optimize(parse(f"function main() {{ let x = 1; let a = {text}; }}"))
+        return program.functions[0].body.statements[1].expression
+
+    def assertFolded(self, text, value, level=SIMPLIFICATION):
+        expression = self.optimized_expression(text, level)
+        self.assertIsInstance(expression, ParentLogicExpression)
+        self.assertEqual(expression.expression.value, value)
+
+    def test_constant_folding(self):
+        self.assertFolded("60 * 60 * 24", 86400, CONSTANT_FOLDING)
+        self.assertFolded("1 + 2 * 3 - 4 / 2", 5.0, CONSTANT_FOLDING)
+        self.assertFolded("1 < 2", True, CONSTANT_FOLDING)
+        self.assertFolded('"s" == "s" && 2 >= 3', False, CONSTANT_FOLDING)
+        self.assertFolded("1 == 2 || -2 < 0", True, CONSTANT_FOLDING)
+
+    def test_constant_prefix(self):
+        expression = self.optimized_expression("2 * 3 * x / 4", CONSTANT_FOLDING)
+
+        self.assertIsInstance(expression, MultiplyExpression)
+        self.assertEqual(len(expression.expressions), 3)
+        self.assertEqual(expression.expressions[0].expression.value, 6)
+
+    def test_failing_operations_are_kept(self):
+        for text in ['"s" + 1', "1 / 0", '"s" < 1', "-true"]:
+            with self.subTest(text=text):
+                self.assertNotIsInstance(self.optimized_expression(text), ParentLogicExpression)
+
+    def test_identities(self):
+        # x only ever holds an int
+        expression = self.optimized_expression("x * 1 + 0")
+        self.assertIsInstance(expression, ParentLogicExpression)
+        self.assertIsInstance(expression.expression, Identifier)
+
+        # y may not be a number, y * 1 still has to fail then
+        program = Optimizer().optimize(parse('function main() { let y = "s"; y = y * 1 + 0; }'))
+        self.assertIsInstance(program.functions[0].body.statements[1].expression, AddExpression)
+
+        # z is a float, -0.0 + 0 would not be -0.0
+        program = Optimizer().optimize(parse('function main() { let z = 0.5; z = z * 1 - 0 + 0; }'))
+        self.assertEqual(len(program.functions[0].body.statements[1].expression.expressions), 2)
+
+        expression = self.optimized_expression("x * 2 * 1 - 0")
+        self.assertIsInstance(expression, MultiplyExpression)
+        self.assertEqual(len(expression.expressions), 2)
+
+        expression = self.optimized_expression("1 * x * 2 * 1")
+        self.assertEqual(len(expression.expressions), 2)
+
+        expression = self.optimized_expression("x * 1 + 0", CONSTANT_FOLDING)
+        self.assertIsInstance(expression, AddExpression)
+
+    def test_branch_pruning(self):
+        program = Optimizer().optimize(parse(
+            'function main() { let a = 1;'
+            ' if (1 > 2) { print(1); } elif (a == 1) { print(2); } elif (true) { print(3); } else { print(4); }'
+            ' if (2 < 1) { print(5); }'
+            ' if (1 < 2) { print(6); } else { print(7); } }'
+        ))
+        statements = program.functions[0].body.statements
+
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(len(statements[1].conditions), 1)
+        self.assertEqual(len(statements[1].blocks), 2)
+        self.assertIsInstance(statements[2], Conditional)
+        self.assertEqual(statements[2].conditions[0].expression.value, True)
+        self.assertEqual(len(statements[2].blocks), 1)
+
+    def test_levels(self):
+        text = "function main() { let a = 2 * 3; if (false) { print(a); } }"
+        program = parse(text)
+
+        self.assertIs(Optimizer(NO_OPTIMIZATION).optimize(program), program)
+        self.assertEqual(len(Optimizer(CONSTANT_FOLDING).optimize(program).functions[0].body.statements), 2)
+        self.assertEqual(len(Optimizer(SIMPLIFICATION).optimize(program).functions[0].body.statements), 2)
+        # the parsed program is left as it was
+        self.assertEqual(structure(program), structure(parse(text)))
+
+    def test_dead_code(self):
+        program = Optimizer().optimize(parse(
+            'function main() { let a = 1; let b = a * 2 + 3; const c = "s" * 2; let d = a / 2; let e = 0; e = f(1);'
+            ' # note\n'
+            ' print(a); if (a < 2) { return a; } else { print(3); return 0; } print(2); }'
+            ' function f(let x) { let unused = 4; let used = x; print(used); return 1; print(x); }'
+        ))
+        main, f = program.functions
+
+        # "s" * 2 and a / 2 can fail
+        self.assertEqual([structure(statement) for statement in main.body.statements], [
+            structure(statement) for statement in parse(
+                'function main() { let a = 1; const c = "s" * 2; let d = a / 2; let e = 0; e = f(1);'
+                ' print(a); if (a < 2) { return a; } else { print(3); return 0; } }'
+            ).functions[0].body.statements
+        ])
+        self.assertEqual([statement.identifier for statement in f.body.statements[:1]], ["used"])
+        self.assertEqual(len(f.body.statements), 3)
+
+    def test_cannot_return(self):
+        program = Optimizer().optimize(parse(
+            'function main() { let a = 0; while (a < 3) { a = a + 1; } if (a > 1) { a = f(a); } print(a); }'
+            ' function f(let x) { if (x > 2) { print(x); } else { return 1; } return x; }'
+        ))
+        main, f = program.functions
+
+        self.assertFalse(main.body.statements[1].body.can_return)
+        self.assertFalse(main.body.statements[2].blocks[0].can_return)
+        self.assertFalse(main.body.can_return)
+        self.assertFalse(f.body.statements[0].blocks[0].can_return)
+        self.assertTrue(f.body.statements[0].blocks[1].can_return)
+        self.assertTrue(f.body.can_return)
+        self.assertEqual(run(program, "tree", NO_OPTIMIZATION), ("3\n3\n", None))
+
+    def test_inlining(self):
+        text = 'function main() { let a = 2; a = sq(a); a = sq(3); a = sign(a - 10); a = fib(a); print(a); }' \
+               ' function sq(let x) { return x * x; }' \
+               ' function sign(const x) { if (x < 0) { return 0 - 1; } return 1; }' \
+               ' function fib(let n) { if (n < 2) { return n; } let a = 0; a = fib(n - 1); return a + n; }'
+        program = Optimizer().optimize(parse(text))
+        statements = program.functions[0].body.statements
+
+        # a is declared and 3 is a literal, both replace x
+        self.assertEqual(structure(statements[1]),
+                         structure(parse('function f() { a = a * a; }').functions[0].body.statements[0]))
+        self.assertEqual(statements[2].expression.expression.value, 9)
+        # a - 10 is evaluated once, into a const like the parameter
+        self.assertIsInstance(statements[3], Conditional)
+        self.assertIsInstance(statements[3].blocks[0].statements[0], Const)
+        self.assertIsInstance(statements[3].blocks[0].statements[1], Conditional)
+        # recursive
+        self.assertIsInstance(statements[4].expression.expression, FunctionCall)
+        self.assertEqual(run(program, "tree", NO_OPTIMIZATION), run(parse(text), "tree", NO_OPTIMIZATION))
+
+    def test_inlining_thresholds(self):
+        text = 'function main() { let a = 2; a = sq(a); a = sq(a); } function sq(let x) { return x * x; }'
+
+        statements = Optimizer(inline_size=5).optimize(parse(text)).functions[0].body.statements
+        self.assertEqual([isinstance(statement.expression.expression, FunctionCall) for statement in statements[1:]],
+                         [True, True])
+        statements = Optimizer(inline_calls=1).optimize(parse(text)).functions[0].body.statements
+        self.assertEqual([isinstance(statement.expression, ParentLogicExpression) for statement in statements[1:]],
+                         [False, True])
+        statements = Optimizer(DEAD_CODE_ELIMINATION).optimize(parse(text)).functions[0].body.statements
+        self.assertIsInstance(statements[1].expression.expression, FunctionCall)
+
+    def test_tail_calls(self):
+        program = parse(
+            'function main() { let a = 0; a = f(3); a = g(3); a = h(3); print(a); }'
+            ' function f(let n) { if (n == 0) { return 0; } let r = 0; r = f(n - 1); return r; }'
+            ' function g(let n) { if (n == 0) { return 0; } let r = 0; r = g(n - 1); print(r); return r; }'
+            ' function h(let n) { if (n == a) { return 0; } let r = 0; r = h(n - 1); return r; }'
+        )
+        f = program.functions[1]
+
+        # g does more after the call, h reads a variable of its caller
+        self.assertEqual(tail_calls(program), {id(f.body.statements[2])})
+
+    def test_differential(self):
+        texts = [RandomProgram(seed).program() for seed in range(150)] + [
+            'function main() { if (1 == 2) { print("if"); } elif (1 == 3) { print("elif"); } }',
+            'function main() { let a = 1; if (a == 2) { print("if"); } elif (1 == 3) { print("elif"); } }',
+            'function main() { let a = 1; if (1 == 2) { print("if"); } elif (a == 3) { print("elif"); } }',
+        ]
+        for seed, text in enumerate(texts):
+            for engine in ("tree", "bytecode"):
+                with self.subTest(seed=seed, engine=engine, text=text):
+                    program = parse(text)
+                    expected = run(program, engine, NO_OPTIMIZATION)
+                    for level in (CONSTANT_FOLDING, SIMPLIFICATION, DEAD_CODE_ELIMINATION, INLINING):
+                        self.assertEqual(run(program, engine, level), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
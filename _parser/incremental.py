@@ -0,0 +1,219 @@
+import io
+
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from exceptions.lexer_exception import LexerException
+from _parser.token_stream import TokenStream, lexer_tokens
+from readers.source import Source
+from tokens import Token, Type
+from tree.program import Program
+
+
+def collect_tokens(lexer):
+    tokens = []
+    for token, position in lexer_tokens(lexer):
+        tokens.append((token, position))
+        if token.token_type == Type.EOF:
+            return tokens
+
+
+def record_tokens(lexer, tokens):
+    # hands the parser the tokens as the lexer makes them, like a full parse,
+    # so a text that doesn't lex fails wherever the full parse would
+    for pair in lexer_tokens(lexer):
+        if not tokens or tokens[-1][0].token_type != Type.EOF:
+            tokens.append(pair)
+        yield pair
+
+
+def shift_tokens(tokens, line_shift, line=None, column_shift=0):
+    # tokens on `line` (counted after line_shift) also move by column_shift
+    shifted = []
+
+    for token, (position_line, position_column) in tokens:
+        token_line, token_column = token.line + line_shift, token.column
+        position_line += line_shift
+        if token_line == line:
+            token_column += column_shift
+        if position_line == line:
+            position_column += column_shift
+
+        shifted.append((Token(token.token_type, token.value, token_line, token_column),
+                        (position_line, position_column)))
+
+    return shifted
+
+
+class FunctionSpan:
+    __slots__ = ("start", "tokens", "line_shift", "function")
+
+    def __init__(self, start, tokens, function):
+        # start is the offset of the "function" keyword, tokens run up to the
+        # next function (the last span also holds EOF)
+        self.start = start
+        self.tokens = tokens
+        self.line_shift = 0
+        self.function = function
+
+    def get_position(self):
+        token = self.tokens[0][0]
+        return token.line + self.line_shift, token.column
+
+    def get_tokens(self):
+        if self.line_shift:
+            self.tokens = shift_tokens(self.tokens, self.line_shift)
+            self.line_shift = 0
+        return self.tokens
+
+    def move(self, offset_shift, line_shift, line, column_shift):
+        self.start += offset_shift
+
+        if self.get_position()[0] == line:
+            self.tokens = shift_tokens(self.tokens, self.line_shift + line_shift, line + line_shift, column_shift)
+            self.line_shift = 0
+        else:
+            # only lines change, the tokens are rebuilt when somebody asks for them
+            self.line_shift += line_shift
+
+
+class IncrementalParser:
+
+    lexer_class = Lexer
+
+    def __init__(self, text, program=None, tokens=None):
+        self.text = text
+        self.program = program
+        self.spans = None
+        self.reparsed = 0
+
+        if program is None or tokens is None:
+            self.parse_all()
+        else:
+            self.spans = self.build_spans(tokens)
+
+    def get_tokens(self):
+        if self.spans is None:
+            return collect_tokens(self.create_lexer(self.text))
+        return [pair for span in self.spans for pair in span.get_tokens()]
+
+    def create_lexer(self, text, line=1, column=0):
+        return self.lexer_class(Source(io.StringIO(text), line, column))
+
+    def parse_all(self):
+        self.spans = None
+        self.program = None
+        self.reparsed = 0
+
+        tokens = []
+        lexer = self.create_lexer(self.text)
+        self.program = Parser(lexer, TokenStream(record_tokens(lexer, tokens))).parse_program()
+        self.reparsed = self.program.functions_count() if self.program else 0
+
+        # the parser may stop before the end, the spans need the rest of the tokens
+        if self.program is not None and tokens[-1][0].token_type != Type.EOF:
+            try:
+                tokens.extend(collect_tokens(lexer))
+            except LexerException:
+                return self.program
+        self.spans = self.build_spans(tokens)
+
+        return self.program
+
+    def build_spans(self, tokens):
+        if self.program is None:
+            return None
+
+        starts = [index for index, (token, _) in enumerate(tokens) if token.token_type == Type.FUNCTION]
+        if starts[:1] != [0] or len(starts) != self.program.functions_count():
+            # something the parser stopped at silently, like a comment between functions
+            return None
+
+        line_starts = [0, 0]
+        index = self.text.find("\n")
+        while index != -1:
+            line_starts.append(index + 1)
+            index = self.text.find("\n", index + 1)
+
+        spans = []
+        for function, start, end in zip(self.program.functions, starts, starts[1:] + [len(tokens)]):
+            token = tokens[start][0]
+            offset = line_starts[token.line] + token.column - 1
+            spans.append(FunctionSpan(offset, tokens[start:end], function))
+
+        return spans
+
+    def edit(self, offset, deleted_length, inserted_text):
+        old_text = self.text
+        index = self.find_span(offset, offset + deleted_length)
+        self.text = old_text[:offset] + inserted_text + old_text[offset + deleted_length:]
+
+        if index is not None:
+            try:
+                program = self.reparse_span(old_text, index, offset, deleted_length, inserted_text)
+            except Exception:
+                # the region alone may trip the parser in ways the whole file would not
+                program = None
+            if program is not None:
+                self.program = program
+                return program
+
+        # the errors are reported with the positions of a full parse
+        return self.parse_all()
+
+    def find_span(self, start, end):
+        if self.spans is None:
+            return None
+
+        for index, span in enumerate(self.spans):
+            if span.start >= start:
+                break
+            next_start = self.spans[index + 1].start if index + 1 < len(self.spans) else len(self.text)
+            if end < next_start:
+                return index
+
+        return None
+
+    def reparse_span(self, old_text, index, offset, deleted_length, inserted_text):
+        span = self.spans[index]
+        last = index == len(self.spans) - 1
+        shift = len(inserted_text) - deleted_length
+
+        end = len(self.text) if last else self.spans[index + 1].start + shift
+        line, column = span.get_position()
+
+        lexer = self.create_lexer(self.text[span.start:end], line, column - 1)
+        tokens = collect_tokens(lexer)
+        parser = Parser(lexer, TokenStream(tokens))
+
+        function = parser.parse_function()
+        if function is None or parser.stream.token.token_type != Type.EOF:
+            return None
+
+        functions = list(self.program.functions)
+        functions[index] = function
+        identifiers = set(other.identifier for other in functions)
+        if len(identifiers) != len(functions):
+            return None
+
+        if not last:
+            tokens.pop()
+            old_line, old_column = self.locate(old_text, span, offset + deleted_length)
+            new_line, new_column = self.locate(self.text, span, offset + len(inserted_text))
+
+            for following in self.spans[index + 1:]:
+                following.move(shift, new_line - old_line, old_line, new_column - old_column)
+
+        self.spans[index] = FunctionSpan(span.start, tokens, function)
+        self.reparsed = 1
+
+        return Program(functions)
+
+    @staticmethod
+    def locate(text, span, offset):
+        # line and column of the character at offset, searching from the span start only
+        line, column = span.get_position()
+        newlines = text.count("\n", span.start, offset)
+
+        if newlines:
+            return line + newlines, offset - text.rfind("\n", span.start, offset)
+        return line, column + offset - span.start
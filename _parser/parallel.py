@@ -0,0 +1,100 @@
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from readers.source import Source
+from tokens import Type
+from tree.program import Program
+
+
+# strings and comments are skipped so braces and "function" inside them don't count
+SCAN_PATTERN = re.compile(r'"[^"\n]*"|#[^\n]*|[{}]|(?<!\w)function(?!\w)')
+
+MIN_FUNCTIONS = 64
+BATCHES_PER_WORKER = 4
+
+
+def split_functions(text):
+    # (offset, line, column) of every top-level "function", None when the text
+    # doesn't look like a plain list of functions
+    starts = []
+    depth = 0
+    line, line_offset = 1, 0
+
+    for found in SCAN_PATTERN.finditer(text):
+        token = found.group()
+
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif token == "function" and depth == 0:
+            offset = found.start()
+            line += text.count("\n", line_offset, offset)
+            line_offset = offset
+            column = offset - text.rfind("\n", 0, offset)
+            starts.append((offset, line, column))
+
+    if not starts or text[:starts[0][0]].strip(" \n"):
+        return None
+
+    return starts
+
+
+def split_chunks(text, starts):
+    ends = [offset for offset, _, _ in starts[1:]] + [len(text)]
+    return [(text[offset:end], line, column) for (offset, line, column), end in zip(starts, ends)]
+
+
+def parse_chunk(text, line, column, lexer_class=Lexer):
+    # the chunk keeps its place in the file, so positions match the whole text
+    try:
+        parser = Parser(lexer_class(Source(io.StringIO(text), line, column - 1)))
+        function = parser.parse_function()
+    except Exception:
+        return None
+
+    if function is None or not parser.check_if(Type.EOF):
+        return None
+    return function
+
+
+def parse_chunks(chunks, lexer_class=Lexer):
+    return [parse_chunk(text, line, column, lexer_class) for text, line, column in chunks]
+
+
+def parse_serial(text, lexer_class=Lexer):
+    return Parser(lexer_class(Source(io.StringIO(text)))).parse_program()
+
+
+def parse_parallel(text, max_workers=None, executor=None, lexer_class=Lexer, min_functions=MIN_FUNCTIONS):
+    starts = split_functions(text)
+    if starts is None or len(starts) < min_functions:
+        return parse_serial(text, lexer_class)
+
+    chunks = split_chunks(text, starts)
+    workers = max_workers or getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    size = -(-len(chunks) // (workers * BATCHES_PER_WORKER))
+    batches = [chunks[index:index + size] for index in range(0, len(chunks), size)]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(parse_chunks, batches, [lexer_class] * len(batches)))
+    else:
+        results = list(executor.map(parse_chunks, batches, [lexer_class] * len(batches)))
+
+    functions = []
+    identifiers = set()
+
+    for batch in results:
+        for function in batch:
+            if function is None or function.identifier in identifiers:
+                # errors are reported by the serial parser with its exact positions
+                return parse_serial(text, lexer_class)
+            identifiers.add(function.identifier)
+            functions.append(function)
+
+    return Program(functions)
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+import sys
+
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from readers.source import Source
+from tree import serializer
+
+
+# bump when the lexer or parser starts building different trees for the same text
+CACHE_VERSION = 1
+
+CACHE_DIRECTORY = "__parsecache__"
+DIGEST_SIZE = 16
+
+
+class ParseCache:
+
+    def __init__(self, directory=None, lexer_class=Lexer):
+        # by default the cache sits next to each script, like __pycache__
+        self.directory = directory
+        self.lexer_class = lexer_class
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(text):
+        key = hashlib.sha256()
+        key.update(f"{CACHE_VERSION}:{serializer.FORMAT_VERSION}:{sys.implementation.cache_tag}:".encode())
+        key.update(text.encode("utf-8", "surrogatepass"))
+        return key.digest()
+
+    def cache_path(self, path):
+        directory = self.directory or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRECTORY)
+        name = os.path.basename(path)
+        return os.path.join(directory, f"{name}.{sys.implementation.cache_tag}.ast")
+
+    def parse(self, text):
+        return Parser(self.lexer_class(Source(io.StringIO(text)))).parse_program()
+
+    def parse_file(self, path):
+        with open(path) as file:
+            text = file.read()
+        return self.parse_text(text, self.cache_path(path))
+
+    def parse_text(self, text, cache_path):
+        key = self.cache_key(text)
+
+        program = self.load(cache_path, key)
+        if program is not None:
+            self.hits += 1
+            return program
+
+        self.misses += 1
+        program = self.parse(text)
+        self.store(cache_path, key, program)
+        return program
+
+    def load(self, cache_path, key):
+        try:
+            with open(cache_path, "rb") as file:
+                # the entry is stale when the text, the parser or the interpreter changed
+                if file.read(len(key)) != key:
+                    return None
+                digest, data = file.read(DIGEST_SIZE), file.read()
+            # marshal must never see a truncated or damaged entry
+            if hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest() != digest:
+                return None
+            return serializer.loads(data)
+        except (OSError, EOFError, ValueError, TypeError, ImportError, AttributeError):
+            return None
+
+    def store(self, cache_path, key, program):
+        if program is None:
+            return
+
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            data = serializer.dumps(program)
+            with open(temporary_path, "wb") as file:
+                file.write(key)
+                file.write(hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest())
+                file.write(data)
+            # readers never see a half written entry
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            # like __pycache__, a cache that can't be written is just skipped
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
@@ -23,6 +23,7 @@ from tree.operators.operator_mapper import OperatorMapper
 from tree.program import Program
 from tree.function import Function
 from exceptions.parser_exception import ParserException
+from _parser.token_stream import TokenStream
 from tree.statements.conditional import Conditional
 from tree.statements._while import While
 from tree.statements._return import Return
@@ -34,29 +35,30 @@ from tree.value import Value
 
 class Parser:
 
-    def __init__(self, lexer):
+    def __init__(self, lexer, stream=None):
         self.lexer = lexer
-        self.lexer.next_token()
-        self.token = self.lexer.token
+        self.stream = stream if stream is not None else TokenStream.from_lexer(lexer)
+        self.stream.next_token()
+        self.token = self.stream.token
 
         self.types = [Type.LET, Type.CONST]
         self.operator_mapper = OperatorMapper()
 
     def parser_exception(self, msg):
-        line, column = self.lexer.source.get_position()
+        line, column = self.stream.get_position()
         raise ParserException(line, column, msg)
 
     def parse_program(self):
         functions = []
-        identifiers = []
+        identifiers = set()
 
         function = self.parse_function()
 
         while function is not None:
             functions.append(function)
-            identifiers = [function.identifier for function in functions]
-            if len(set(identifiers)) != len(identifiers):
+            if function.identifier in identifiers:
                 self.parser_exception("The functions can't have similar names.")
+            identifiers.add(function.identifier)
             function = self.parse_function()
 
         self.check_if(Type.EOF)
@@ -69,43 +71,43 @@ class Parser:
             return program
 
     def check_if(self, token_type):
-        return bool(self.lexer.token.get_type() == token_type)
+        return bool(self.stream.token.get_type() == token_type)
 
     def check_and_handle(self, token_type):
-        if self.lexer.token.get_type() == token_type:
-            self.lexer.next_token()
+        if self.stream.token.get_type() == token_type:
+            self.stream.next_token()
             return True
         self.parser_exception(f"Missing value: {token_type}.")
 
     def move(self):
-        self.lexer.next_token()
+        self.stream.next_token()
 
     def check_and_move(self, token_type):
-        if self.lexer.token.get_type() == token_type:
-            self.lexer.next_token()
+        if self.stream.token.get_type() == token_type:
+            self.stream.next_token()
             return True
         return False
 
     def parse_parameters(self):
         params = {}
 
-        if self.lexer.token.token_type == Type.RIGHT_BRACKET:
+        if self.stream.token.token_type == Type.RIGHT_BRACKET:
             return None
 
-        if self.lexer.token.token_type not in self.types:
+        if self.stream.token.token_type not in self.types:
             self.parser_exception("Missing type of parameter.")
 
-        while self.lexer.token.token_type in self.types:
-            token_type = self.lexer.token.token_type
-            self.lexer.next_token()
-            if self.lexer.token.get_type() != Type.IDENTIFIER:
+        while self.stream.token.token_type in self.types:
+            token_type = self.stream.token.token_type
+            self.stream.next_token()
+            if self.stream.token.get_type() != Type.IDENTIFIER:
                 self.parser_exception("Missing identifier.")
-            params[self.lexer.token.get_value()] = token_type
-            self.lexer.next_token()
+            params[self.stream.token.get_value()] = token_type
+            self.stream.next_token()
 
-            if self.lexer.token.token_type == Type.COMMA:
-                self.lexer.next_token()
-                if self.lexer.token.token_type not in self.types:
+            if self.stream.token.token_type == Type.COMMA:
+                self.stream.next_token()
+                if self.stream.token.token_type not in self.types:
                     self.parser_exception("Missing type of parameter.")
             else:
                 break
@@ -116,10 +118,10 @@ class Parser:
         if not self.check_if(Type.FUNCTION):
             return None
         self.move()
-        identifier = self.lexer.token.get_value()
+        identifier = self.stream.token.get_value()
         if not identifier:
             self.parser_exception("Missing identifier.")
-        elif self.lexer.token.get_type() != Type.IDENTIFIER:
+        elif self.stream.token.get_type() != Type.IDENTIFIER:
             self.parser_exception("Wrong type of identifier.")
         self.move()
         self.check_and_handle(Type.LEFT_BRACKET)
@@ -260,7 +262,7 @@ class Parser:
     def parse_let_statement(self):
         if self.check_if(Type.LET):
             self.move()
-            identifier = self.lexer.token.get_value()
+            identifier = self.stream.token.get_value()
             self.move()
             if self.check_if(Type.ASSIGN):
                 self.move()
@@ -271,7 +273,7 @@ class Parser:
     def parse_const_statement(self):
         if self.check_if(Type.CONST):
             self.move()
-            identifier = self.lexer.token.get_value()
+            identifier = self.stream.token.get_value()
             self.move()
             if self.check_if(Type.ASSIGN):
                 self.move()
@@ -281,7 +283,7 @@ class Parser:
 
     def parse_assign_statement_or_function_call(self):
         if self.check_if(Type.IDENTIFIER):
-            identifier = self.lexer.token.get_value()
+            identifier = self.stream.token.get_value()
             self.move()
             if self.check_if(Type.ASSIGN):
                 self.move()
@@ -375,7 +377,7 @@ class Parser:
 
     def parse_comment(self):
         if self.check_if(Type.COMMENT):
-            token = self.lexer.token
+            token = self.stream.token
             self.move()
             comment = Comment(token.value)
             return comment
@@ -439,7 +441,7 @@ class Parser:
         if rel_expression:
             expressions.append(rel_expression)
 
-            while self.is_equal_token(self.lexer.token.token_type):
+            while self.is_equal_token(self.stream.token.token_type):
                 operators.append(self.parse_operator())
                 rel_expression = self.parse_rel_expression()
 
@@ -465,7 +467,7 @@ class Parser:
         if add_expression:
             expressions.append(add_expression)
 
-            while self.is_relation_token(self.lexer.token.token_type):
+            while self.is_relation_token(self.stream.token.token_type):
                 operators.append(self.parse_operator())
                 add_expression = self.parse_add_expression()
 
@@ -492,7 +494,7 @@ class Parser:
         if mult_expression:
             expressions.append(mult_expression)
 
-        while self.is_add_token(self.lexer.token.token_type):
+        while self.is_add_token(self.stream.token.token_type):
 
             operator = self.parse_operator()
             operators.append(operator)
@@ -522,7 +524,7 @@ class Parser:
         if unary_expression:
             expressions.append(unary_expression)
 
-        while self.is_mult_token(self.lexer.token.token_type):
+        while self.is_mult_token(self.stream.token.token_type):
 
             operator = self.parse_operator()
             operators.append(operator)
@@ -583,7 +585,7 @@ class Parser:
             return self.parse_value()
 
     def parse_value(self):
-        token = self.lexer.token
+        token = self.stream.token
 
         if (value := self.token_to_literal(token)) is not None:
             return value
@@ -621,7 +623,7 @@ class Parser:
         return literal
 
     def parse_operator(self):
-        token_type = self.lexer.token.token_type
+        token_type = self.stream.token.token_type
         operator = self.operator_mapper.TYPE_TO_OPERATOR.get(token_type)
         if operator:
             self.move()
@@ -0,0 +1,139 @@
+import io
+import random
+import unittest
+
+from _lexer.lexer import Lexer
+from _parser.incremental import IncrementalParser, collect_tokens
+from _parser.parser import Parser
+from benchmarks.programs import generate_program
+from exceptions.parser_exception import ParserException
+from readers.source import Source
+
+
+def structure(node):
+    if isinstance(node, (list, tuple)):
+        return [structure(item) for item in node]
+    if isinstance(node, dict):
+        return [(structure(key), structure(value)) for key, value in node.items()]
+    if hasattr(node, "__slots__"):
+        fields = [name for cls in type(node).__mro__ for name in getattr(cls, "__slots__", ())]
+        return type(node).__name__, [structure(getattr(node, name, None)) for name in fields]
+    return node
+
+
+class TestIncrementalParser(unittest.TestCase):
+
+    program = 'function f(let a) { let b = a * 2; return b; } function g() { print("g"); }\n' \
+              'function main() {\n    let x = 2;\n    print(x);\n}\n'
+
+    def full_parse(self, text):
+        return Parser(Lexer(Source(io.StringIO(text)))).parse_program()
+
+    def full_tokens(self, text):
+        return collect_tokens(Lexer(Source(io.StringIO(text))))
+
+    def assert_same_as_full_parse(self, parser):
+        expected = self.full_parse(parser.text)
+        self.assertEqual(structure(parser.program.functions), structure(expected.functions))
+
+        expected_tokens = self.full_tokens(parser.text)
+        self.assertEqual([(repr(token), token.get_position(), position) for token, position in parser.get_tokens()],
+                         [(repr(token), token.get_position(), position) for token, position in expected_tokens])
+
+    def assert_same_error(self, exception, text):
+        with self.assertRaises(Exception) as expected:
+            self.full_parse(text)
+        self.assertIs(type(exception), type(expected.exception))
+        self.assertEqual((getattr(exception, "line", None), getattr(exception, "column", None)),
+                         (getattr(expected.exception, "line", None), getattr(expected.exception, "column", None)))
+
+    def test_errors_of_a_full_parse(self):
+        # the parser stops at "1 1" before the lexer ever reaches the unterminated string
+        text = 'function main() {\n    let a = 1 1;\n    print("x);\n}\n'
+
+        with self.assertRaises(ParserException) as context:
+            IncrementalParser(text)
+        self.assert_same_error(context.exception, text)
+
+        parser = IncrementalParser(self.program)
+        with self.assertRaises(ParserException) as context:
+            parser.edit(0, len(self.program), text)
+        self.assert_same_error(context.exception, text)
+
+        # and text after where the parser stops may not even lex
+        text = 'function main() {\n}\n}"'
+        self.assertEqual(structure(IncrementalParser(text).program.functions),
+                         structure(self.full_parse(text).functions))
+
+    def test_edit_inside_function_reuses_others(self):
+        parser = IncrementalParser(self.program)
+        f, g, main = parser.program.functions
+
+        offset = self.program.index("a * 2")
+        parser.edit(offset, 5, "a + 40 * a")
+
+        assert parser.reparsed == 1
+        assert parser.program.functions[1] is g
+        assert parser.program.functions[2] is main
+        assert parser.program.functions[0] is not f
+        self.assert_same_as_full_parse(parser)
+
+    def test_edit_adding_lines(self):
+        parser = IncrementalParser(self.program)
+        main = parser.program.functions[2]
+
+        offset = self.program.index("print(\"g\");")
+        parser.edit(offset, 0, "let c = 1;\n\n    c = c + 1;\n")
+
+        assert parser.reparsed == 1
+        assert parser.program.functions[2] is main
+        self.assert_same_as_full_parse(parser)
+
+    def test_edit_between_functions_parses_everything(self):
+        parser = IncrementalParser(self.program)
+
+        offset = self.program.index("function g")
+        parser.edit(offset, 0, "function h() { return 1; }\n")
+
+        assert parser.reparsed == 4
+        self.assert_same_as_full_parse(parser)
+
+    def test_edit_with_error(self):
+        parser = IncrementalParser(self.program)
+        offset = self.program.index("function main")
+
+        with self.assertRaises(ParserException) as context:
+            parser.edit(offset + 9, 4, "f")
+        with self.assertRaises(ParserException) as expected:
+            self.full_parse(parser.text)
+        assert (context.exception.line, context.exception.column) == (expected.exception.line, expected.exception.column)
+
+        offset = parser.text.index("function f")
+        parser.edit(offset + 9, 1, "main")
+        self.assert_same_as_full_parse(parser)
+
+    def test_random_edits(self):
+        random_generator = random.Random(7)
+        pieces = ["a", "1", " ", "\n", ";", "+", "(", ")", "{", "}", "x = 1;", "print(1);", '"s"', "# c\n", "let y = 2;"]
+
+        text = generate_program(5)
+        parser = IncrementalParser(text)
+
+        for _ in range(300):
+            offset = random_generator.randrange(len(parser.text) + 1)
+            deleted_length = random_generator.randrange(4)
+            inserted_text = "".join(random_generator.choices(pieces, k=random_generator.randrange(3)))
+
+            with self.subTest(text=parser.text, offset=offset, deleted=deleted_length, inserted=inserted_text):
+                try:
+                    program = parser.edit(offset, deleted_length, inserted_text)
+                except Exception as exception:
+                    self.assert_same_error(exception, parser.text)
+                    parser = IncrementalParser(text)
+                    continue
+
+                if program is None:
+                    assert self.full_parse(parser.text) is None
+                    parser = IncrementalParser(text)
+                else:
+                    self.assert_same_as_full_parse(parser)
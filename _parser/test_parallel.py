@@ -0,0 +1,66 @@
+import io
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from _lexer.fast_lexer import FastLexer
+from _lexer.lexer import Lexer
+from _parser.parallel import parse_parallel, split_functions
+from _parser.parser import Parser
+from _parser.test_incremental import structure
+from benchmarks.programs import generate_program
+from exceptions.lexer_exception import LexerException
+from exceptions.parser_exception import ParserException
+from readers.source import Source
+
+
+class TestParallelParser(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def parse_serial(self, text):
+        return Parser(Lexer(Source(io.StringIO(text)))).parse_program()
+
+    def parse_parallel(self, text, lexer_class=Lexer):
+        return parse_parallel(text, executor=self.executor, lexer_class=lexer_class, min_functions=1)
+
+    def assert_same_error(self, text):
+        with self.assertRaises((LexerException, ParserException)) as expected:
+            self.parse_serial(text)
+        with self.assertRaises(type(expected.exception)) as context:
+            self.parse_parallel(text)
+        assert (context.exception.line, context.exception.column) == (expected.exception.line, expected.exception.column)
+
+    def test_split_functions(self):
+        text = 'function a() { print("function {"); }\n# function }\n  function b() {\n}function c() { d = xfunction; }'
+
+        assert split_functions(text) == [(0, 1, 1), (53, 3, 3), (69, 4, 2)]
+        assert split_functions('x function a() {}') is None
+
+    def test_same_program_as_serial(self):
+        text = generate_program(20)
+
+        for lexer_class in [Lexer, FastLexer]:
+            with self.subTest(lexer_class=lexer_class):
+                program = self.parse_parallel(text, lexer_class)
+                self.assertEqual(structure(program.functions), structure(self.parse_serial(text).functions))
+
+    def test_duplicate_names(self):
+        text = generate_program(5) + "\nfunction f3() {\n    return 1;\n}\n"
+        self.assert_same_error(text)
+
+    def test_errors_keep_line_numbers(self):
+        text = generate_program(5)
+        offset = text.index("if (i == 3)", len(text) // 2)
+
+        self.assert_same_error(text[:offset] + "if (i == 3 {" + text[offset + len("if (i == 3) {"):])
+        self.assert_same_error(text.replace("print(\"done\", total);", "print(\"done\", total$);", 3))
+
+    def test_comment_between_functions(self):
+        text = "function a() {\n    return 1;\n}\n# the rest is skipped\nfunction b() {\n    return 2;\n}\n"
+        self.assertEqual(structure(self.parse_parallel(text).functions), structure(self.parse_serial(text).functions))
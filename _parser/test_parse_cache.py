@@ -0,0 +1,78 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from _lexer.lexer import Lexer
+from _parser.parse_cache import ParseCache, CACHE_DIRECTORY
+from _parser.parser import Parser
+from _parser.test_incremental import structure
+from benchmarks.programs import generate_program
+from readers.source import Source
+from tree import serializer
+
+
+class TestParseCache(unittest.TestCase):
+
+    program = 'function main() {\n    let a = 1.25;\n    const b = "text";\n    if (a > 1 && !false) {\n' \
+              '        print(a * -2, b);\n    }\n    else {\n        # nothing\n    }\n' \
+              '    match (a, b) {\n        case 1, "x" => return 1;\n        default => return 2;\n    }\n}\n' \
+              'function f(let x, const y) {\n    while (x < y) {\n        x = x + 1;\n    }\n    return x;\n}\n'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "script.txt")
+        self.write(self.program)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        with open(self.path, "w") as file:
+            file.write(text)
+
+    def parse(self, text):
+        return Parser(Lexer(Source(io.StringIO(text)))).parse_program()
+
+    def test_serializer_round_trip(self):
+        for text in [self.program, generate_program(3)]:
+            program = self.parse(text)
+            loaded = serializer.loads(serializer.dumps(program))
+            self.assertEqual(structure(loaded), structure(program))
+            self.assertEqual(repr(loaded.functions[-1]), repr(program.functions[-1]))
+
+    def test_cache_hit(self):
+        cache = ParseCache()
+        program = cache.parse_file(self.path)
+        loaded = cache.parse_file(self.path)
+
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert os.path.exists(cache.cache_path(self.path))
+        assert os.path.dirname(cache.cache_path(self.path)) == os.path.join(self.directory, CACHE_DIRECTORY)
+        self.assertEqual(structure(loaded), structure(program))
+
+    def test_changed_source_invalidates(self):
+        cache = ParseCache()
+        cache.parse_file(self.path)
+
+        self.write(self.program.replace("1.25", "7"))
+        program = cache.parse_file(self.path)
+
+        assert (cache.hits, cache.misses) == (0, 2)
+        self.assertEqual(structure(program), structure(self.parse(self.program.replace("1.25", "7"))))
+
+        cache.parse_file(self.path)
+        assert cache.hits == 1
+
+    def test_broken_cache_file(self):
+        cache = ParseCache(os.path.join(self.directory, "cache"))
+        cache.parse_file(self.path)
+
+        with open(cache.cache_path(self.path), "r+b") as file:
+            file.seek(60)
+            file.write(b"\xff\x00broken")
+
+        program = cache.parse_file(self.path)
+        assert cache.misses == 2
+        self.assertEqual(structure(program), structure(self.parse(self.program)))
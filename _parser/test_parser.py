@@ -3,6 +3,7 @@ import unittest
 from tokens import Type
 from _lexer.lexer import Lexer
 from _parser.parser import Parser
+from _parser.token_stream import TokenStream
 from exceptions.parser_exception import ParserException
 from readers.source import Source
 import io
@@ -355,3 +356,41 @@ class TestParser(unittest.TestCase):
             ])
         )
 
+    def test_token_stream_peek(self):
+        lexer = Lexer(Source(io.StringIO("let a = 4;")))
+        stream = TokenStream.from_lexer(lexer, lookahead=2)
+        stream.next_token()
+
+        assert stream.get_token().get_type() == Type.LET
+        assert stream.peek(1).get_type() == Type.IDENTIFIER
+        assert stream.peek(2).get_type() == Type.ASSIGN
+        assert stream.peek(0).get_type() == Type.LET
+
+        with self.assertRaises(ValueError):
+            stream.peek(3)
+
+        stream.next_token()
+        assert stream.get_token().get_value() == "a"
+        assert stream.get_position() == (1, 6)
+        stream.next_token()
+        stream.next_token()
+        stream.next_token()
+        stream.next_token()
+        assert stream.get_token().get_type() == Type.EOF
+        stream.next_token()
+        assert stream.get_token().get_type() == Type.EOF
+
+    def test_parser_over_cached_tokens(self):
+        program = "function main() { let a = 4; while (a < 10) { a = a + 1; } print(a); } function f(let b) { return b; }"
+
+        lexer = Lexer(Source(io.StringIO(program)))
+        tokens = []
+        while not tokens or tokens[-1][0].get_type() != Type.EOF:
+            lexer.next_token()
+            tokens.append((lexer.get_token(), lexer.source.get_position()))
+
+        expected = self.create_parser(program).parse_program()
+        parsed = Parser(None, TokenStream(tokens)).parse_program()
+
+        self.assertEqual([repr(function) for function in parsed.functions],
+                         [repr(function) for function in expected.functions])
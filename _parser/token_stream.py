@@ -0,0 +1,55 @@
+from collections import deque
+
+from tokens import Token, Type
+
+
+def lexer_tokens(lexer):
+    # the position is taken right after each token, which is where the lexer
+    # was when the parser reported errors straight from lexer.source
+    while True:
+        lexer.next_token()
+        yield lexer.token, lexer.source.get_position()
+
+
+class TokenStream:
+
+    DEFAULT_LOOKAHEAD = 4
+
+    def __init__(self, tokens, lookahead=DEFAULT_LOOKAHEAD):
+        self.tokens = iter(tokens)
+        self.lookahead = lookahead
+        self.buffer = deque()
+        self.last = (Token(Type.EOF, None), (None, None))
+        self.token, self.position = self.last
+
+    @classmethod
+    def from_lexer(cls, lexer, lookahead=DEFAULT_LOOKAHEAD):
+        return cls(lexer_tokens(lexer), lookahead)
+
+    def fetch(self):
+        # a finite token source keeps repeating its last token, like a lexer at EOF
+        self.last = next(self.tokens, self.last)
+        return self.last
+
+    def next_token(self):
+        if self.buffer:
+            self.token, self.position = self.buffer.popleft()
+        else:
+            self.token, self.position = self.fetch()
+
+    def peek(self, k=1):
+        if k == 0:
+            return self.token
+        if not 0 < k <= self.lookahead:
+            raise ValueError(f"Lookahead must be between 0 and {self.lookahead}, got {k}.")
+
+        while len(self.buffer) < k:
+            self.buffer.append(self.fetch())
+
+        return self.buffer[k - 1][0]
+
+    def get_token(self):
+        return self.token
+
+    def get_position(self):
+        return self.position
@@ -0,0 +1,98 @@
+import collections
+import contextlib
+import io
+import sys
+import time
+
+from _interpreter.interpreter import Interpreter
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from interpreter_tree.scope import Scope
+from readers.source import Source
+from tree.bool import Bool
+from tree.expressions.parent_logic_expression import ParentLogicExpression
+from tree.float import Float
+from tree.int import Int
+from tree.statements.const import Const
+from tree.statements.let import Let
+from tree.string import String
+
+
+ARITHMETIC_PROGRAM = """
+function main() {{
+    let i = 0;
+    let total = 0.5;
+    while (i < {iterations}) {{
+        total = total + i * 3 - i / 2;
+        i = i + 1;
+    }}
+    print(total);
+}}
+"""
+
+BLOCK_PROGRAM = """
+function main() {{
+    let i = 0;
+    let total = 0;
+    while (i < {iterations}) {{
+        let half = i / 2;
+        if (i > half) {{
+            total = total + half;
+        }}
+        else {{
+            total = total + 1;
+        }}
+        i = i + 1;
+    }}
+    print(total);
+}}
+"""
+
+# the tree nodes the interpreter used to create for every value it computed,
+# and the scopes it used to create for every block it entered
+COUNTED_CLASSES = [Int, Float, Bool, String, ParentLogicExpression, Let, Const, Scope]
+
+
+@contextlib.contextmanager
+def count_instances(classes):
+    counts = collections.Counter()
+    originals = {cls: cls.__init__ for cls in classes}
+
+    def counting(cls, original):
+        def __init__(self, *args, **kwargs):
+            counts[cls.__name__] += 1
+            original(self, *args, **kwargs)
+        return __init__
+
+    for cls, original in originals.items():
+        cls.__init__ = counting(cls, original)
+    try:
+        yield counts
+    finally:
+        for cls, original in originals.items():
+            cls.__init__ = original
+
+
+def count(title, text, iterations):
+    program = Parser(Lexer(Source(io.StringIO(text.format(iterations=iterations))))).parse_program()
+    interpreter = Interpreter(program)
+
+    output = io.StringIO()
+    with count_instances(COUNTED_CLASSES) as counts, contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        interpreter.execute()
+        elapsed = time.perf_counter() - start
+
+    print(f"-- tree-walker, {title}, {iterations} iterations, output: {output.getvalue().strip()}")
+    print(f"{'time':<24} {elapsed:8.3f} s")
+    for cls in COUNTED_CLASSES:
+        print(f"{cls.__name__:<24} {counts[cls.__name__]:8} created  {counts[cls.__name__] / iterations:6.1f} per iteration")
+
+
+def main(iterations=10000):
+    count("arithmetic", ARITHMETIC_PROGRAM, iterations)
+    count("blocks", BLOCK_PROGRAM, iterations)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
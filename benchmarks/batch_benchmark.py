@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+
+from _interpreter.batch import Worker, list_scripts, run_batch
+from benchmarks.programs import generate_program
+
+
+def measure(name, run, count):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:8.3f} s   {count / elapsed:8.0f} scripts/s")
+
+
+def main(scripts=2000, functions=3):
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(scripts):
+            with open(os.path.join(directory, f"script_{index}.txt"), "w") as file:
+                file.write(generate_program(functions))
+        print(f"-- {scripts} scripts of {functions + 1} functions, {os.cpu_count()} cores")
+
+        worker = Worker(parse_cache=False)
+        measure("serial", lambda: [worker.run(path) for path in list_scripts(directory)], scripts)
+
+        workers = 1
+        while True:
+            measure(f"{workers} workers", lambda: list(run_batch(directory, workers, parse_cache=False)), scripts)
+            if workers >= (os.cpu_count() or 1):
+                break
+            workers = min(workers * 2, os.cpu_count())
+
+        list(run_batch(directory, parse_cache=True))
+        measure("all cores, parse cache", lambda: list(run_batch(directory, parse_cache=True)), scripts)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,65 @@
+import sys
+import time
+
+from _interpreter.interpreter import Interpreter
+from benchmarks.interpreter_benchmark import measure, parse
+from interpreter_tree.builtins import BUILTINS
+from interpreter_tree.environment import Environment
+
+
+CALL_PROGRAM = """
+function main() {{
+    let i = 0;
+    let total = 0;
+    while (i < {iterations}) {{
+        total = add(total, i);
+        total = clamp(total);
+        i = inc(i);
+    }}
+    print(total);
+}}
+
+function add(let a, let b) {{
+    let c = 0;
+    c = inc(b);
+    return a + c;
+}}
+
+function inc(let x) {{
+    return x + 1;
+}}
+"""
+
+
+def builtins_with(count):
+    builtins = BUILTINS.register('clamp', lambda x: x % 1000)
+    for index in range(count):
+        builtins = builtins.register(f"native_{index}", abs)
+    return builtins
+
+
+def call_contexts(builtins, count):
+    env = Environment(builtins)
+    start = time.perf_counter()
+    for _ in range(count):
+        env.push_new_call_context()
+        env.get_variable('print')
+        env.pop_call_context()
+    return time.perf_counter() - start
+
+
+def main(iterations=5000, contexts=100000):
+    program = parse(CALL_PROGRAM.format(iterations=iterations))
+    print(f"-- four user calls and one native call per iteration, {iterations} iterations")
+    for count in (0, 100, 1000):
+        builtins = builtins_with(count)
+        measure(f"{count + 2} builtins", lambda p: Interpreter(p, memo_size=0, builtins=builtins), program)
+
+    print(f"-- {contexts} call contexts pushed, looked up and popped")
+    for count in (0, 100, 1000):
+        elapsed = call_contexts(builtins_with(count), contexts)
+        print(f"{f'{count + 2} builtins':<24} {elapsed:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,56 @@
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _interpreter.interpreter import Interpreter
+from benchmarks.interpreter_benchmark import parse
+
+
+SCRIPT = """
+function main() {
+    let i = 0;
+    let total = 0;
+    while (i < 20) {
+        total = add(total, i);
+        i = i + 1;
+    }
+    print(total);
+}
+
+function add(let a, let b) {
+    return a + b;
+}
+"""
+
+ENGINES = ["tree", "bytecode", "closure"]
+
+
+def run(program, engine):
+    # every script gets an interpreter and output of its own, the program is shared
+    output = io.StringIO()
+    Interpreter(program, engine, output=output).execute()
+    return output.getvalue()
+
+
+def throughput(program, engine, workers, scripts):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outputs = list(executor.map(lambda _: run(program, engine), range(scripts)))
+    elapsed = time.perf_counter() - start
+    assert len(set(outputs)) == 1
+    return scripts / elapsed
+
+
+def main(scripts=2000):
+    program = parse(SCRIPT)
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"-- {scripts} scripts over one parsed program, {'with' if gil else 'without'} the GIL")
+
+    for engine in ENGINES:
+        for workers in (1, 2, 4, 8):
+            print(f"{f'{engine}, {workers} workers':<24} {throughput(program, engine, workers, scripts):8.0f} scripts/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,61 @@
+import sys
+
+from _interpreter.interpreter import Interpreter
+from _optimizer.optimizer import DEAD_CODE_ELIMINATION, INLINING
+from benchmarks.interpreter_benchmark import measure, parse
+
+
+CALL_PROGRAM = """
+function main() {{
+    let i = 0;
+    let total = 0;
+    let step = 0;
+    while (i < {iterations}) {{
+        step = square(i);
+        step = clamp(step - 50);
+        total = add(total, step);
+        i = inc(i);
+    }}
+    print(total);
+}}
+
+function square(let x) {{
+    return x * x;
+}}
+
+function clamp(const x) {{
+    if (x < 0) {{
+        return 0;
+    }}
+    elif (x > 100) {{
+        return 100;
+    }}
+    else {{
+        return x;
+    }}
+}}
+
+function add(let a, let b) {{
+    return a + b;
+}}
+
+function inc(let x) {{
+    return x + 1;
+}}
+"""
+
+ENGINES = ["tree", "bytecode", "closure", "python"]
+
+
+def main(iterations=20000):
+    program = parse(CALL_PROGRAM.format(iterations=iterations))
+    print(f"-- four calls per iteration, {iterations} iterations")
+
+    for engine in ENGINES:
+        called = measure(f"{engine}, calls", lambda p: Interpreter(p, engine, DEAD_CODE_ELIMINATION), program)
+        inlined = measure(f"{engine}, inlined", lambda p: Interpreter(p, engine, INLINING), program)
+        print(f"{'':<24} {called / inlined:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
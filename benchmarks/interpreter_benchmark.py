@@ -0,0 +1,82 @@
+import contextlib
+import io
+import sys
+import time
+
+from _interpreter.interpreter import Interpreter
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from readers.source import Source
+
+
+LOOP_PROGRAM = """
+function main() {{
+    let i = 0;
+    let total = 0;
+    while (i < {iterations}) {{
+        total = total + i * 2;
+        if (i == 3) {{
+            total = total - 1.5;
+        }}
+        elif (i >= 7) {{
+            total = total - i / 4;
+        }}
+        else {{
+            total = total + 1;
+        }}
+        i = i + 1;
+    }}
+    print(total);
+}}
+"""
+
+TIGHT_LOOP_PROGRAM = """
+function main() {{
+    let i = 0;
+    while (i < {iterations}) {{
+        i = i + 1;
+    }}
+    print(i);
+}}
+"""
+
+ENGINES = [
+    ("tree-walker", lambda program: Interpreter(program)),
+    ("bytecode vm", lambda program: Interpreter(program, engine="bytecode")),
+    ("closures", lambda program: Interpreter(program, engine="closure")),
+    ("python source", lambda program: Interpreter(program, engine="python")),
+]
+
+
+def parse(text):
+    return Parser(Lexer(Source(io.StringIO(text)))).parse_program()
+
+
+def measure(name, create, program):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        create(program).execute()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:8.3f} s   output: {output.getvalue().strip()}")
+    return elapsed
+
+
+def compare(title, text):
+    program = parse(text)
+    print(f"-- {title}")
+
+    baseline = None
+    for name, create in ENGINES:
+        elapsed = measure(name, create, program)
+        baseline = baseline or elapsed
+        print(f"{'':<24} {baseline / elapsed:8.1f}x")
+
+
+def main(iterations=20000):
+    compare(f"while loop, {iterations} iterations", LOOP_PROGRAM.format(iterations=iterations))
+    compare(f"tight while loop, {iterations * 5} iterations", TIGHT_LOOP_PROGRAM.format(iterations=iterations * 5))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,118 @@
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from _lexer.fast_lexer import FastLexer, tokenize
+from _lexer.lexer import Lexer
+from benchmarks.programs import generate_program
+from readers.mapped_source import MappedSource
+from readers.source import Source, BufferedSource
+from tokens import Type
+
+
+def read_all(source):
+    count = 0
+    while source.get_char() != "":
+        count += 1
+        source.get_next_char()
+    return count, "chars"
+
+
+def lex(source, lexer_class=Lexer):
+    lexer = lexer_class(source)
+    count = 0
+    lexer.next_token()
+    while lexer.get_token().get_type() != Type.EOF:
+        count += 1
+        lexer.next_token()
+    return count, "tokens"
+
+
+def fast_lex(source):
+    return lex(source, FastLexer)
+
+
+def fast_tokenize(source):
+    return len(tokenize(source)), "tokens"
+
+
+def measure(name, run, make_source, size):
+    source = make_source()
+    start = time.perf_counter()
+    count, unit = run(source)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {count:>9} {unit:<6} {elapsed:8.3f} s {size / elapsed / 1e6:8.2f} MB/s")
+
+
+def compare(program, repeat=3):
+    # FastLexer against Lexer through next_token(), the runs interleaved so
+    # that a busy machine slows both alike. It is short of the several times
+    # faster it was meant to be: the master pattern and the one Token that
+    # next_token() has to build are most of what is left per token.
+    timings = {Lexer: [], FastLexer: []}
+    for _ in range(repeat):
+        for lexer_class, runs in timings.items():
+            start = time.perf_counter()
+            lex(Source(io.StringIO(program)), lexer_class)
+            runs.append(time.perf_counter() - start)
+
+    lexer_time, fast_time = min(timings[Lexer]), min(timings[FastLexer])
+    print(f"{'Lexer':<32} {lexer_time:8.3f} s")
+    print(f"{'FastLexer':<32} {fast_time:8.3f} s {lexer_time / fast_time:8.2f}x")
+
+
+def collect_tokens(source):
+    lexer = FastLexer(source)
+    tokens = []
+    lexer.next_token()
+    while lexer.get_token().get_type() != Type.EOF:
+        tokens.append(lexer.get_token())
+        lexer.next_token()
+    return tokens
+
+
+def measure_memory(name, build, program):
+    text = program[:]
+    tracemalloc.start()
+    result = build(Source(io.StringIO(text)))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<32} {len(result):>9} tokens {size / len(result):8.1f} bytes/token")
+
+
+def main(functions=2000):
+    program = generate_program(functions)
+    size = len(program)
+    print(f"program size: {size / 1e6:.2f} MB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.txt")
+        with open(path, "w") as file:
+            file.write(program)
+
+        sources = [
+            ("Source(StringIO)", lambda: Source(io.StringIO(program))),
+            ("Source(file)", lambda: Source(open(path))),
+            ("BufferedSource(file)", lambda: BufferedSource(open(path))),
+            ("BufferedSource(file, whole)", lambda: BufferedSource(open(path), chunk_size=-1)),
+            ("MappedSource(path)", lambda: MappedSource(path)),
+        ]
+
+        for run in [read_all, lex, fast_lex, fast_tokenize]:
+            print(f"-- {run.__name__}")
+            for name, make_source in sources:
+                measure(name, run, make_source, size)
+
+    print("-- next_token, best of 3")
+    compare(program)
+
+    print("-- memory")
+    measure_memory("list of Token", collect_tokens, program)
+    measure_memory("TokenArray", tokenize, program)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,65 @@
+import io
+import sys
+import tracemalloc
+
+from _lexer.lexer import Lexer
+from _parser.parser import Parser
+from benchmarks.programs import generate_program
+from readers.source import Source
+from tokens import Token, Type
+from tree.node import Node
+from tree.program import Program
+
+
+def instance_fields(instance):
+    for cls in type(instance).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if hasattr(instance, name):
+                yield getattr(instance, name)
+    yield from getattr(instance, "__dict__", {}).values()
+
+
+def count_nodes(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    count = 0
+    if isinstance(value, (Node, Program)):
+        count = 1
+        children = instance_fields(value)
+    elif isinstance(value, (list, tuple)):
+        children = value
+    elif isinstance(value, dict):
+        children = list(value.keys()) + list(value.values())
+    else:
+        return 0
+
+    return count + sum(count_nodes(child, seen) for child in children)
+
+
+def instance_size(instance):
+    size = sys.getsizeof(instance)
+    if hasattr(instance, "__dict__"):
+        size += sys.getsizeof(instance.__dict__)
+    return size
+
+
+def main(functions=500):
+    program_text = generate_program(functions)
+
+    tracemalloc.start()
+    program = Parser(Lexer(Source(io.StringIO(program_text)))).parse_program()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(program)
+    print(f"AST nodes: {nodes}")
+    print(f"AST memory: {size / 1e6:.2f} MB, {size / nodes:.1f} bytes per node (including lists and values)")
+    print(f"Token instance: {instance_size(Token(Type.IDENTIFIER, 'a', 1, 1))} bytes")
+    print(f"Function instance: {instance_size(program.functions[0])} bytes")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
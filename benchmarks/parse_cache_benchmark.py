@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import time
+
+from _parser.parse_cache import ParseCache
+from benchmarks.programs import generate_program
+from tree import serializer
+
+
+def measure(name, run, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:<32} {elapsed:8.4f} s")
+    return result
+
+
+def main(functions=2000):
+    program = generate_program(functions)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.txt")
+        with open(path, "w") as file:
+            file.write(program)
+
+        cache = ParseCache()
+        tree = measure("parse", lambda: cache.parse(program), 1)
+        data = serializer.dumps(tree)
+        print(f"program size: {len(program) / 1e6:.2f} MB, cached tree: {len(data) / 1e6:.2f} MB")
+
+        measure("serializer.dumps", lambda: serializer.dumps(tree))
+        measure("serializer.loads", lambda: serializer.loads(data))
+
+        cache.parse_file(path)
+        measure("ParseCache.parse_file (hit)", lambda: cache.parse_file(path))
+        print(f"hits: {cache.hits}, misses: {cache.misses}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from _lexer.fast_lexer import FastLexer
+from _lexer.lexer import Lexer
+from _parser.parallel import parse_parallel, parse_serial
+from benchmarks.programs import generate_program
+
+
+def measure(name, parse):
+    start = time.perf_counter()
+    program = parse()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {program.functions_count():>6} functions {elapsed:8.3f} s")
+
+
+def main(functions=2000, workers=os.cpu_count()):
+    program = generate_program(functions)
+    print(f"program size: {len(program) / 1e6:.2f} MB, {workers} workers")
+
+    with ProcessPoolExecutor(workers) as executor:
+        # start the workers before measuring
+        parse_parallel(generate_program(workers * 4), executor=executor, min_functions=1)
+
+        for lexer_class in [Lexer, FastLexer]:
+            print(f"-- {lexer_class.__name__}")
+            measure("serial", lambda: parse_serial(program, lexer_class))
+            measure("parallel", lambda: parse_parallel(program, executor=executor, lexer_class=lexer_class))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,23 @@
+FUNCTION_TEMPLATE = """
+function f{index}(let a, const b) {{
+    # generated function {index}
+    let total = 0;
+    let i = 0;
+    while (i < 10) {{
+        if (i == 3) {{
+            total = total + a * 2.5;
+        }}
+        elif (i >= 7) {{
+            total = total - b / 4;
+        }}
+        i = i + 1;
+    }}
+    print("done", total);
+    return total;
+}}
+"""
+
+
+def generate_program(functions):
+    source = "".join(FUNCTION_TEMPLATE.format(index=index) for index in range(functions))
+    return source + "\nfunction main() {\n    let a = 0;\n    print(a);\n}\n"
@@ -0,0 +1,69 @@
+import sys
+
+from _interpreter.interpreter import Interpreter
+from benchmarks.interpreter_benchmark import measure, parse
+
+
+FIBONACCI_PROGRAM = """
+function main() {{
+    let a = 0;
+    a = fib({n});
+    print(a);
+}}
+
+function fib(let n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    let a = 0;
+    a = fib(n - 1);
+    let b = 0;
+    b = fib(n - 2);
+    return a + b;
+}}
+"""
+
+DEEP_PROGRAM = """
+function main() {{
+    let a = 0;
+    a = sum({depth});
+    print(a);
+}}
+
+function sum(let n) {{
+    if (n == 0) {{
+        return 0;
+    }}
+    let r = 0;
+    r = sum(n - 1);
+    return r + n;
+}}
+"""
+
+ENGINES = [
+    # without memoization, fib would hardly call anything
+    ("tree-walker", lambda program: Interpreter(program, memo_size=0)),
+    ("bytecode vm", lambda program: Interpreter(program, engine="bytecode")),
+    ("stack machine", lambda program: Interpreter(program, engine="stack")),
+]
+
+
+def compare(title, text):
+    program = parse(text)
+    print(f"-- {title}")
+
+    for name, create in ENGINES:
+        try:
+            measure(name, create, program)
+        except RecursionError:
+            print(f"{name:<24} RecursionError")
+
+
+def main(n=20, depth=200000):
+    compare(f"fib({n})", FIBONACCI_PROGRAM.format(n=n))
+    for depth in (100, 1000, depth):
+        compare(f"recursion {depth} calls deep", DEEP_PROGRAM.format(depth=depth))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
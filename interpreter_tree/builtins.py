@@ -0,0 +1,30 @@
+from types import MappingProxyType
+
+from interpreter_tree.call import NativeFunction
+from tree.variable import Variable
+
+
+# Native functions every environment sees after its own scopes. The namespace
+# is built once and shared, registering returns a new one so environments
+# already using it never see it change.
+
+class Builtins:
+
+    def __init__(self, variables=None):
+        self.variables = MappingProxyType(dict(variables or {}))
+
+    def get_variable(self, name: str):
+        return self.variables.get(name)
+
+    def register(self, name: str, call_func, arity=1):
+        native = NativeFunction(is_native=True, arity=arity, call_func=call_func)
+        return Builtins({**self.variables, name: Variable(name, value=native)})
+
+    def __contains__(self, name):
+        return name in self.variables
+
+    def __len__(self):
+        return len(self.variables)
+
+
+BUILTINS = Builtins().register('print', print)
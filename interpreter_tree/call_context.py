@@ -16,7 +16,7 @@ class CallContext:
         return self.scopes[0]
 
     def pop_scope(self):
-        self.scopes.popleft()
+        return self.scopes.popleft()
 
     def add_variable(self, var):
         self.scopes[0].add_variable(var)
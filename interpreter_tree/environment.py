@@ -1,40 +1,46 @@
 from collections import deque
 
-from interpreter_tree.call import NativeFunction
+from interpreter_tree.builtins import BUILTINS
 from interpreter_tree.call_context import CallContext
+from interpreter_tree.frame import Frame
 from interpreter_tree.scope import Scope
 from tree.variable import Variable
 
 
+# most cleared scopes kept for reuse, so deep recursion doesn't keep them all
+SCOPE_POOL_SIZE = 64
+
 class Environment:
-    def __init__(self):
+    def __init__(self, builtins=BUILTINS):
         self.values = deque()
         self.call_contexts = deque()
+        # shared by every call context, looked up when no scope has the name
+        self.builtins = builtins
+        # popped scopes, cleared and handed out again by push_scope
+        self.free_scopes = []
 
-        self.push_new_call_context()
-
-        self.returned = (False, None)
+        # the calls being run, the innermost last and also in frame
+        self.frames = []
+        self.frame = None
 
-        self.set_native_functions()
-
-    def set_native_functions(self):
-        native_print = NativeFunction(arity=1, call_func=print)
-        self.add_variable(Variable('print', value=native_print))
+        self.push_new_call_context()
 
     def push_new_call_context(self, scope=None):
         self.call_contexts.appendleft(CallContext(scope))
-        self.set_native_functions()
 
     def push_scope(self, scope=None):
         if not scope:
-            scope = Scope()
+            scope = self.free_scopes.pop() if self.free_scopes else Scope()
         self.call_contexts[0].push_scope(scope)
 
     def get_scope(self):
         return self.call_contexts[0].get_scope()
 
-    def pop_scope(self):
-        self.call_contexts[0].pop_scope()
+    def pop_scope(self, recycle=True):
+        scope = self.call_contexts[0].pop_scope()
+        if recycle and len(self.free_scopes) < SCOPE_POOL_SIZE:
+            scope.clear()
+            self.free_scopes.append(scope)
 
     def pop_call_context(self):
         self.call_contexts.popleft()
@@ -43,7 +49,8 @@ class Environment:
         self.call_contexts[0].add_variable(var)
 
     def get_variable(self, name: str):
-        return self.call_contexts[0].get_variable(name)
+        var = self.call_contexts[0].get_variable(name)
+        return var if var is not None else self.builtins.get_variable(name)
 
     def push_value(self, value):
         self.values.appendleft(value)
@@ -51,14 +58,14 @@ class Environment:
     def pop_value(self):
         return self.values.popleft()
 
-    def set_returned(self, fact, value=None):
-        self.returned = (fact, value)
-
-    def reset_returned(self):
-        self.set_returned(fact=False, value=None)
+    def push_frame(self, frame: Frame):
+        self.frames.append(frame)
+        self.frame = frame
 
-    def get_returned(self):
-        return self.returned
+    def pop_frame(self):
+        frame = self.frames.pop()
+        self.frame = self.frames[-1] if self.frames else None
+        return frame
 
     def release_scopes(self, scopes: int):
         for i in range(scopes):
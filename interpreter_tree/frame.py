@@ -0,0 +1,20 @@
+from interpreter_tree.scope import Scope
+
+
+# returned by a statement that ends its call, up through every block and
+# loop running it, so nothing has to be checked after each statement
+RETURN = object()
+
+
+class Frame:
+    __slots__ = ("function", "scope", "statement", "return_value", "tail_call")
+
+    def __init__(self, function, scope: Scope):
+        self.function = function
+        # the variables of the call: its parameters and what its body declares
+        self.scope = scope
+        # the statement running in the body
+        self.statement = None
+        self.return_value = None
+        # the arguments of a self-recursive tail call, run in place of a new frame
+        self.tail_call = None
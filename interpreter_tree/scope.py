@@ -12,5 +12,8 @@ class Scope:
     def get_variable(self, identifier: str):
         return self.variables.get(identifier)
 
+    def clear(self):
+        self.variables.clear()
+
     def variable_exists(self, identifier):
         return identifier in self.variables.keys()
@@ -0,0 +1,39 @@
+import codecs
+import mmap
+import os
+
+from readers.source import BufferedSource
+
+
+class MappedSource(BufferedSource):
+
+    def __init__(self, path, line=1, column=0, chunk_size=BufferedSource.DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        # an empty file cannot be mapped, it behaves like an exhausted mapping
+        self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.offset = 0
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        super().__init__(self.mapping, line, column, chunk_size)
+
+    def read_chunk(self):
+        chunk = ""
+        # a chunk boundary can split a multibyte character, keep decoding until
+        # the decoder emits something or the mapping is exhausted
+        while not chunk and self.offset < self.size:
+            end = self.size if self.chunk_size < 0 else min(self.offset + self.chunk_size, self.size)
+            chunk = self.decoder.decode(self.mapping[self.offset:end], final=end == self.size)
+            self.offset = end
+        return chunk
+
+    def close(self):
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
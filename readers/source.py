@@ -22,9 +22,51 @@ class Source:
     def get_position(self):
         return self.line, self.column
 
+    def read_remaining(self):
+        # current character followed by everything not read yet
+        return self.character + self.source_type.read()
+
     def advance_line(self):
         self.line += 1
         self.column = 0
 
     def advance_column(self):
         self.column += 1
+
+
+class BufferedSource(Source):
+
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, source_type, line=1, column=0, chunk_size=DEFAULT_CHUNK_SIZE):
+        # chunk_size=-1 reads the whole stream on the first refill
+        self.chunk_size = chunk_size
+        self.characters = iter(())
+        super().__init__(source_type, line, column)
+
+    def read_chunk(self):
+        return self.source_type.read(self.chunk_size)
+
+    def read_remaining(self):
+        chunks = [self.character, "".join(self.characters)]
+        while chunk := self.read_chunk():
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    def get_next_char(self):
+        character = next(self.characters, "")
+
+        if not character:
+            chunk = self.read_chunk()
+            if chunk:
+                self.characters = iter(chunk)
+                character = next(self.characters)
+
+        self.character = character
+        if character == '\n':
+            self.line += 1
+            self.column = 0
+        else:
+            self.column += 1
+
+        return character
@@ -1,3 +1,4 @@
+from array import array
 from enum import Enum, auto
 
 
@@ -115,6 +116,7 @@ class Symbol:
 
 
 class Token:
+    __slots__ = ("token_type", "value", "line", "column")
 
     MAX_INT_NUMBER = 2 ** 32
     MAX_FRACTIONAL_PART_LENGTH = 10
@@ -146,3 +148,52 @@ class Token:
     def set_position(self, line, column):
         self.line = line
         self.column = column
+
+
+class TokenArray:
+
+    TYPES = {token_type.value: token_type for token_type in Type}
+
+    def __init__(self):
+        self.types = array('B')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.value_indices = array('I')
+        self.values = []
+        self.value_table = {}
+
+    def __len__(self):
+        return len(self.types)
+
+    @staticmethod
+    def value_key(value):
+        # the class is part of the key so that 1, 1.0 and True stay apart
+        if value.__class__ is str:
+            return value
+        return value.__class__, value
+
+    def intern_value(self, value):
+        key = self.value_key(value)
+        index = self.value_table.get(key)
+        if index is None:
+            index = self.value_table[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def append(self, token_type, value, line, column):
+        self.types.append(token_type.value)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.value_indices.append(self.intern_value(value))
+
+    def get_type(self, index):
+        return self.TYPES[self.types[index]]
+
+    def get_value(self, index):
+        return self.values[self.value_indices[index]]
+
+    def get_position(self, index):
+        return self.lines[index], self.columns[index]
+
+    def get_token(self, index):
+        return Token(self.get_type(index), self.get_value(index), self.lines[index], self.columns[index])
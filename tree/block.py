@@ -1,12 +1,23 @@
 from tree.statements.statement import Statement
 from tree.expressions.expression import Expression
 from tree.node import Node
+from tree.statements.const import Const
+from tree.statements.let import Let
 from tree.visitor import Visitor
 
 
 class Block(Node):
+    __slots__ = ("statements", "can_return", "declarations")
+
     def __init__(self, statements):
         self.statements = statements
+        # cleared by the optimizer when no statement can return
+        self.can_return = True
+        self.count_declarations()
+
+    def count_declarations(self):
+        # variables declared directly in the block, kept up to date by the optimizer
+        self.declarations = sum(isinstance(statement, (Let, Const)) for statement in self.statements)
 
     def __repr__(self):
         return self.__str__()
@@ -20,4 +31,4 @@ class Block(Node):
         return block_string
 
     def accept(self, visitor: Visitor, scope=None):
-        visitor.visit_block(self, scope)
+        return visitor.visit_block(self, scope)
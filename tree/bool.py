@@ -3,6 +3,8 @@ from .visitor import Visitor
 
 
 class Bool(Value):
+    __slots__ = ()
+
     def __init__(self, value, line=None, column=None):
         super().__init__(value, line, column)
 
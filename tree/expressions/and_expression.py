@@ -3,6 +3,8 @@ from ..visitor import Visitor
 
 
 class AndExpression(Expression):
+    __slots__ = ("expressions",)
+
     def __init__(self, expressions=None):
         if expressions is None:
             expressions = []
@@ -2,4 +2,6 @@ from tree.node import Node
 
 
 class Expression(Node):
+    __slots__ = ()
+
     pass
@@ -4,6 +4,8 @@ from ..visitor import Visitor
 
 
 class MultiplyExpression(Expression):
+    __slots__ = ("expressions", "operators")
+
     def __init__(self, expressions=None, operators=None):
         if expressions is None:
             expressions = []
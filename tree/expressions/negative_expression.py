@@ -3,6 +3,8 @@ from ..visitor import Visitor
 
 
 class NegativeExpression(Expression):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expression):
         self.expression = expression
 
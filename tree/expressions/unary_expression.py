@@ -4,6 +4,8 @@ from ..visitor import Visitor
 
 
 class UnaryExpression(Expression):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Function(Node):
+    __slots__ = ("identifier", "parameters", "body")
+
     def __init__(self, function_identifier, parameters: Parameters, body, line=None, column=None):
         super().__init__(line, column)
         self.identifier = function_identifier
@@ -22,4 +24,4 @@ class Function(Node):
         return f'Function: {self.identifier}, {self.parameters}, {self.body}'
 
     def accept(self, visitor: Visitor):
-        visitor.visit_function(self)
+        return visitor.visit_function(self)
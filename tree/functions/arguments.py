@@ -3,6 +3,8 @@ from ..visitor import Visitor
 
 
 class Arguments(Node):
+    __slots__ = ("arguments",)
+
     def __init__(self, arguments):
         self.arguments = arguments
 
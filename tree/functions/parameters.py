@@ -7,6 +7,8 @@ def check_unique(parameters):
 
 
 class Parameters(Node):
+    __slots__ = ("parameters",)
+
     def __init__(self, parameters):
         if not check_unique(parameters):
             raise Exception("Parameters are not unique.")
@@ -22,5 +24,5 @@ class Parameters(Node):
         return self.parameters
 
     def accept(self, visitor: Visitor):
-        visitor.visit_parameters(self)
+        return visitor.visit_parameters(self)
 
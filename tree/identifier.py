@@ -4,6 +4,8 @@ from .visitor import Visitor
 
 
 class Identifier(Node):
+    __slots__ = ("name",)
+
     def __init__(self, name, line=None, column=None):
         super().__init__(line, column)
         self.name = name
@@ -18,4 +20,4 @@ class Identifier(Node):
         return f'{self.name}'
 
     def accept(self, visitor: Visitor):
-        visitor.visit_identifier(self)
\ No newline at end of file
+        return visitor.visit_identifier(self)
\ No newline at end of file
@@ -4,6 +4,8 @@ from .visitor import Visitor
 
 
 class Int(Value):
+    __slots__ = ()
+
     def __init__(self, value, line=None, column=None):
         super().__init__(value, line, column)
         self.value = int(value)
@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Node(ABC):
+    __slots__ = ("line", "column")
+
     @abstractmethod
     def __init__(self, line=None, column=None):
         self.line = line
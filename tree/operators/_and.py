@@ -3,6 +3,7 @@ from ..visitor import Visitor
 
 
 class AndOperator(Operator):
+    __slots__ = ()
 
     def __init__(self):
         self.operator = "&&"
@@ -11,4 +12,4 @@ class AndOperator(Operator):
         return type(self) == type(other)
 
     def accept(self, visitor: Visitor):
-        visitor.visit_and_operator(self)
+        return visitor.visit_and_operator(self)
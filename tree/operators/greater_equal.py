@@ -3,6 +3,7 @@ from ..visitor import Visitor
 
 
 class GreaterEqualOperator(Operator):
+    __slots__ = ()
 
     def __init__(self):
         self.operator = ">="
@@ -3,6 +3,7 @@ from ..visitor import Visitor
 
 
 class LessEqualOperator(Operator):
+    __slots__ = ()
 
     def __init__(self):
         self.operator = "<="
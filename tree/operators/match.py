@@ -2,6 +2,7 @@ from .operator import Operator
 
 
 class MatchOperator(Operator):
+    __slots__ = ()
 
     def __init__(self):
         self.operator = "=>"
\ No newline at end of file
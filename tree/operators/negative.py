@@ -3,6 +3,7 @@ from ..visitor import Visitor
 
 
 class MinusOperator(Operator):
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
@@ -3,6 +3,8 @@ from tree.visitor import Visitor
 
 
 class Operator(Node):
+    __slots__ = ("operator",)
+
     def __init__(self):
         self.operator = ""
 
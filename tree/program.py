@@ -1,5 +1,6 @@
 from .visitor import Visitor
 class Program:
+    __slots__ = ("functions",)
 
     def __init__(self, functions):
         self.functions = functions
@@ -13,4 +14,4 @@ class Program:
         return False
 
     def accept(self, visitor: Visitor):
-        visitor.visit_program(self)
+        return visitor.visit_program(self)
@@ -0,0 +1,137 @@
+import functools
+import gc
+import importlib
+import marshal
+
+from tokens import Type
+
+
+# Trees are stored as nested tuples that marshal can write:
+#   (class index, field, field, ...)  - a node, own __slots__ first, then the bases'
+#   (DICT, [key, value, key, value])  - a dict, its keys may be nodes
+#   (TYPE, name)                      - a tokens.Type member
+# lists and plain values are stored as they are, Ellipsis marks an unset slot
+# and trailing unset slots are left out.
+# The class table is saved next to the tree, so the file describes itself.
+
+FORMAT_VERSION = 1
+
+DICT = -1
+TYPE = -2
+
+
+def slot_names(cls):
+    names = []
+    for base in cls.__mro__:
+        names.extend(base.__dict__.get("__slots__", ()))
+    return names
+
+
+class TreeEncoder:
+
+    def __init__(self):
+        self.classes = []
+        self.class_indices = {}
+
+    def class_index(self, cls):
+        index = self.class_indices.get(cls)
+        if index is None:
+            index = self.class_indices[cls] = len(self.classes)
+            self.classes.append((f"{cls.__module__}:{cls.__qualname__}", slot_names(cls)))
+        return index
+
+    def encode(self, value):
+        if value is None or value is ... or value.__class__ in (int, float, str, bool):
+            return value
+        if value.__class__ is list:
+            return [self.encode(item) for item in value]
+        if value.__class__ is dict:
+            items = []
+            for key, item in value.items():
+                items.append(self.encode(key))
+                items.append(self.encode(item))
+            return DICT, items
+        if value.__class__ is Type:
+            return TYPE, value.name
+
+        index = self.class_index(value.__class__)
+        fields = [self.encode(getattr(value, name, ...)) for name in self.classes[index][1]]
+        while fields and fields[-1] is ...:
+            fields.pop()
+        return index, *fields
+
+
+@functools.lru_cache(maxsize=None)
+def builder_code(fields):
+    # one function per class that fills the slots by name; nodes skip their
+    # constructors, which only validate what the parser already built. The
+    # code is compiled once per process and only bound to a class per tree.
+    lines = ["def build(value):", "    node = new(cls)", "    size = len(value)"]
+    for index, name in enumerate(fields, 1):
+        lines += [
+            f"    if size == {index}:",
+            f"        return node",
+            f"    field = value[{index}]",
+            f"    if field.__class__ is tuple or field.__class__ is list:",
+            f"        field = decode(field)",
+            f"    if field is not ...:",
+            f"        node.{name} = field",
+        ]
+    lines.append("    return node")
+    return compile("\n".join(lines), "<tree builder>", "exec")
+
+
+class TreeDecoder:
+
+    def __init__(self, classes):
+        self.builders = []
+        for name, fields in classes:
+            module_name, class_name = name.split(":")
+            if module_name.split(".")[0] != "tree":
+                raise ValueError(f"{name} is not a tree class.")
+            cls = getattr(importlib.import_module(module_name), class_name)
+            if slot_names(cls) != list(fields):
+                raise ValueError(f"The fields of {name} have changed.")
+            self.builders.append(self.create_builder(cls, fields))
+
+    def create_builder(self, cls, fields):
+        namespace = {"new": cls.__new__, "cls": cls, "decode": self.decode}
+        exec(builder_code(tuple(fields)), namespace)
+        return namespace["build"]
+
+    def decode(self, value):
+        if value.__class__ is list:
+            return [self.decode(item) if item.__class__ is tuple or item.__class__ is list else item
+                    for item in value]
+
+        tag = value[0]
+        if tag >= 0:
+            return self.builders[tag](value)
+        if tag == DICT:
+            items = [self.decode(item) if item.__class__ is tuple or item.__class__ is list else item
+                     for item in value[1]]
+            return dict(zip(items[::2], items[1::2]))
+        return Type[value[1]]
+
+
+def dumps(tree):
+    encoder = TreeEncoder()
+    encoded = encoder.encode(tree)
+    return marshal.dumps((FORMAT_VERSION, encoder.classes, encoded))
+
+
+def loads(data):
+    version, classes, encoded = marshal.loads(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tree format version: {version}.")
+    if encoded.__class__ is not tuple and encoded.__class__ is not list:
+        return encoded
+
+    # the tree has no cycles, collecting while it is being built only costs time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return TreeDecoder(classes).decode(encoded)
+    finally:
+        if enabled:
+            gc.enable()
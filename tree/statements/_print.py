@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Print(Statement):
+    __slots__ = ("arguments",)
+
     def __init__(self, arguments: Arguments):
         self.arguments = arguments
 
@@ -14,4 +16,4 @@ class Print(Statement):
         return f"print({self.arguments});"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_print(self)
+        return visitor.visit_print(self)
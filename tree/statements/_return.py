@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Return(Statement):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expression):
         self.expression = expression
 
@@ -14,4 +16,4 @@ class Return(Statement):
         return f"return {self.expression};"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_return(self)
\ No newline at end of file
+        return visitor.visit_return(self)
\ No newline at end of file
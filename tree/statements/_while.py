@@ -5,6 +5,8 @@ from tree.visitor import Visitor
 
 
 class While(Statement):
+    __slots__ = ("expression", "body")
+
     def __init__(self, expression: Expression, body: Block):
         self.expression = expression
         self.body = body
@@ -16,4 +18,4 @@ class While(Statement):
         return f"while {self.expression}\n{self.body}"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_while(self)
\ No newline at end of file
+        return visitor.visit_while(self)
\ No newline at end of file
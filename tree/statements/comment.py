@@ -3,6 +3,8 @@ from tree.visitor import Visitor
 
 
 class Comment(Statement):
+    __slots__ = ("comment_body",)
+
     def __init__(self, comment_body):
         self.comment_body = comment_body
 
@@ -13,4 +15,4 @@ class Comment(Statement):
         return f"comment_body: {self.comment_body}"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_comment(self)
\ No newline at end of file
+        return visitor.visit_comment(self)
\ No newline at end of file
@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Conditional(Statement):
+    __slots__ = ("conditions", "blocks")
+
     def __init__(self, conditions: list, blocks: list):
         self.conditions = conditions
         self.blocks = blocks
@@ -46,5 +48,5 @@ class Conditional(Statement):
         return len(self.conditions) == len(self.blocks) and len(self.blocks) == 1
 
     def accept(self, visitor: Visitor):
-        visitor.visit_conditional(self)
+        return visitor.visit_conditional(self)
 
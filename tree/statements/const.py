@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Const(Statement):
+    __slots__ = ("identifier", "expression")
+
     def __init__(self, identifier, expression: Expression):
         self.identifier = identifier
         self.expression = expression
@@ -15,4 +17,4 @@ class Const(Statement):
         return f"const {self.identifier} = {self.expression};"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_const(self)
+        return visitor.visit_const(self)
@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class FunctionCall(Statement):
+    __slots__ = ("identifier", "arguments")
+
     def __init__(self, function_identifier, arguments):
         self.identifier = function_identifier
         self.arguments = arguments
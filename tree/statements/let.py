@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Let(Statement):
+    __slots__ = ("identifier", "expression")
+
     def __init__(self, identifier, expression: Expression):
         self.identifier = identifier
         self.expression = expression
@@ -15,4 +17,4 @@ class Let(Statement):
         return f"let {self.identifier} = {self.expression};"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_let(self)
\ No newline at end of file
+        return visitor.visit_let(self)
\ No newline at end of file
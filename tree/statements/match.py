@@ -4,6 +4,8 @@ from tree.visitor import Visitor
 
 
 class Match(Statement):
+    __slots__ = ("conditions", "expressions", "expressions_str")
+
     def __init__(self, conditions: dict, expressions):
         self.conditions = conditions
         self.expressions = expressions
@@ -17,4 +19,4 @@ class Match(Statement):
         return f"Match: {self.conditions}, {self.expressions}"
 
     def accept(self, visitor: Visitor):
-        visitor.visit_match(self)
+        return visitor.visit_match(self)
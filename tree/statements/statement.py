@@ -3,6 +3,7 @@ from tree.visitor import Visitor
 
 
 class Statement(Node):
+    __slots__ = ()
 
     def accept(self, visitor: Visitor):
-        visitor.visit_statement(self)
+        return visitor.visit_statement(self)
@@ -3,6 +3,8 @@ from .node import Node
 
 
 class Value(Node):
+    __slots__ = ("value",)
+
     def __init__(self, value, line=None, column=None):
         super().__init__(line, column)
         self.value = value
@@ -3,6 +3,7 @@ from tree.visitor import Visitor
 
 
 class Variable(Expression):
+    __slots__ = ("identifier", "value")
 
     def __init__(self, identifier, value):
         self.identifier = identifier
@@ -12,4 +13,4 @@ class Variable(Expression):
         self.value = value
 
     def accept(self, visitor: Visitor):
-        visitor.visit_variable(self)
+        return visitor.visit_variable(self)